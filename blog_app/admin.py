@@ -7,10 +7,12 @@ from blog_app.models import CodeTip
 from blog_app.models.category import Category
 from blog_app.models.comment import Comment
 from blog_app.models.entry import Entry
-from blog_app.models.gemini_api_usage import GeminiApiUsage
+from blog_app.models.gemini_api_usage import LATENCY_BUCKETS, GeminiApiUsage
 from blog_app.models.like import Like
 from blog_app.models.multimedia import Multimedia
 from blog_app.models.tag import Tag
+from blog_app.utils.gemini_usage_recorder import gemini_usage_recorder
+from user_app.utils.user_agent_parser import user_agent_parser
 
 
 @register(Category)
@@ -74,7 +76,11 @@ class CommentAdmin(ModelAdmin):
 
 @register(Like)
 class LikeAdmin(ModelAdmin):
-    pass
+    list_display = ("user", "entry", "type", "device", "created_at")
+    list_select_related = ("user", "entry")
+
+    def device(self, obj):
+        return user_agent_parser.device(obj.user_agent) or ""
 
 
 @register(Multimedia)
@@ -142,6 +148,7 @@ class GeminiApiUsageAdmin(ModelAdmin):
         "failed_requests",
         "tokens_used",
         "average_response_time",
+        "p95_response_time",
         "success_rate",
         "has_errors",
     )
@@ -152,7 +159,10 @@ class GeminiApiUsageAdmin(ModelAdmin):
         "successful_requests",
         "failed_requests",
         "tokens_used",
+        "total_response_time",
+        "timed_requests",
         "average_response_time",
+        "p95_response_time",
         "model_name",
         "last_error_message",
         "last_updated",
@@ -171,6 +181,7 @@ class GeminiApiUsageAdmin(ModelAdmin):
                     "failed_requests",
                     "tokens_used",
                     "average_response_time",
+                    "p95_response_time",
                     "success_rate",
                 )
             },
@@ -197,8 +208,27 @@ class GeminiApiUsageAdmin(ModelAdmin):
             return format_html('<span style="color: red;">✘</span>')
         return format_html('<span style="color: green;">✓</span>')
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related("latency_buckets")
+
+    def p95_response_time(self, obj):
+        p95 = obj.response_time_percentile(95)
+        if p95 is None:
+            return "N/A"
+        return f"<= {p95}s" if p95 != float("inf") else f"> {LATENCY_BUCKETS[-1]}s"
+
     success_rate.short_description = "Success Rate"
     has_errors.short_description = "Errors"
+    p95_response_time.short_description = "P95 Response Time"
+
+    def changelist_view(self, request, extra_context=None):
+        # Write this worker's buffered usage so the page shows up-to-date aggregates.
+        gemini_usage_recorder.flush()
+        return super().changelist_view(request, extra_context)
+
+    def change_view(self, request, object_id, form_url="", extra_context=None):
+        gemini_usage_recorder.flush()
+        return super().change_view(request, object_id, form_url, extra_context)
 
     def has_add_permission(self, request):
         # Prevent manual creation of usage records
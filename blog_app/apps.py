@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class BlogAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "blog_app"
+
+    def ready(self):
+        from blog_app import signals  # noqa: F401
+        from blog_app.utils.fragment_cache import fragment_cache
+        from blog_app.utils.header_image_uploads import header_image_uploads
+        from blog_app.utils.page_cache import page_cache
+        from blog_app.utils.related_entries import related_entries_updater
+        from blog_app.utils.search_cache import search_cache
+        from cryptek import metrics
+
+        metrics.register("search_cache", search_cache.stats)
+        metrics.register("page_cache", page_cache.stats)
+        metrics.register("fragment_cache", fragment_cache.stats)
+        metrics.register("header_image_uploads", header_image_uploads.stats)
+        metrics.register("related_entries", related_entries_updater.stats)
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from blog_app.models.entry import Entry
+
+
+class Command(BaseCommand):
+    help = "Render the markdown content of entries into the stored `content_html` column."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-render every entry, even those whose stored HTML is up to date.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of entries loaded and written per batch.",
+        )
+
+    def handle(self, *args, **options):
+        force = options["force"]
+        batch_size = options["batch_size"]
+
+        entries = Entry.objects.only("id", "content", "content_html", "content_hash").order_by("id")
+        pending = []
+        rendered = 0
+        total = 0
+        for entry in entries.iterator(chunk_size=batch_size):
+            total += 1
+            if entry.render_content(force=force):
+                pending.append(entry)
+            if len(pending) >= batch_size:
+                Entry.objects.bulk_update(pending, ["content_html", "content_hash"])
+                rendered += len(pending)
+                pending = []
+        if pending:
+            Entry.objects.bulk_update(pending, ["content_html", "content_hash"])
+            rendered += len(pending)
+
+        self.stdout.write(self.style.SUCCESS(f"Rendered {rendered} of {total} entries."))
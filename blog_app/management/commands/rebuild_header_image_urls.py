@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from blog_app.models.entry import Entry
+from blog_app.utils.generation import ENTRIES, bump_generation
+
+URL_FIELDS = ["header_image_url", "header_image_srcset"]
+
+
+class Command(BaseCommand):
+    help = "Rebuild the stored delivery URLs of header images (after changing the transformation or the widths)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of entries loaded and written per batch.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        entries = Entry.objects.only("id", "cdn_image_url", "cdn_image_public_id", *URL_FIELDS).order_by("id")
+        pending = []
+        rebuilt = 0
+        total = 0
+        for entry in entries.iterator(chunk_size=batch_size):
+            total += 1
+            if entry.build_header_image_urls():
+                pending.append(entry)
+            if len(pending) >= batch_size:
+                Entry.objects.bulk_update(pending, URL_FIELDS)
+                rebuilt += len(pending)
+                pending = []
+        if pending:
+            Entry.objects.bulk_update(pending, URL_FIELDS)
+            rebuilt += len(pending)
+        if rebuilt:
+            # Cached pages and post cards embed the old URLs.
+            bump_generation(ENTRIES)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the header image URLs of {rebuilt} of {total} entries."))
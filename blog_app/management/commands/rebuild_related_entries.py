@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog_app.utils import related_entries
+
+
+class Command(BaseCommand):
+    help = "Recompute the related entries of every published entry."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count",
+            type=int,
+            default=getattr(settings, "RELATED_ENTRIES_COUNT", 4),
+            help="Number of related entries kept per entry.",
+        )
+        parser.add_argument(
+            "--content-weight",
+            type=float,
+            default=getattr(settings, "RELATED_ENTRIES_CONTENT_WEIGHT", 0.0),
+            help="Weight of the TF-IDF content similarity next to the tag and category similarity (0 ignores it).",
+        )
+
+    def handle(self, *args, **options):
+        stored = related_entries.rebuild_related_entries(
+            count=options["count"], content_weight=options["content_weight"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Stored {stored} related entry links."))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from blog_app.models.entry import Entry
+from blog_app.utils import full_text_search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search documents of every entry."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Number of entries indexed per batch.",
+        )
+
+    def handle(self, *args, **options):
+        if not full_text_search.is_supported():
+            self.stdout.write(self.style.WARNING("The database backend has no full-text search index."))
+            return
+
+        batch_size = options["batch_size"]
+        ids = list(Entry.objects.order_by("id").values_list("id", flat=True))
+        for start in range(0, len(ids), batch_size):
+            full_text_search.index_entries(ids[start : start + batch_size])
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {len(ids)} entries."))
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from blog_app.models.entry import Entry
+from blog_app.models.like import Like
+from blog_app.utils.generation import ENTRIES, bump_generation
+
+
+def vote_count(like_type):
+    """Correlated subquery counting the votes of `like_type` cast on the outer entry."""
+    votes = (
+        Like.objects.filter(entry=OuterRef("pk"), type=like_type)
+        .order_by()
+        .values("entry")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(votes, output_field=IntegerField()), Value(0))
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized like/dislike counters of entries from the `Like` table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many entries have drifted counters.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of entries fixed per UPDATE statement.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        fields = Like.COUNTER_FIELDS.values()
+
+        mismatch = Q()
+        for field in fields:
+            mismatch |= ~Q(**{field: F(f"actual_{field}")})
+        drifted = list(
+            Entry.objects.annotate(
+                **{f"actual_{field}": vote_count(like_type) for like_type, field in Like.COUNTER_FIELDS.items()}
+            )
+            .filter(mismatch)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+
+        if options["dry_run"]:
+            self.stdout.write(f"{len(drifted)} entries have drifted counters.")
+            return
+
+        updates = {field: vote_count(like_type) for like_type, field in Like.COUNTER_FIELDS.items()}
+        for start in range(0, len(drifted), batch_size):
+            Entry.objects.filter(pk__in=drifted[start : start + batch_size]).update(**updates)
+        if drifted:
+            # `update()` sends no signal: expire the cached pages showing the old counters.
+            bump_generation(ENTRIES)
+
+        self.stdout.write(self.style.SUCCESS(f"Reconciled the counters of {len(drifted)} entries."))
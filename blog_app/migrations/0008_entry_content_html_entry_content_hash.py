@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2025-05-10 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog_app", "0007_geminiapiusage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="entry",
+            name="content_hash",
+            field=models.CharField(blank=True, default="", editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="entry",
+            name="content_html",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+    ]
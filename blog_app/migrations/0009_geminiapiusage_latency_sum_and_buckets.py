@@ -0,0 +1,98 @@
+# Generated by Django 5.2 on 2025-05-12 09:18
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def average_to_sum(apps, schema_editor):
+    GeminiApiUsage = apps.get_model("blog_app", "GeminiApiUsage")
+    for usage in GeminiApiUsage.objects.filter(average_response_time__gt=0):
+        timed_requests = usage.successful_requests + usage.failed_requests
+        usage.timed_requests = timed_requests
+        usage.total_response_time = usage.average_response_time * timed_requests
+        usage.save(update_fields=["timed_requests", "total_response_time"])
+
+
+def sum_to_average(apps, schema_editor):
+    GeminiApiUsage = apps.get_model("blog_app", "GeminiApiUsage")
+    for usage in GeminiApiUsage.objects.filter(timed_requests__gt=0):
+        usage.average_response_time = usage.total_response_time / usage.timed_requests
+        usage.save(update_fields=["average_response_time"])
+
+
+def merge_duplicate_days(apps, schema_editor):
+    """Sum the rows concurrent get_or_create calls could create for the same day into one."""
+    GeminiApiUsage = apps.get_model("blog_app", "GeminiApiUsage")
+    counters = (
+        "request_count",
+        "successful_requests",
+        "failed_requests",
+        "tokens_used",
+        "total_response_time",
+        "timed_requests",
+    )
+    duplicate_days = (
+        GeminiApiUsage.objects.values("date").annotate(rows=Count("id")).filter(rows__gt=1).values_list("date")
+    )
+    for (date,) in duplicate_days:
+        kept, *duplicates = GeminiApiUsage.objects.filter(date=date).order_by("last_updated", "id")
+        for duplicate in duplicates:
+            for counter in counters:
+                setattr(kept, counter, getattr(kept, counter) + getattr(duplicate, counter))
+            kept.model_name = duplicate.model_name
+            kept.last_error_message = duplicate.last_error_message or kept.last_error_message
+        kept.save()
+        GeminiApiUsage.objects.filter(pk__in=[duplicate.pk for duplicate in duplicates]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog_app", "0008_entry_content_html_entry_content_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="geminiapiusage",
+            name="timed_requests",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="geminiapiusage",
+            name="total_response_time",
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(average_to_sum, sum_to_average),
+        migrations.RunPython(merge_duplicate_days, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="geminiapiusage",
+            name="average_response_time",
+        ),
+        migrations.AlterField(
+            model_name="geminiapiusage",
+            name="date",
+            field=models.DateField(default=django.utils.timezone.now, unique=True),
+        ),
+        migrations.CreateModel(
+            name="GeminiApiLatencyBucket",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("bucket", models.PositiveSmallIntegerField()),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "usage",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="latency_buckets",
+                        to="blog_app.geminiapiusage",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["usage", "bucket"],
+                "unique_together": {("usage", "bucket")},
+            },
+        ),
+    ]
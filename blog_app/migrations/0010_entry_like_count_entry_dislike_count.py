@@ -0,0 +1,43 @@
+# Generated by Django 5.2 on 2025-05-13 10:41
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_vote_counts(apps, schema_editor):
+    Entry = apps.get_model("blog_app", "Entry")
+    Like = apps.get_model("blog_app", "Like")
+
+    def vote_count(like_type):
+        votes = (
+            Like.objects.filter(entry=OuterRef("pk"), type=like_type)
+            .order_by()
+            .values("entry")
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        return Coalesce(Subquery(votes, output_field=IntegerField()), Value(0))
+
+    Entry.objects.update(like_count=vote_count("like"), dislike_count=vote_count("dislike"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog_app", "0009_geminiapiusage_latency_sum_and_buckets"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="entry",
+            name="dislike_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="entry",
+            name="like_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_vote_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2 on 2025-05-14 08:52
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def reslug_duplicate_published_entries(apps, schema_editor):
+    """Give every published entry but the oldest of each shared slug a numbered, unused slug."""
+    Entry = apps.get_model("blog_app", "Entry")
+    max_length = Entry._meta.get_field("slug").max_length
+    shared_slugs = Entry.objects.filter(status=1).values("slug").annotate(entries=Count("id")).filter(entries__gt=1)
+    for slug in [row["slug"] for row in shared_slugs]:
+        _oldest, *duplicates = Entry.objects.filter(status=1, slug=slug).order_by("id")
+        number = 1
+        for entry in duplicates:
+            while True:
+                number += 1
+                suffix = f"-{number}"
+                candidate = f"{slug[: max_length - len(suffix)]}{suffix}"
+                if not Entry.objects.filter(slug=candidate).exists():
+                    break
+            Entry.objects.filter(pk=entry.pk).update(slug=candidate)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog_app", "0010_entry_like_count_entry_dislike_count"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(fields=["entry", "active", "created_at"], name="comment_entry_active_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                condition=models.Q(("active", True)), fields=["entry", "created_at"], name="comment_entry_visible_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="entry",
+            index=models.Index(fields=["status", "-created_at"], name="entry_status_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="entry",
+            index=models.Index(
+                condition=models.Q(("status", 1)), fields=["-created_at"], name="entry_published_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="like",
+            index=models.Index(fields=["entry", "type"], name="like_entry_type_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="like",
+            index=models.Index(fields=["entry", "user"], name="like_entry_user_idx"),
+        ),
+        migrations.RunPython(reslug_duplicate_published_entries, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="entry",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status", 1)), fields=("slug",), name="entry_unique_published_slug"
+            ),
+        ),
+    ]
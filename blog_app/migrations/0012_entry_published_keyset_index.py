@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2025-05-15 17:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog_app", "0011_entry_comment_like_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="entry",
+            name="entry_published_created_idx",
+        ),
+        migrations.AddIndex(
+            model_name="entry",
+            index=models.Index(
+                condition=models.Q(("status", 1)), fields=["-created_at", "-id"], name="entry_published_created_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2025-05-18 12:37
+
+from django.db import migrations
+
+from blog_app.utils.full_text_search import build_document, create_search_table, drop_search_table, write_documents
+
+
+def create_search_index(apps, schema_editor):
+    create_search_table(schema_editor)
+    Entry = apps.get_model("blog_app", "Entry")
+    entries = Entry.objects.using(schema_editor.connection.alias).prefetch_related("tags", "categories")
+    write_documents((build_document(entry) for entry in entries), using=schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    drop_search_table(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog_app", "0012_entry_published_keyset_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
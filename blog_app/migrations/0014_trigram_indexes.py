@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2025-05-20 16:03
+
+from django.db import migrations
+
+from blog_app.utils.trigram_search import create_trigram_indexes, drop_trigram_indexes
+
+
+def create_indexes(apps, schema_editor):
+    create_trigram_indexes(schema_editor)
+
+
+def drop_indexes(apps, schema_editor):
+    drop_trigram_indexes(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog_app", "0013_entry_search_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
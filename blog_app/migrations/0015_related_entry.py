@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2025-05-24 10:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog_app", "0014_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RelatedEntry",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("rank", models.PositiveSmallIntegerField()),
+                ("score", models.FloatField()),
+                (
+                    "entry",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="related_links", to="blog_app.entry"
+                    ),
+                ),
+                (
+                    "related",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="related_from", to="blog_app.entry"
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("entry", "rank"),
+                "indexes": [models.Index(fields=["entry", "rank"], name="related_entry_rank_idx")],
+                "constraints": [
+                    models.UniqueConstraint(fields=("entry", "related"), name="related_entry_unique_pair")
+                ],
+            },
+        ),
+    ]
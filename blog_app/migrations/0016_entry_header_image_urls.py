@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2025-05-26 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog_app", "0015_related_entry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="entry",
+            name="header_image_srcset",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="entry",
+            name="header_image_url",
+            field=models.URLField(blank=True, default="", editable=False, max_length=500),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2025-05-27 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog_app", "0016_entry_header_image_urls"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="entry",
+            name="header_image_hash",
+            field=models.CharField(blank=True, default="", editable=False, max_length=64),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2 on 2025-05-28 10:12
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicate_votes(apps, schema_editor):
+    """Keep only the latest vote of each user on an entry, and recount the entries that had more."""
+    Like = apps.get_model("blog_app", "Like")
+    Entry = apps.get_model("blog_app", "Entry")
+    duplicated = Like.objects.values("entry", "user").annotate(votes=Count("id"), latest=Max("id")).filter(votes__gt=1)
+    entry_ids = set()
+    for vote in duplicated:
+        Like.objects.filter(entry=vote["entry"], user=vote["user"]).exclude(pk=vote["latest"]).delete()
+        entry_ids.add(vote["entry"])
+
+    for entry_id in entry_ids:
+        votes = dict(Like.objects.filter(entry=entry_id).values_list("type").annotate(Count("id")))
+        Entry.objects.filter(pk=entry_id).update(
+            like_count=votes.get("like", 0), dislike_count=votes.get("dislike", 0)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog_app", "0017_entry_header_image_hash"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_votes, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name="like",
+            name="like_entry_user_idx",
+        ),
+        migrations.AddConstraint(
+            model_name="like",
+            constraint=models.UniqueConstraint(fields=("entry", "user"), name="like_unique_entry_user"),
+        ),
+    ]
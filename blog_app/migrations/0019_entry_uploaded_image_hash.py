@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2025-05-29 09:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog_app", "0018_like_unique_entry_user"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="entry",
+            name="uploaded_image_hash",
+            field=models.CharField(blank=True, default="", editable=False, max_length=64),
+        ),
+    ]
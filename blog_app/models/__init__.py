@@ -5,4 +5,5 @@ from .entry import *
 from .gemini_api_usage import *
 from .like import *
 from .multimedia import *
+from .related_entry import *
 from .tag import *
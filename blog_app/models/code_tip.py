@@ -54,6 +54,13 @@ class CodeTip(Model):
     gemini_raw_response = TextField(blank=True, default="")
     error_message = TextField(blank=True, default="")
 
+    # Titles of the placeholder tips returned by `generate_code_tip` when the generation fails.
+    ERROR_TITLES = (
+        "Gemini API Key no configurada",
+        "Respuesta no estructurada",
+        "Error al obtener tip de Gemini",
+    )
+
     def __str__(self):
         return self.title
 
@@ -1,5 +1,5 @@
 from blog_app.models.entry import Entry
-from django.db.models import CASCADE, BooleanField, DateTimeField, ForeignKey, Model, TextField
+from django.db.models import CASCADE, BooleanField, DateTimeField, ForeignKey, Index, Model, Q, TextField
 from user_app.models.cryptek_user import CryptekUser
 
 
@@ -27,6 +27,11 @@ class Comment(Model):
 
     class Meta:
         ordering = ("created_at",)
+        indexes = [
+            Index(fields=["entry", "active", "created_at"], name="comment_entry_active_idx"),
+            # Pages only show active comments; backends without partial indexes skip it.
+            Index(fields=["entry", "created_at"], condition=Q(active=True), name="comment_entry_visible_idx"),
+        ]
 
     def __str__(self):
         return f"Comment by {self.user} on {self.entry}"
@@ -1,8 +1,8 @@
-import logging
+from functools import partial
 
 from cloudinary import CloudinaryImage
-from cloudinary.exceptions import Error as CloudinaryError
-from cloudinary.uploader import upload
+from django.conf import settings
+from django.db import transaction
 from django.db.models import (
     CASCADE,
     BooleanField,
@@ -10,12 +10,16 @@ from django.db.models import (
     DateTimeField,
     ForeignKey,
     ImageField,
+    Index,
     IntegerField,
     ManyToManyField,
     Model,
     OneToOneField,
+    PositiveIntegerField,
+    Q,
     SlugField,
     TextField,
+    UniqueConstraint,
     URLField,
 )
 from django.urls import reverse
@@ -24,9 +28,12 @@ from markdownx.models import MarkdownxField
 
 from blog_app.models.category import Category
 from blog_app.models.tag import Tag
+from blog_app.utils.header_image_uploads import header_image_uploads, image_hash
 from user_app.models.cryptek_user import CryptekUser
+from user_app.templatetags.markdown_extras import content_fingerprint, render_markdown, render_markdown_cached
 
-logger = logging.getLogger(__name__)
+# Delivery transformation of header images; run `rebuild_header_image_urls` after changing it.
+HEADER_IMAGE_TRANSFORMATION = {"crop": "fill", "quality": "auto:good", "fetch_format": "auto"}
 
 STATUS = (
     (0, "Draft"),
@@ -39,6 +46,9 @@ STATUS = (
 class Entry(Model):
     title = CharField(max_length=100, null=False, blank=False)
     content = MarkdownxField(null=False, blank=False)
+    # Sanitized HTML rendered from `content` on save, so detail pages don't run the markdown pipeline per request.
+    content_html = TextField(blank=True, default="", editable=False)
+    content_hash = CharField(max_length=64, blank=True, default="", editable=False)
     overview = TextField(
         blank=False,
         null=False,
@@ -58,16 +68,55 @@ class Entry(Model):
     header_image = ImageField(upload_to="header_images/", blank=True, null=True)
     cdn_image_url = URLField(blank=True, null=True, unique=True)
     cdn_image_public_id = CharField(max_length=200, blank=True, null=True)
+    # Delivery URLs of the uploaded header image, built once by `build_header_image_urls`.
+    header_image_url = URLField(max_length=500, blank=True, default="", editable=False)
+    header_image_srcset = TextField(blank=True, default="", editable=False)
+    # SHA-256 of the header image content last saved, and of the one the CDN delivers (written by the
+    # upload worker once the upload succeeded), so images are only uploaded until they reach the CDN.
+    header_image_hash = CharField(max_length=64, blank=True, default="", editable=False)
+    uploaded_image_hash = CharField(max_length=64, blank=True, default="", editable=False)
     slug = SlugField(
         max_length=50,
         blank=False,
         null=False,
     )
+    # Denormalized vote totals, kept in sync by `Like.update_entry_counters` and `reconcile_like_counts`.
+    like_count = PositiveIntegerField(default=0, editable=False)
+    dislike_count = PositiveIntegerField(default=0, editable=False)
+
+    COUNTER_FIELDS = ("like_count", "dislike_count")
+    # Written by the header image upload worker (and `rebuild_header_image_urls`) only.
+    CDN_FIELDS = (
+        "cdn_image_url",
+        "cdn_image_public_id",
+        "header_image_url",
+        "header_image_srcset",
+        "uploaded_image_hash",
+    )
+    # Fields related entries are computed from, besides tags and categories.
+    RELATED_FIELDS = ("status", "title", "overview", "content")
+
+    _rendered_source = None
+    _persisted_pk = None
+    _stored_image_name = None
+    _related_source = None
+    # Whether the last save changed `RELATED_FIELDS`, read by the related entries receiver.
+    related_changed = True
 
     class Meta:
         ordering = ["-created_at"]
         verbose_name_plural = "Entries"
         get_latest_by = "created_at"
+        indexes = [
+            Index(fields=["status", "-created_at"], name="entry_status_created_idx"),
+            # Listings and the sitemap only read published entries; backends without partial indexes skip it.
+            # Also matches the `(created_at, id)` keyset used to paginate them.
+            Index(fields=["-created_at", "-id"], condition=Q(status=1), name="entry_published_created_idx"),
+        ]
+        constraints = [
+            # Published entries are looked up by slug alone, so two of them can't share one.
+            UniqueConstraint(fields=["slug"], condition=Q(status=1), name="entry_unique_published_slug"),
+        ]
 
     def __str__(self):
         return self.title
@@ -83,43 +132,146 @@ class Entry(Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title[:50])
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or {"status", "slug"}.intersection(update_fields):
+            slug = self.unique_published_slug()
+            if slug != self.slug:
+                self.slug = slug
+                if update_fields is not None:
+                    kwargs["update_fields"] = {*update_fields, "slug"}
         if not self.author or self.author.is_anonymous:
             self.author = kwargs.get("user", self.author)
-        if self.header_image:
-            try:
-                cdn_response = upload(self.header_image, public_id=self.slug)
-                self.cdn_image_url = cdn_response.get("secure_url")
-                self.cdn_image_public_id = cdn_response.get("public_id")
-            except CloudinaryError as e:
-                logger.error(f"Cloudinary upload failed: {e}")
-                self.cdn_image_url = None
+        upload_image = self.header_image_changed()
+        self.related_changed = self.related_fields_changed()
+        if "content" in self.__dict__ and (not self.content_html or self.content != self._rendered_source):
+            self.render_content(force=True)
+        persisted = self.pk is not None and self.pk == self._persisted_pk and not kwargs.get("force_insert")
+        if persisted and kwargs.get("update_fields") is None:
+            # Counters are only changed with `F()` updates; writing back the values loaded with the
+            # instance would undo the votes cast since then. Likewise for the CDN fields and an upload
+            # finishing after the instance was loaded.
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.name not in self.COUNTER_FIELDS + self.CDN_FIELDS
+            ]
 
         super().save(*args, **kwargs)
+        self._rendered_source = self.__dict__.get("content")
+        self._persisted_pk = self.pk
+        self._stored_image_name = self.__dict__.get("header_image") and self.header_image.name
+        self._related_source = self._loaded_related_fields()
+        if upload_image:
+            transaction.on_commit(partial(header_image_uploads.schedule, self.pk, self.header_image_hash))
+
+    def unique_published_slug(self):
+        """
+        Return `slug`, or when the entry is published and another published entry already has it, the
+        first unused `slug-2`, `slug-3`... cut to the field's `max_length`, like migration 0011 renamed
+        the entries that shared a slug.
+        """
+        if self.__dict__.get("status") != 1 or "slug" not in self.__dict__:
+            return self.slug
+        others = Entry.objects.exclude(pk=self.pk)
+        if not others.filter(status=1, slug=self.slug).exists():
+            return self.slug
+        max_length = self._meta.get_field("slug").max_length
+        number = 1
+        while True:
+            number += 1
+            suffix = f"-{number}"
+            candidate = f"{self.slug[: max_length - len(suffix)]}{suffix}"
+            if not others.filter(slug=candidate).exists():
+                return candidate
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded markdown so saves that don't touch `content` skip re-rendering, and the
+        # loaded row so saves leave its counters alone, and the loaded image so they skip hashing it,
+        # and the loaded text and status so they only recompute related entries when those change.
+        instance._rendered_source = instance.__dict__.get("content")
+        instance._persisted_pk = instance.pk
+        instance._stored_image_name = instance.__dict__.get("header_image") and instance.header_image.name
+        instance._related_source = instance._loaded_related_fields()
+        return instance
+
+    def _loaded_related_fields(self):
+        return {field: self.__dict__[field] for field in self.RELATED_FIELDS if field in self.__dict__}
+
+    def related_fields_changed(self):
+        """Return True if `RELATED_FIELDS` changed since the entry was loaded or saved, or it is new."""
+        if self._related_source is None or self.pk != self._persisted_pk:
+            return True
+        loaded = self._related_source
+        return any(
+            field in self.__dict__ and (field not in loaded or self.__dict__[field] != loaded[field])
+            for field in self.RELATED_FIELDS
+        )
+
+    def render_content(self, force=False):
+        """
+        Refresh `content_html` when `content` (or the renderer) changed since the last render.
+
+        Returns True if the stored HTML was rebuilt.
+        """
+        fingerprint = content_fingerprint(self.content)
+        if not force and self.content_html and self.content_hash == fingerprint:
+            return False
+        self.content_html = render_markdown(self.content)
+        self.content_hash = fingerprint
+        return True
+
+    def get_content_html(self):
+        """Return the pre-rendered content, rendering on the fly for entries not yet backfilled."""
+        return self.content_html or render_markdown_cached(self.content)
+
+    def header_image_changed(self):
+        """
+        Refresh `header_image_hash` when a different header image was assigned since the last save.
+
+        Returns True if the image has to be uploaded to the CDN: it changed, or an earlier upload of
+        it is still pending, was lost or gave up.
+        """
+        if "header_image" not in self.__dict__ or not self.header_image:
+            return False
+        stored = self.header_image._committed and self.header_image.name == self._stored_image_name
+        if not (stored and self.header_image_hash):
+            self.header_image_hash = image_hash(self.header_image)
+        return self.header_image_hash != self.uploaded_image_hash
+
+    def build_header_image_urls(self):
+        """
+        Build the optimized URL and the responsive `srcset` of the uploaded header image.
+
+        Returns True if the stored URLs changed.
+        """
+        url, srcset = "", ""
+        if self.cdn_image_url and self.cdn_image_public_id:
+            image = CloudinaryImage(public_id=self.cdn_image_public_id)
+            url = image.build_url(**HEADER_IMAGE_TRANSFORMATION)
+            srcset = ", ".join(
+                f"{image.build_url(width=width, **HEADER_IMAGE_TRANSFORMATION)} {width}w"
+                for width in getattr(settings, "CLOUDINARY_RESPONSIVE_WIDTHS", ())
+            )
+        changed = (url, srcset) != (self.header_image_url, self.header_image_srcset)
+        self.header_image_url, self.header_image_srcset = url, srcset
+        return changed
 
     def get_header_image_optimized(self):
+        if self.header_image_url:
+            return self.header_image_url
         if self.cdn_image_url:
-            image = CloudinaryImage(
-                public_id=self.cdn_image_public_id,
-            ).build_url(
-                crop="fill",
-                quality="auto:good",
-                fetch_format="auto",
-            )
-            return image
-        else:
-            return self.header_image.url if self.header_image else None
+            # Uploaded before the URLs were stored: build it on the fly until `rebuild_header_image_urls` runs.
+            return CloudinaryImage(public_id=self.cdn_image_public_id).build_url(**HEADER_IMAGE_TRANSFORMATION)
+        return self.header_image.url if self.header_image else None
 
     def get_all_comments(self):
         return self.comments.filter(active=True)
 
-    @property
-    def like_count(self):
-        return self.likes.filter(type="like").count()
-
-    @property
-    def dislike_count(self):
-        return self.likes.filter(type="dislike").count()
-
 
 # EntryVersion model
 class EntryVersion(Model):
@@ -1,20 +1,26 @@
-import logging
-
 from django.db import models
 from django.utils import timezone
 
+# Upper bounds, in seconds, of the response time histogram buckets. A last, open-ended bucket
+# (index `len(LATENCY_BUCKETS)`) counts everything slower.
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60)
+
 
 class GeminiApiUsage(models.Model):
     """
     Model to track Gemini API usage metrics.
+
+    Response times are stored as a sum and a count, plus a histogram in `GeminiApiLatencyBucket`,
+    so the average is exact and percentiles can be estimated without keeping every sample.
     """
 
-    date = models.DateField(default=timezone.now)
+    date = models.DateField(default=timezone.now, unique=True)
     request_count = models.IntegerField(default=0)
     successful_requests = models.IntegerField(default=0)
     failed_requests = models.IntegerField(default=0)
     tokens_used = models.IntegerField(default=0)
-    average_response_time = models.FloatField(default=0)
+    total_response_time = models.FloatField(default=0)
+    timed_requests = models.IntegerField(default=0)
     model_name = models.CharField(max_length=100, default="gemini-2.5-pro-preview-03-25")
     last_error_message = models.TextField(blank=True, null=True)
     last_updated = models.DateTimeField(auto_now=True)
@@ -27,11 +33,43 @@ class GeminiApiUsage(models.Model):
     def __str__(self):
         return f"Gemini API Usage - {self.date}"
 
+    @property
+    def average_response_time(self):
+        if not self.timed_requests:
+            return 0
+        return self.total_response_time / self.timed_requests
+
+    def response_time_percentile(self, percentile):
+        """
+        Estimate a response time percentile from the histogram.
+
+        Args:
+            percentile (float): Percentile to estimate, between 0 and 100.
+
+        Returns:
+            float or None: Upper bound (in seconds) of the bucket holding the percentile, `inf` if it
+            falls in the open-ended bucket, or None when no response time was recorded.
+        """
+        counts = {bucket.bucket: bucket.count for bucket in self.latency_buckets.all()}
+        total = sum(counts.values())
+        if not total:
+            return None
+        threshold = total * percentile / 100
+        seen = 0
+        for bucket, upper_bound in enumerate(LATENCY_BUCKETS):
+            seen += counts.get(bucket, 0)
+            if seen >= threshold:
+                return upper_bound
+        return float("inf")
+
     @classmethod
     def log_request(cls, successful=True, tokens=0, response_time=0, model_name=None, error_message=None):
         """
         Log a Gemini API request.
 
+        The request is buffered in memory and written with atomic updates on the next flush of
+        the usage recorder, so concurrent workers never lose increments.
+
         Args:
             successful (bool): Whether the request was successful
             tokens (int): Number of tokens used in the request
@@ -39,43 +77,31 @@ class GeminiApiUsage(models.Model):
             model_name (str): Name of the model used
             error_message (str): Error message if the request failed
         """
-        logger = logging.getLogger("gemini_api_usage")
-        today = timezone.now().date()
-
-        # Get or create today's usage record
-        usage, created = cls.objects.get_or_create(date=today)
-
-        # Update metrics
-        usage.request_count += 1
-        if successful:
-            usage.successful_requests += 1
-        else:
-            usage.failed_requests += 1
-            usage.last_error_message = error_message
-
-        # Update token usage
-        usage.tokens_used += tokens
-
-        # Update average response time
-        if response_time > 0:
-            if usage.average_response_time == 0:
-                usage.average_response_time = response_time
-            else:
-                # Calculate new average
-                total_requests = usage.successful_requests + usage.failed_requests
-                usage.average_response_time = (
-                    (usage.average_response_time * (total_requests - 1)) + response_time
-                ) / total_requests
-
-        # Update model name if provided
-        if model_name:
-            usage.model_name = model_name
-
-        usage.save()
-
-        logger.info(
-            f"Gemini API request logged: success={successful}, tokens={tokens}, "
-            f"response_time={response_time}, model={model_name or usage.model_name}"
+        from blog_app.utils.gemini_usage_recorder import gemini_usage_recorder
+
+        gemini_usage_recorder.record(
+            successful=successful,
+            tokens=tokens,
+            response_time=response_time,
+            model_name=model_name,
+            error_message=error_message,
         )
 
-        return usage
+
+class GeminiApiLatencyBucket(models.Model):
+    """
+    Number of requests of a given day whose response time fell in one `LATENCY_BUCKETS` bucket.
+    """
+
+    usage = models.ForeignKey(GeminiApiUsage, on_delete=models.CASCADE, related_name="latency_buckets")
+    bucket = models.PositiveSmallIntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("usage", "bucket")
+        ordering = ["usage", "bucket"]
+
+    def __str__(self):
+        if self.bucket < len(LATENCY_BUCKETS):
+            return f"{self.usage.date} <= {LATENCY_BUCKETS[self.bucket]}s: {self.count}"
+        return f"{self.usage.date} > {LATENCY_BUCKETS[-1]}s: {self.count}"
@@ -1,5 +1,6 @@
 from blog_app.models.entry import Entry
-from django.db.models import CASCADE, CharField, DateTimeField, ForeignKey, Model
+from django.db.models import CASCADE, CharField, DateTimeField, F, ForeignKey, Index, Model, UniqueConstraint
+from django.db.models.functions import Greatest
 from user_app.models.cryptek_user import CryptekUser
 
 
@@ -10,6 +11,11 @@ class Like(Model):
         (LIKE, "Like"),
         (DISLIKE, "Dislike"),
     ]
+    # Denormalized `Entry` counter holding the total of each vote type.
+    COUNTER_FIELDS = {
+        LIKE: "like_count",
+        DISLIKE: "dislike_count",
+    }
 
     entry = ForeignKey(Entry, on_delete=CASCADE, related_name="likes")
     user = ForeignKey(CryptekUser, on_delete=CASCADE, related_name="likes")
@@ -18,5 +24,45 @@ class Like(Model):
     user_agent = CharField(max_length=255, blank=True, null=True)
     ip_address = CharField(max_length=45, blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            Index(fields=["entry", "type"], name="like_entry_type_idx"),
+        ]
+        constraints = [
+            # One vote per user and entry; also the index of LikeView's vote lookup.
+            UniqueConstraint(fields=["entry", "user"], name="like_unique_entry_user"),
+        ]
+
     def __str__(self):
         return f"{self.user} {self.type}s {self.entry}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored vote, so a save that flips it moves it between the entry counters.
+        instance._stored_type = instance.__dict__.get("type")
+        return instance
+
+    @classmethod
+    def update_entry_counters(cls, entry_id, added=None, removed=None):
+        """
+        Apply a vote change to the counters of an entry with a single atomic UPDATE.
+
+        Counters never go below zero, even when a vote they never counted (e.g. one added before
+        the counters existed and not yet reconciled) is withdrawn.
+
+        Args:
+            entry_id (int): Primary key of the voted entry.
+            added (str): Type of the vote cast, if any.
+            removed (str): Type of the vote withdrawn, if any (the previous type when a vote is flipped).
+        """
+        if added == removed:
+            return
+        updates = {}
+        # Votes of a type without a counter (not a valid choice) aren't counted.
+        if added in cls.COUNTER_FIELDS:
+            updates[cls.COUNTER_FIELDS[added]] = F(cls.COUNTER_FIELDS[added]) + 1
+        if removed in cls.COUNTER_FIELDS:
+            updates[cls.COUNTER_FIELDS[removed]] = Greatest(F(cls.COUNTER_FIELDS[removed]) - 1, 0)
+        if updates:
+            Entry.objects.filter(pk=entry_id).update(**updates)
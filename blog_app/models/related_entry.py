@@ -0,0 +1,23 @@
+from blog_app.models.entry import Entry
+from django.db.models import CASCADE, FloatField, ForeignKey, Index, Model, PositiveSmallIntegerField, UniqueConstraint
+
+
+# Precomputed "related entries" of an entry, built by `blog_app.utils.related_entries`.
+class RelatedEntry(Model):
+    entry = ForeignKey(Entry, on_delete=CASCADE, related_name="related_links")
+    related = ForeignKey(Entry, on_delete=CASCADE, related_name="related_from")
+    # Position in the entry's list, 0 being the most similar.
+    rank = PositiveSmallIntegerField()
+    score = FloatField()
+
+    class Meta:
+        ordering = ("entry", "rank")
+        indexes = [
+            Index(fields=["entry", "rank"], name="related_entry_rank_idx"),
+        ]
+        constraints = [
+            UniqueConstraint(fields=["entry", "related"], name="related_entry_unique_pair"),
+        ]
+
+    def __str__(self):
+        return f"{self.entry} -> {self.related} ({self.score:.3f})"
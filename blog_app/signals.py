@@ -0,0 +1,194 @@
+from urllib.parse import urlencode
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.urls import reverse
+
+from blog_app.models.category import Category
+from blog_app.models.comment import Comment
+from blog_app.models.entry import Entry
+from blog_app.models.like import Like
+from blog_app.models.tag import Tag
+from blog_app.utils import full_text_search, related_entries
+from blog_app.utils.generation import ENTRIES, bump_generation
+from blog_app.utils.page_cache import bump_entry_page
+from blog_app.utils.suggestion_index import CATEGORY, ENTRY, TAG, Suggestion, entry_url, suggestion_index
+from user_app.models.cryptek_user import CryptekUser
+from user_app.models.profile import Profile
+
+# Entry fields that are part of its search document.
+SEARCHABLE_FIELDS = frozenset(("title", "overview", "content"))
+KEYWORD_KINDS = {Tag: TAG, Category: CATEGORY}
+# Author fields shown on post cards: the name (`CryptekUser.__str__`) and the profile picture.
+AUTHOR_FIELDS = {CryptekUser: frozenset(("username",)), Profile: frozenset(("profile_picture",))}
+
+
+def bump_entries_generation_on_commit():
+    """
+    Bump the entries generation again once the current transaction commits.
+
+    The first bump happens as soon as the change is made, but until the commit other workers still
+    read the old data and may cache it under the new generation; this second bump retires it.
+    """
+    transaction.on_commit(lambda: suggestion_index.adopt(bump_generation(ENTRIES)))
+
+
+# Full-text search documents.
+@receiver(post_save, sender=Entry)
+def index_saved_entry(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or (update_fields is not None and not SEARCHABLE_FIELDS.intersection(update_fields)):
+        return
+    full_text_search.index_entries([instance.pk])
+
+
+@receiver(post_delete, sender=Entry)
+def unindex_deleted_entry(sender, instance, **kwargs):
+    full_text_search.delete_documents([instance.pk])
+
+
+@receiver(m2m_changed, sender=Entry.tags.through)
+@receiver(m2m_changed, sender=Entry.categories.through)
+def index_retagged_entries(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and reverse:
+        # The cleared entries are gone by `post_clear`, so remember them now.
+        instance._cleared_entry_ids = list(instance.entries.values_list("pk", flat=True))
+    elif action in ("post_add", "post_remove"):
+        full_text_search.index_entries(pk_set if reverse else [instance.pk])
+        suggestion_index.adopt(bump_generation(ENTRIES))
+        bump_entries_generation_on_commit()
+    elif action == "post_clear":
+        full_text_search.index_entries(instance.__dict__.pop("_cleared_entry_ids", []) if reverse else [instance.pk])
+        suggestion_index.adopt(bump_generation(ENTRIES))
+        bump_entries_generation_on_commit()
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Category)
+def index_renamed_keyword_entries(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        full_text_search.index_entries(instance.entries.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Category)
+def remember_keyword_entries(sender, instance, **kwargs):
+    instance._keyword_entry_ids = list(instance.entries.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Category)
+def index_unkeyworded_entries(sender, instance, **kwargs):
+    full_text_search.index_entries(instance.__dict__.pop("_keyword_entry_ids", []))
+
+
+# Search suggestions and the entries generation.
+@receiver(post_save, sender=Entry)
+def suggest_saved_entry(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    generation = bump_generation(ENTRIES)
+    url = entry_url(instance.slug) if instance.status == 1 else None
+    if url:
+        suggestion_index.update(Suggestion(ENTRY, instance.pk, instance.title, url), generation)
+    else:
+        suggestion_index.remove(ENTRY, instance.pk, generation)
+    bump_entries_generation_on_commit()
+
+
+@receiver(post_delete, sender=Entry)
+def unsuggest_deleted_entry(sender, instance, **kwargs):
+    suggestion_index.remove(ENTRY, instance.pk, bump_generation(ENTRIES))
+    bump_entries_generation_on_commit()
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Category)
+def suggest_saved_keyword(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    url = f"{reverse('blog_app:search')}?{urlencode({'q': instance.name})}"
+    suggestion = Suggestion(KEYWORD_KINDS[sender], instance.pk, instance.name, url)
+    suggestion_index.update(suggestion, bump_generation(ENTRIES))
+    bump_entries_generation_on_commit()
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Category)
+def unsuggest_deleted_keyword(sender, instance, **kwargs):
+    suggestion_index.remove(KEYWORD_KINDS[sender], instance.pk, bump_generation(ENTRIES))
+    bump_entries_generation_on_commit()
+
+
+# Related entries.
+@receiver(post_save, sender=Entry)
+def relate_saved_entry(sender, instance, raw=False, **kwargs):
+    # Tags and categories are handled by `relate_retagged_entries`; other edits can't change the result.
+    if not raw and instance.related_changed:
+        related_entries.update_related_entries_on_commit([instance.pk])
+
+
+@receiver(pre_delete, sender=Entry)
+def unrelate_deleted_entry(sender, instance, **kwargs):
+    related_entries.update_related_entries_on_commit([instance.pk])
+
+
+@receiver(m2m_changed, sender=Entry.tags.through)
+@receiver(m2m_changed, sender=Entry.categories.through)
+def relate_retagged_entries(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ("post_add", "post_remove"):
+        related_entries.update_related_entries_on_commit(pk_set if reverse else [instance.pk])
+    elif action == "pre_clear":
+        related_entries.update_related_entries_on_commit(
+            instance.entries.values_list("pk", flat=True) if reverse else [instance.pk]
+        )
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Category)
+def relate_unkeyworded_entries(sender, instance, **kwargs):
+    related_entries.update_related_entries_on_commit(instance.entries.values_list("pk", flat=True))
+
+
+# Vote counters.
+@receiver(post_save, sender=Like)
+def count_saved_vote(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    Like.update_entry_counters(
+        instance.entry_id, added=instance.type, removed=None if created else getattr(instance, "_stored_type", None)
+    )
+    instance._stored_type = instance.type
+
+
+@receiver(post_delete, sender=Like)
+def uncount_deleted_vote(sender, instance, **kwargs):
+    Like.update_entry_counters(instance.entry_id, removed=getattr(instance, "_stored_type", instance.type))
+
+
+# Post cards and pages showing the author.
+@receiver(post_save, sender=CryptekUser)
+@receiver(post_save, sender=Profile)
+def expire_author_cards(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if created or raw or (update_fields is not None and not AUTHOR_FIELDS[sender].intersection(update_fields)):
+        return
+    user_id = instance.pk if sender is CryptekUser else instance.user_id
+    if Entry.objects.filter(author_id=user_id).exists():
+        # Suggestions don't show authors: the index stays current.
+        suggestion_index.adopt(bump_generation(ENTRIES))
+        bump_entries_generation_on_commit()
+
+
+# Cached entry pages.
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Like)
+@receiver(post_delete, sender=Like)
+def expire_entry_page(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    slug = Entry.objects.filter(pk=instance.entry_id).values_list("slug", flat=True).first()
+    if slug is not None:
+        bump_entry_page(slug)
+        # Like the entries generation: retire a page cached from data read before the commit.
+        transaction.on_commit(lambda: bump_entry_page(slug))
@@ -1,3 +1,17 @@
+from .code_tip_provider_test import *
+from .comment_tree_test import *
 from .factory_tests import *
+from .fragment_cache_test import *
+from .full_text_search_test import *
+from .gemini_usage_recorder_test import *
+from .header_image_uploads_test import *
+from .header_image_urls_test import *
+from .http_validators_test import *
 from .model_tests import *
+from .page_cache_test import *
+from .query_plan_test import *
+from .related_entries_test import *
+from .search_cache_test import *
+from .suggestion_index_test import *
+from .trigram_search_test import *
 from .view_tests import *
@@ -0,0 +1,106 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from blog_app.models.code_tip import CodeTip
+from blog_app.utils.code_tip_provider import (
+    LOCK_CACHE_KEY,
+    NO_TIP,
+    POOL_CACHE_KEY,
+    TIP_CACHE_KEY,
+    TIP_FIELDS,
+    CodeTipProvider,
+)
+
+
+class CodeTipProviderTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.provider = CodeTipProvider(ttl=60, pool_size=2, refresh_ahead=10, background=False)
+
+    def test_cold_start_generates_tip_and_fills_pool(self):
+        tip = self.provider.get_tip()
+        self.assertEqual(tip["title"], "Test Tip")
+        self.assertEqual(len(cache.get(POOL_CACHE_KEY)), 2)
+
+    def test_stale_tip_is_served_and_rotated_from_pool(self):
+        stale = {"title": "Old", "description": "", "code": ""}
+        fresh = {"title": "Pooled", "description": "", "code": ""}
+        cache.set(TIP_CACHE_KEY, {"tip": stale, "fresh_until": time.time() - 1}, timeout=None)
+        cache.set(POOL_CACHE_KEY, [fresh], timeout=None)
+
+        with mock.patch.object(CodeTipProvider, "schedule_refresh") as schedule_refresh:
+            self.assertEqual(self.provider.get_tip(), stale)
+        schedule_refresh.assert_called_once()
+
+        self.provider.refresh()
+        self.assertEqual(cache.get(TIP_CACHE_KEY)["tip"], fresh)
+
+    def test_refresh_is_single_flight(self):
+        cache.add(LOCK_CACHE_KEY, "another-worker")
+        with mock.patch("blog_app.utils.code_tip_provider.CodeTip.generate_code_tip") as generate:
+            self.assertFalse(self.provider.refresh())
+        generate.assert_not_called()
+
+    def test_failed_generation_falls_back_to_placeholder(self):
+        error_tip = {"title": "Error al obtener tip de Gemini", "description": "boom", "code": ""}
+        with mock.patch("blog_app.utils.code_tip_provider.CodeTip.generate_code_tip", return_value=error_tip):
+            self.assertEqual(self.provider.get_tip(), NO_TIP)
+        self.assertIsNone(cache.get(TIP_CACHE_KEY))
+
+    def test_failed_generation_backs_off(self):
+        with mock.patch(
+            "blog_app.utils.code_tip_provider.CodeTip.generate_code_tip", side_effect=RuntimeError("down")
+        ) as generate:
+            self.provider.get_tip()
+            self.provider.get_tip()
+        generate.assert_called_once()
+
+        self.provider._next_attempt_at = 0
+        self.assertEqual(self.provider.get_tip()["title"], "Test Tip")
+
+    def test_one_background_refresh_per_process(self):
+        provider = CodeTipProvider(ttl=60, pool_size=2, background=True)
+        with mock.patch("blog_app.utils.code_tip_provider.threading.Thread") as thread:
+            provider.get_tip()
+            provider.get_tip()
+        thread.assert_called_once()
+
+
+class CodeTipFallbackTestCase(TestCase):
+    def setUp(self):
+        self.provider = CodeTipProvider(background=False, fallback_pool_size=5, fallback_pool_ttl=60)
+
+    def test_fallback_skips_failed_tips(self):
+        CodeTip.objects.create(title="Broken", description="", code="", error_message="boom")
+        CodeTip.objects.create(title="Valid", description="A tip", code="print(1)")
+        CodeTip.objects.create(title="Also broken", description="", code="", error_message="boom")
+
+        for _ in range(10):
+            self.provider._fallback_pool_expires = 0
+            self.assertEqual(self.provider.fallback_tip()["title"], "Valid")
+
+    def test_fallback_only_loads_displayed_fields(self):
+        CodeTip.objects.create(title="Valid", description="A tip", code="print(1)", gemini_raw_response="x" * 1000)
+        self.assertEqual(set(self.provider.fallback_tip()), set(TIP_FIELDS))
+
+    def test_fallback_rotation_is_served_from_memory(self):
+        CodeTip.objects.create(title="Valid", description="A tip", code="print(1)")
+        self.provider.fallback_tip()
+        with self.assertNumQueries(0):
+            self.provider.fallback_tip()
+
+    def test_fallback_bounds_come_from_the_primary_key(self):
+        CodeTip.objects.create(title="Valid", description="A tip", code="print(1)")
+        with CaptureQueriesContext(connection) as queries:
+            self.provider.fallback_tip()
+        bounds = [query["sql"] for query in queries if "MAX(" in query["sql"].upper()]
+        self.assertEqual(len(bounds), 1)
+        self.assertNotIn("WHERE", bounds[0].upper())
+
+    def test_fallback_without_tips(self):
+        self.assertEqual(self.provider.fallback_tip(), NO_TIP)
@@ -0,0 +1,125 @@
+import json
+
+from blog_app.factories.comment_factory import CommentFactory
+from blog_app.factories.entry_factory import EntryFactory
+from blog_app.utils.comment_tree import CommentTree
+from blog_app.utils.json_stream import stream_json_page
+from blog_app.views.comment_view import CommentView
+from django.test import RequestFactory, TestCase
+
+
+class CommentTreeTestCase(TestCase):
+    def setUp(self):
+        self.entry = EntryFactory.create(status=1)
+        self.root = CommentFactory.create(entry=self.entry)
+        self.reply = CommentFactory.create(entry=self.entry, parent=self.root)
+        self.nested = CommentFactory.create(entry=self.entry, parent=self.reply)
+        self.deepest = CommentFactory.create(entry=self.entry, parent=self.nested)
+        self.other_root = CommentFactory.create(entry=self.entry)
+        CommentFactory.create(entry=self.entry, parent=self.root, active=False)
+        CommentFactory.create()
+
+    def test_tree_is_loaded_in_one_query(self):
+        with self.assertNumQueries(1):
+            tree = CommentTree.for_entry(self.entry)
+            thread = tree.threads[0]
+            reply = thread.thread_replies[0]
+            self.assertEqual(reply.parent, thread)
+            self.assertEqual([comment.pk for comment in reply.thread_replies], [self.nested.pk])
+            self.assertEqual(reply.user.username, self.reply.user.username)
+            tree.serialize(thread)
+
+        self.assertEqual([thread.pk for thread in tree.threads], [self.root.pk, self.other_root.pk])
+        self.assertEqual(tree.count, 5)
+
+    def test_hidden_comments_are_left_out(self):
+        tree = CommentTree.for_entry(self.entry)
+        self.assertEqual(len(tree.threads[0].thread_replies), 1)
+
+    def test_replies_to_hidden_comments_become_threads(self):
+        self.reply.active = False
+        self.reply.save()
+        tree = CommentTree.for_entry(self.entry)
+        self.assertEqual([thread.pk for thread in tree.threads], [self.root.pk, self.nested.pk, self.other_root.pk])
+
+    def test_depth_limit_flattens_deeper_replies(self):
+        tree = CommentTree.for_entry(self.entry)
+        serialized = tree.serialize(tree.threads[0], max_depth=1)
+        reply = serialized["replies"][0]
+        self.assertEqual(reply["depth"], 1)
+        self.assertEqual([comment["id"] for comment in reply["replies"]], [self.nested.pk, self.deepest.pk])
+        self.assertTrue(all(comment["replies"] == [] for comment in reply["replies"]))
+        self.assertEqual(reply["reply_count"], 2)
+
+    def test_threads_are_paginated(self):
+        tree = CommentTree.for_entry(self.entry)
+        threads, has_next = tree.page(1, per_page=1)
+        self.assertEqual([thread.pk for thread in threads], [self.root.pk])
+        self.assertTrue(has_next)
+        threads, has_next = tree.page(2, per_page=1)
+        self.assertEqual([thread.pk for thread in threads], [self.other_root.pk])
+        self.assertFalse(has_next)
+
+
+class CommentViewTreeTestCase(TestCase):
+    def setUp(self):
+        self.entry = EntryFactory.create(status=1)
+        self.root = CommentFactory.create(entry=self.entry)
+        CommentFactory.create_batch(3, entry=self.entry, parent=self.root)
+
+    def get(self, **params):
+        request = RequestFactory().get("/", params)
+        return CommentView.as_view()(request, slug=self.entry.slug)
+
+    def test_get_returns_threads(self):
+        # Validators, entry and tree.
+        with self.assertNumQueries(3):
+            response = self.get()
+        data = json.loads(response.content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data["count"], 4)
+        self.assertFalse(data["has_next"])
+        self.assertEqual(data["comments"][0]["entry_id"], self.entry.pk)
+        self.assertEqual(len(data["comments"][0]["replies"]), 3)
+
+    def test_get_invalid_page(self):
+        self.assertEqual(self.get(page="abc").status_code, 400)
+
+    def test_flat_format_keeps_the_previous_response(self):
+        hidden = CommentFactory.create(entry=self.entry, active=False)
+        data = json.loads(self.get(format="flat").content)
+        self.assertEqual(set(data), {"success", "comments"})
+        self.assertEqual(len(data["comments"]), 5)
+        self.assertIn(hidden.pk, [comment["id"] for comment in data["comments"]])
+        self.assertEqual(data["comments"][0]["entry_id"], self.entry.pk)
+
+
+class CommentViewStreamTestCase(TestCase):
+    def setUp(self):
+        self.entry = EntryFactory.create(status=1)
+        self.comments = CommentFactory.create_batch(5, entry=self.entry)
+        CommentFactory.create(entry=self.entry, active=False)
+
+    def get(self, **params):
+        request = RequestFactory().get("/", {"stream": 1, **params})
+        response = CommentView.as_view()(request, slug=self.entry.slug)
+        self.assertTrue(response.streaming)
+        return json.loads(b"".join(response.streaming_content))
+
+    def test_stream_pages_with_after_cursor(self):
+        first = self.get(limit=3)
+        self.assertEqual([comment["id"] for comment in first["comments"]], [c.pk for c in self.comments[:3]])
+        self.assertEqual(first["next"], self.comments[2].pk)
+        self.assertEqual(first["comments"][0]["username"], self.comments[0].user.username)
+        self.assertEqual(first["comments"][0]["entry_id"], self.entry.pk)
+
+        second = self.get(limit=3, after=first["next"])
+        self.assertEqual([comment["id"] for comment in second["comments"]], [c.pk for c in self.comments[3:]])
+        self.assertIsNone(second["next"])
+
+    def test_stream_json_page_batches(self):
+        for total in range(6):
+            rows = [{"id": index} for index in range(total)]
+            document = json.loads("".join(stream_json_page(iter(rows), page_size=4, batch_size=2)))
+            self.assertEqual(document["results"], rows[:4])
+            self.assertEqual(document["next"], 3 if total > 4 else None)
@@ -0,0 +1,67 @@
+from blog_app.factories.category_factory import CategoryFactory
+from blog_app.factories.entry_factory import EntryFactory
+from blog_app.models.entry import Entry
+from blog_app.utils.fragment_cache import fragment_cache, render_entry_fragments
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+
+class FragmentCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        fragment_cache.local.clear()
+        self.category = CategoryFactory.create(name="Databases")
+        self.entries = EntryFactory.create_batch(3, status=1)
+        for entry in self.entries:
+            entry.categories.add(self.category)
+
+    @staticmethod
+    def fresh_entries():
+        return list(Entry.objects.filter(status=1).order_by("-created_at", "-id"))
+
+    def fragments(self):
+        return render_entry_fragments([("post_card.html", entry) for entry in self.fresh_entries()])
+
+    def test_misses_are_rendered_in_bulk_and_hits_without_queries(self):
+        entries = self.fresh_entries()
+        # Categories and authors of every missing card: one query each.
+        with self.assertNumQueries(2):
+            rendered = render_entry_fragments([("post_card.html", entry) for entry in entries])
+        self.assertIn("Databases", rendered[0])
+
+        entries = self.fresh_entries()
+        with self.assertNumQueries(0):
+            self.assertEqual(render_entry_fragments([("post_card.html", entry) for entry in entries]), rendered)
+        self.assertEqual(fragment_cache.local.hits, 3)
+
+    def test_cards_follow_entry_and_category_changes(self):
+        self.fragments()
+        self.category.name = "Storage"
+        self.category.save()
+        self.assertIn("Storage", self.fragments()[0])
+
+        entry = self.entries[0]
+        entry.title = "Renamed entry"
+        entry.save()
+        self.assertTrue(any("Renamed entry" in card for card in self.fragments()))
+
+    def test_cards_follow_author_renames(self):
+        author = self.entries[0].author
+        self.fragments()
+        author.username = "renamed-author"
+        author.save()
+        self.assertTrue(any("renamed-author" in card for card in self.fragments()))
+
+    @override_settings(SHARED_CACHE=False)
+    def test_cards_are_not_cached_without_shared_counters(self):
+        rendered = self.fragments()
+        self.assertEqual(self.fragments(), rendered)
+        self.assertEqual(len(fragment_cache.local), 0)
+
+    def test_home_page_renders_cached_cards(self):
+        response = self.client.get(reverse("blog_app:home"))
+        self.assertEqual(response.status_code, 200)
+        for entry in self.entries:
+            self.assertContains(response, entry.get_absolute_url())
+        self.assertEqual(len(response.context["entry_cards"]), 3)
@@ -0,0 +1,67 @@
+from unittest import skipUnless
+
+from blog_app.factories.category_factory import CategoryFactory
+from blog_app.factories.entry_factory import EntryFactory
+from blog_app.factories.tag_factory import TagFactory
+from blog_app.utils import full_text_search
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+
+@skipUnless(full_text_search.is_supported(connection), "The database backend has no full-text search index.")
+class FullTextSearchTestCase(TestCase):
+    def setUp(self):
+        self.in_title = EntryFactory.create(status=1, title="Profiling Django views", content="Nothing here.")
+        self.in_content = EntryFactory.create(
+            status=1, title="Weekly notes", content="Some thoughts on profiling with py-spy and cProfile."
+        )
+        self.draft = EntryFactory.create(status=0, title="Profiling drafts", content="Unpublished.")
+        self.unrelated = EntryFactory.create(status=1, title="Gardening", content="Tomatoes.")
+
+    def test_ranks_title_matches_first_and_skips_drafts(self):
+        ids = full_text_search.search_entry_ids("profiling")
+        self.assertEqual(ids, [self.in_title.pk, self.in_content.pk])
+
+    def test_matches_word_prefixes_and_stems(self):
+        self.assertEqual(full_text_search.search_entry_ids("profil"), [self.in_title.pk, self.in_content.pk])
+        self.assertEqual(full_text_search.search_entry_ids("tomato"), [self.unrelated.pk])
+
+    def test_operator_syntax_is_ignored(self):
+        self.assertEqual(full_text_search.search_entry_ids('"garden* ('), [self.unrelated.pk])
+        self.assertEqual(full_text_search.search_entry_ids("*** !!"), [])
+
+    def test_index_follows_edits_tags_and_deletes(self):
+        self.unrelated.content = "Tomatoes and profiling."
+        self.unrelated.save()
+        self.assertIn(self.unrelated.pk, full_text_search.search_entry_ids("profiling"))
+
+        tag = TagFactory.create(name="observability")
+        self.in_content.tags.add(tag)
+        self.assertEqual(full_text_search.search_entry_ids("observability"), [self.in_content.pk])
+        tag.name = "telemetry"
+        tag.save()
+        self.assertEqual(full_text_search.search_entry_ids("telemetry"), [self.in_content.pk])
+        tag.delete()
+        self.assertEqual(full_text_search.search_entry_ids("telemetry"), [])
+
+        category = CategoryFactory.create(name="Performance")
+        category.entries.add(self.unrelated)
+        self.assertEqual(full_text_search.search_entry_ids("performance"), [self.unrelated.pk])
+        category.entries.clear()
+        self.assertEqual(full_text_search.search_entry_ids("performance"), [])
+
+        self.in_title.delete()
+        self.assertEqual(full_text_search.search_entry_ids("django"), [])
+
+    def test_highlight_escapes_content(self):
+        snippet = full_text_search.highlight("<b>Profiling</b> & more", ["profil"])
+        self.assertEqual(snippet, "&lt;b&gt;<mark>Profiling</mark>&lt;/b&gt; &amp; more")
+
+    def test_search_view_returns_ranked_page_with_snippets(self):
+        response = self.client.get(reverse("blog_app:search"), {"q": "profiling"})
+        self.assertEqual(response.status_code, 200)
+        entries = list(response.context["object_list"])
+        self.assertEqual(entries, [self.in_title, self.in_content])
+        self.assertIn("<mark>profiling</mark>", entries[1].search_snippet)
+        self.assertContains(response, "<mark>profiling</mark>", html=False)
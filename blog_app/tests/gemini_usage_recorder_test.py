@@ -0,0 +1,65 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from blog_app.models.gemini_api_usage import GeminiApiUsage
+from blog_app.utils.gemini_usage_recorder import GeminiUsageRecorder
+
+
+class GeminiUsageRecorderTestCase(TestCase):
+    def setUp(self):
+        self.recorder = GeminiUsageRecorder(flush_interval=60)
+
+    def tearDown(self):
+        self.recorder.flush()
+
+    def test_requests_are_buffered_until_flush(self):
+        self.recorder.record(successful=True, tokens=10, response_time=1.5, model_name="gemini-test")
+        self.assertFalse(GeminiApiUsage.objects.exists())
+
+        self.recorder.flush()
+        usage = GeminiApiUsage.objects.get()
+        self.assertEqual(usage.request_count, 1)
+        self.assertEqual(usage.tokens_used, 10)
+        self.assertEqual(usage.model_name, "gemini-test")
+
+    def test_flushes_accumulate_atomically(self):
+        self.recorder.record(successful=True, tokens=10, response_time=1)
+        self.recorder.flush()
+        self.recorder.record(successful=False, tokens=5, response_time=3, error_message="boom")
+        self.recorder.record(successful=True, tokens=5, response_time=0.2)
+        self.recorder.flush()
+
+        usage = GeminiApiUsage.objects.get()
+        self.assertEqual(usage.request_count, 3)
+        self.assertEqual(usage.successful_requests, 2)
+        self.assertEqual(usage.failed_requests, 1)
+        self.assertEqual(usage.tokens_used, 20)
+        self.assertEqual(usage.last_error_message, "boom")
+        self.assertAlmostEqual(usage.average_response_time, 4.2 / 3)
+
+    def test_response_time_percentiles(self):
+        for response_time in (0.3, 0.4, 0.8, 4, 90):
+            self.recorder.record(successful=True, response_time=response_time)
+        self.recorder.flush()
+
+        usage = GeminiApiUsage.objects.get()
+        self.assertEqual(usage.response_time_percentile(50), 1)
+        self.assertEqual(usage.response_time_percentile(80), 5)
+        self.assertEqual(usage.response_time_percentile(100), float("inf"))
+
+    def test_failed_flushes_keep_the_counters(self):
+        self.recorder.record(successful=True, tokens=10, response_time=1)
+        with mock.patch.object(GeminiUsageRecorder, "_write", side_effect=RuntimeError("db down")):
+            self.recorder.flush()
+        self.recorder.record(successful=False, tokens=5, error_message="boom")
+        self.recorder.flush()
+
+        usage = GeminiApiUsage.objects.get()
+        self.assertEqual(usage.request_count, 2)
+        self.assertEqual(usage.tokens_used, 15)
+        self.assertEqual(usage.last_error_message, "boom")
+
+    def test_log_request_goes_through_the_recorder(self):
+        GeminiApiUsage.log_request(successful=True, tokens=3, response_time=0.5)
+        self.assertEqual(GeminiApiUsage.objects.get().tokens_used, 3)
@@ -0,0 +1,112 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from blog_app.factories.entry_factory import EntryFactory
+from blog_app.models.entry import Entry
+from blog_app.utils.header_image_uploads import HeaderImageUploadWorker, LocalUploader, header_image_uploads
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+
+class HeaderImageUploadsTestCase(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.uploads = header_image_uploads.uploader.uploads
+        self.uploads.clear()
+        self.entry = EntryFactory.create(status=1, slug="header-entry")
+
+    def save_image(self, content, name="header.png"):
+        self.entry.header_image = SimpleUploadedFile(name, content, content_type="image/png")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.entry.save()
+
+    def test_new_image_is_uploaded_after_commit(self):
+        self.save_image(b"first image")
+        self.assertEqual(self.uploads, {"header-entry": b"first image"})
+
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.cdn_image_public_id, "header-entry")
+        self.assertTrue(self.entry.cdn_image_url.endswith("/header-entry"))
+        self.assertIn("c_fill", self.entry.header_image_url)
+
+    def test_saves_without_a_new_image_skip_the_upload(self):
+        self.save_image(b"first image")
+        self.uploads.clear()
+
+        entry = Entry.objects.get(pk=self.entry.pk)
+        entry.title = "Typo fixed"
+        with self.captureOnCommitCallbacks(execute=True):
+            entry.save()
+        self.assertEqual(self.uploads, {})
+
+        # The same picture uploaded again under another name isn't sent to the CDN either.
+        self.save_image(b"first image", name="copy.png")
+        self.assertEqual(self.uploads, {})
+        self.assertTrue(Entry.objects.get(pk=self.entry.pk).cdn_image_url)
+
+    def test_replaced_image_is_uploaded(self):
+        self.save_image(b"first image")
+        first_hash = Entry.objects.get(pk=self.entry.pk).header_image_hash
+
+        self.save_image(b"second image")
+        self.assertEqual(self.uploads, {"header-entry": b"second image"})
+        self.assertNotEqual(Entry.objects.get(pk=self.entry.pk).header_image_hash, first_hash)
+
+    def test_failed_uploads_are_retried(self):
+        worker = HeaderImageUploadWorker(uploader=LocalUploader(failures=2), background=False, retry_delay=0)
+        self.entry.header_image = SimpleUploadedFile("header.png", b"image")
+        self.entry.save()
+
+        worker.schedule(self.entry.pk, self.entry.header_image_hash)
+        self.assertEqual(worker.stats()["retried"], 2)
+        self.assertEqual(worker.stats()["uploaded"], 1)
+        self.assertTrue(Entry.objects.get(pk=self.entry.pk).cdn_image_url)
+
+    def test_uploads_give_up_after_max_attempts(self):
+        worker = HeaderImageUploadWorker(
+            uploader=LocalUploader(failures=5), background=False, max_attempts=3, retry_delay=0
+        )
+        self.entry.header_image = SimpleUploadedFile("header.png", b"image")
+        self.entry.save()
+
+        worker.schedule(self.entry.pk, self.entry.header_image_hash)
+        self.assertEqual(worker.stats()["failed"], 1)
+        self.assertIsNone(Entry.objects.get(pk=self.entry.pk).cdn_image_url)
+
+    def test_superseded_uploads_are_dropped(self):
+        worker = HeaderImageUploadWorker(uploader=LocalUploader(), background=False)
+        self.entry.header_image = SimpleUploadedFile("header.png", b"image")
+        self.entry.save()
+
+        worker.schedule(self.entry.pk, "0" * 64)
+        self.assertEqual(worker.stats()["superseded"], 1)
+        self.assertEqual(worker.uploader.uploads, {})
+
+    def test_lost_uploads_are_scheduled_again(self):
+        with mock.patch.object(header_image_uploads, "schedule"):
+            self.save_image(b"image")
+        self.assertEqual(self.uploads, {})
+
+        entry = Entry.objects.get(pk=self.entry.pk)
+        entry.title = "Typo fixed"
+        with self.captureOnCommitCallbacks(execute=True):
+            entry.save()
+        self.assertEqual(self.uploads, {"header-entry": b"image"})
+        self.assertEqual(Entry.objects.get(pk=self.entry.pk).uploaded_image_hash, entry.header_image_hash)
+
+    def test_given_up_uploads_are_scheduled_again(self):
+        header_image_uploads.uploader.failures = header_image_uploads.max_attempts
+        with mock.patch.object(header_image_uploads, "retry_delay", 0):
+            self.save_image(b"image")
+        self.assertIsNone(Entry.objects.get(pk=self.entry.pk).cdn_image_url)
+
+        entry = Entry.objects.get(pk=self.entry.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            entry.save()
+        self.assertTrue(Entry.objects.get(pk=self.entry.pk).cdn_image_url)
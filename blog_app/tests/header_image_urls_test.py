@@ -0,0 +1,62 @@
+from io import StringIO
+
+from blog_app.factories.entry_factory import EntryFactory
+from blog_app.models.entry import Entry
+from blog_app.utils.generation import ENTRIES, get_generation
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+
+@override_settings(CLOUDINARY_RESPONSIVE_WIDTHS=[480, 960])
+class HeaderImageUrlsTestCase(TestCase):
+    def setUp(self):
+        self.entry = EntryFactory.create(status=1)
+        Entry.objects.filter(pk=self.entry.pk).update(
+            cdn_image_url="https://res.cloudinary.com/demo/image/upload/v1/header_images/cat.jpg",
+            cdn_image_public_id="header_images/cat",
+        )
+        self.entry.refresh_from_db()
+
+    def test_urls_are_built_once_and_stored(self):
+        self.assertTrue(self.entry.build_header_image_urls())
+        self.assertFalse(self.entry.build_header_image_urls())
+
+        self.assertIn("c_fill,f_auto,q_auto:good", self.entry.header_image_url)
+        self.assertTrue(self.entry.header_image_url.endswith("header_images/cat"))
+        variants = self.entry.header_image_srcset.split(", ")
+        self.assertEqual(len(variants), 2)
+        self.assertIn("w_480", variants[0])
+        self.assertTrue(variants[0].endswith(" 480w"))
+        self.assertTrue(variants[1].endswith(" 960w"))
+        self.assertEqual(self.entry.get_header_image_optimized(), self.entry.header_image_url)
+
+    def test_entries_without_stored_urls_fall_back_to_building_them(self):
+        self.assertEqual(self.entry.header_image_url, "")
+        self.assertIn("c_fill,f_auto,q_auto:good", self.entry.get_header_image_optimized())
+
+    def test_entries_without_upload_have_no_urls(self):
+        entry = EntryFactory.create()
+        self.assertFalse(entry.build_header_image_urls())
+        self.assertEqual((entry.header_image_url, entry.header_image_srcset), ("", ""))
+
+    def test_rebuild_command_stores_the_urls_and_invalidates_cached_pages(self):
+        generation = get_generation(ENTRIES)
+        call_command("rebuild_header_image_urls", stdout=StringIO())
+        self.entry.refresh_from_db()
+        self.assertIn("w_960", self.entry.header_image_srcset)
+        self.assertNotEqual(get_generation(ENTRIES), generation)
+
+        with override_settings(CLOUDINARY_RESPONSIVE_WIDTHS=[640]):
+            out = StringIO()
+            call_command("rebuild_header_image_urls", stdout=out)
+        self.entry.refresh_from_db()
+        self.assertIn("w_640", self.entry.header_image_srcset)
+        self.assertNotIn("w_960", self.entry.header_image_srcset)
+        self.assertIn("Rebuilt the header image URLs of 1 of", out.getvalue())
+
+    def test_detail_page_offers_the_variants(self):
+        call_command("rebuild_header_image_urls", stdout=StringIO())
+        response = self.client.get(self.entry.get_absolute_url())
+        self.assertContains(response, 'srcset="')
+        self.assertContains(response, "480w")
+        self.assertContains(response, 'sizes="24rem"')
@@ -0,0 +1,95 @@
+from blog_app.factories.comment_factory import CommentFactory
+from blog_app.factories.entry_factory import EntryFactory
+from blog_app.models.like import Like
+from blog_app.utils.code_tip_provider import code_tip_provider
+from blog_app.utils.page_cache import page_cache
+from blog_app.views.comment_view import CommentView
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from user_app.factory.cryptek_user_factory import CryptekUserFactory
+
+
+class ConditionalGetTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        page_cache.local.clear()
+        self.entry = EntryFactory.create(status=1)
+        self.url = self.entry.get_absolute_url()
+        # Store the code tip now rather than while the first page renders, after its validators.
+        code_tip_provider.get_tip()
+
+    def test_entry_detail_revalidation(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertTrue(response.has_header("Last-Modified"))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(self.url, headers={"If-Modified-Since": response["Last-Modified"]})
+        self.assertEqual(response.status_code, 304)
+
+        Like.update_entry_counters(self.entry.pk, added=Like.LIKE)
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_signed_in_readers_get_no_validators(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.client.force_login(CryptekUserFactory.create())
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
+        self.assertFalse(response.has_header("Last-Modified"))
+
+    def test_entry_validators_follow_the_code_tip(self):
+        response = self.client.get(self.url)
+        code_tip_provider._store({"title": "Next tip", "description": "", "code": ""})
+        self.assertEqual(self.client.get(self.url, headers={"If-None-Match": response["ETag"]}).status_code, 200)
+
+    @override_settings(PAGE_CACHE_TIMEOUT=60)
+    def test_cached_pages_answer_conditional_requests(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_sitemap_revalidation(self):
+        response = self.client.get("/sitemap.xml")
+        self.assertEqual(response.status_code, 200)
+        # `condition` computes both validators: the `Last-Modified` aggregate is the only query.
+        with self.assertNumQueries(1):
+            revalidated = self.client.get("/sitemap.xml", headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(revalidated.status_code, 304)
+        revalidated = self.client.get("/sitemap.xml", headers={"If-Modified-Since": response["Last-Modified"]})
+        self.assertEqual(revalidated.status_code, 304)
+
+        EntryFactory.create(status=1)
+        self.assertEqual(self.client.get("/sitemap.xml", headers={"If-None-Match": response["ETag"]}).status_code, 200)
+
+    @override_settings(SHARED_CACHE=False)
+    def test_validators_without_shared_counters(self):
+        response = self.client.get(self.url)
+        self.assertFalse(response.has_header("ETag"))
+        self.assertTrue(response.has_header("Last-Modified"))
+
+        response = self.client.get("/sitemap.xml")
+        with self.assertNumQueries(1):
+            revalidated = self.client.get("/sitemap.xml", headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(revalidated.status_code, 304)
+        self.entry.delete()
+        self.assertEqual(self.client.get("/sitemap.xml", headers={"If-None-Match": response["ETag"]}).status_code, 200)
+
+    def test_comments_revalidation(self):
+        CommentFactory.create(entry=self.entry)
+
+        def get(**headers):
+            request = RequestFactory().get("/", headers=headers)
+            return CommentView.as_view()(request, slug=self.entry.slug)
+
+        etag = get()["ETag"]
+        with self.assertNumQueries(1):
+            self.assertEqual(get(**{"If-None-Match": etag}).status_code, 304)
+        CommentFactory.create(entry=self.entry)
+        self.assertEqual(get(**{"If-None-Match": etag}).status_code, 200)
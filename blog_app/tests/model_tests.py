@@ -1,10 +1,17 @@
+from io import StringIO
+from unittest import mock
+
 from blog_app.factories.category_factory import CategoryFactory
 from blog_app.factories.comment_factory import CommentFactory
 from blog_app.factories.entry_factory import EntryFactory
 from blog_app.factories.like_factory import LikeFactory
 from blog_app.factories.multimedia_factory import MultimediaFactory
 from blog_app.factories.tag_factory import TagFactory
+from blog_app.models.entry import Entry
 from cryptek.test_and_check.base_model_test import BaseModelTestCase
+from django.core.management import call_command
+from django.test import TestCase
+from user_app.templatetags.markdown_extras import content_fingerprint
 
 
 class CategoryTestCase(BaseModelTestCase):
@@ -35,3 +42,55 @@ class MultimediaTestCase(BaseModelTestCase):
 class TagTestCase(BaseModelTestCase):
     class Meta:
         factory = TagFactory
+
+
+class EntryRenderedContentTestCase(TestCase):
+    def test_content_is_rendered_on_save(self):
+        entry = EntryFactory.create(content="# Title\n\nSome **bold** text.")
+        self.assertIn("<strong>bold</strong>", entry.content_html)
+        self.assertEqual(entry.content_hash, content_fingerprint(entry.content))
+
+    def test_unchanged_content_is_not_rendered_again(self):
+        entry = EntryFactory.create(content="Plain text.")
+        with mock.patch("blog_app.models.entry.render_markdown") as render:
+            entry.title = "Another title"
+            entry.save()
+        render.assert_not_called()
+
+    def test_rebuild_command_backfills_missing_html(self):
+        entry = EntryFactory.create(content="Some *text*.")
+        Entry.objects.filter(pk=entry.pk).update(content_html="", content_hash="")
+
+        call_command("rebuild_entry_html", stdout=StringIO())
+
+        entry.refresh_from_db()
+        self.assertIn("<em>text</em>", entry.content_html)
+
+
+class EntryPublishedSlugTestCase(TestCase):
+    def test_published_entries_get_a_numbered_slug(self):
+        first = EntryFactory.create(status=1, title="Profiling Django", slug="")
+        draft = EntryFactory.create(status=0, title="Profiling Django", slug="")
+        self.assertEqual(draft.slug, "profiling-django")
+
+        draft.status = 1
+        draft.save()
+        third = EntryFactory.create(status=1, title="Profiling Django", slug="")
+        self.assertEqual(
+            [entry.slug for entry in (first, draft, third)],
+            ["profiling-django", "profiling-django-2", "profiling-django-3"],
+        )
+        self.assertEqual(Entry.objects.get(pk=draft.pk).slug, "profiling-django-2")
+
+    def test_numbered_slugs_fit_the_field(self):
+        slug = "a" * 50
+        EntryFactory.create(status=1, slug=slug)
+        entry = EntryFactory.create(status=1, slug=slug)
+        self.assertEqual(entry.slug, f"{'a' * 48}-2")
+
+    def test_publishing_with_update_fields_saves_the_new_slug(self):
+        EntryFactory.create(status=1, slug="shared")
+        entry = EntryFactory.create(status=0, slug="shared")
+        entry.status = 1
+        entry.save(update_fields=["status"])
+        self.assertEqual(Entry.objects.get(pk=entry.pk).slug, "shared-2")
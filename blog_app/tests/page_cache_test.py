@@ -0,0 +1,114 @@
+import time
+from unittest import mock
+
+from blog_app.factories.comment_factory import CommentFactory
+from blog_app.factories.entry_factory import EntryFactory
+from blog_app.models.like import Like
+from blog_app.utils.page_cache import CACHE_STATUS_HEADER, page_cache
+from cryptek.caching import LRUCache, TieredCache
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from user_app.factory.cryptek_user_factory import CryptekUserFactory
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=60)
+class AnonymousPageCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        page_cache.local.clear()
+        self.entry = EntryFactory.create(status=1, title="Cached entry")
+        self.other = EntryFactory.create(status=1, title="Other entry")
+        self.url = self.entry.get_absolute_url()
+
+    def assertCacheStatus(self, url, status):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get(CACHE_STATUS_HEADER), status)
+        return response
+
+    def test_anonymous_hits_run_no_query(self):
+        self.assertCacheStatus(self.url, "miss")
+        with self.assertNumQueries(0):
+            response = self.assertCacheStatus(self.url, "hit")
+        self.assertContains(response, "Cached entry")
+
+        self.assertCacheStatus(reverse("blog_app:home"), "miss")
+        with self.assertNumQueries(0):
+            self.assertCacheStatus(reverse("blog_app:home"), "hit")
+
+    def test_query_string_is_part_of_the_key(self):
+        self.assertCacheStatus(self.url, "miss")
+        self.assertCacheStatus(f"{self.url}?utm_source=feed", "miss")
+
+    def test_entry_changes_expire_every_page(self):
+        self.assertCacheStatus(self.url, "miss")
+        self.assertCacheStatus(reverse("blog_app:home"), "miss")
+        self.other.title = "Renamed entry"
+        self.other.save()
+        self.assertCacheStatus(self.url, "miss")
+        self.assertContains(self.assertCacheStatus(reverse("blog_app:home"), "miss"), "Renamed entry")
+
+    def test_comments_and_likes_only_expire_their_entry_page(self):
+        other_url = self.other.get_absolute_url()
+        self.assertCacheStatus(self.url, "miss")
+        self.assertCacheStatus(other_url, "miss")
+
+        CommentFactory.create(entry=self.entry)
+        self.assertCacheStatus(self.url, "miss")
+        self.assertCacheStatus(other_url, "hit")
+
+        Like.objects.create(entry=self.entry, user=CryptekUserFactory.create())
+        self.assertCacheStatus(self.url, "miss")
+        self.assertCacheStatus(other_url, "hit")
+
+    @override_settings(PAGE_CACHE_TIMEOUT=1)
+    def test_pages_expire_after_the_timeout(self):
+        self.assertCacheStatus(self.url, "miss")
+        self.assertCacheStatus(self.url, "hit")
+        later = time.time() + 2, time.monotonic() + 2
+        with mock.patch("time.time", return_value=later[0]), mock.patch("time.monotonic", return_value=later[1]):
+            self.assertCacheStatus(self.url, "miss")
+
+    def test_authenticated_readers_bypass_the_cache(self):
+        self.assertCacheStatus(self.url, "miss")
+        self.client.force_login(CryptekUserFactory.create())
+        response = self.assertCacheStatus(self.url, None)
+        # Rendered for this reader: the vote buttons carry a CSRF token.
+        self.assertContains(response, 'id="like-button"')
+
+    @override_settings(PAGE_CACHE_TIMEOUT=0)
+    def test_disabled_by_default(self):
+        self.assertCacheStatus(self.url, None)
+        self.assertCacheStatus(self.url, None)
+
+    @override_settings(SHARED_CACHE=False)
+    def test_disabled_without_shared_counters(self):
+        self.assertCacheStatus(self.url, None)
+        self.assertCacheStatus(self.url, None)
+
+
+class ExpiringCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def advance(self, seconds):
+        return mock.patch("time.monotonic", return_value=time.monotonic() + seconds)
+
+    def test_lru_values_expire(self):
+        lru = LRUCache(maxsize=4, timeout=10)
+        lru.set("default", 1)
+        lru.set("short", 2, timeout=1)
+        lru.set("forever", 3, timeout=None)
+        with self.advance(5):
+            self.assertEqual((lru.get("default"), lru.get("short"), lru.get("forever")), (1, None, 3))
+            self.assertNotIn("short", lru)
+        with self.advance(3600):
+            self.assertEqual((lru.get("default"), lru.get("forever")), (None, 3))
+
+    def test_tiered_local_copies_expire(self):
+        tiered = TieredCache(prefix="expiring", timeout=1)
+        tiered.set("key", "value")
+        self.assertEqual(tiered.get("key"), "value")
+        with self.advance(2):
+            self.assertIsNone(tiered.local.get("key"))
@@ -0,0 +1,65 @@
+from unittest import skipUnless
+
+from blog_app.factories.comment_factory import CommentFactory
+from blog_app.factories.entry_factory import EntryFactory
+from blog_app.factories.like_factory import LikeFactory
+from blog_app.models.comment import Comment
+from blog_app.models.entry import Entry
+from blog_app.models.like import Like
+from django.db import connection
+from django.test import TestCase
+
+
+@skipUnless(
+    connection.vendor in ("sqlite", "postgresql"), "Query plan assertions are written for SQLite and PostgreSQL."
+)
+class HotQueryPlanTestCase(TestCase):
+    """The hot read paths must be answered from the indexes declared on the models, not by table scans."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.entry = EntryFactory.create(status=1)
+        EntryFactory.create_batch(5)
+        CommentFactory.create_batch(3, entry=cls.entry)
+        LikeFactory.create_batch(3, entry=cls.entry)
+
+    def setUp(self):
+        if connection.vendor == "postgresql":
+            # The test tables are tiny, so the planner would rightly prefer a sequential scan.
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertUsesIndex(self, queryset, *index_names):
+        plan = queryset.explain()
+        self.assertTrue(
+            any(name in plan for name in index_names),
+            f"Expected the plan to use one of {index_names}, got:\n{plan}",
+        )
+
+    def test_published_listing(self):
+        self.assertUsesIndex(
+            Entry.objects.filter(status=1).order_by("-created_at"),
+            "entry_published_created_idx",
+            "entry_status_created_idx",
+        )
+
+    def test_published_entry_by_slug(self):
+        self.assertUsesIndex(Entry.objects.filter(status=1, slug=self.entry.slug), "entry_unique_published_slug")
+
+    def test_active_comments_of_entry(self):
+        self.assertUsesIndex(
+            Comment.objects.filter(entry=self.entry, active=True).order_by("created_at"),
+            "comment_entry_visible_idx",
+            "comment_entry_active_idx",
+        )
+
+    def test_votes_of_entry_by_type(self):
+        self.assertUsesIndex(Like.objects.filter(entry=self.entry, type=Like.LIKE).values("pk"), "like_entry_type_idx")
+
+    def test_vote_of_user(self):
+        self.assertUsesIndex(
+            Like.objects.filter(entry=self.entry, user=self.entry.author),
+            "like_unique_entry_user",
+            # SQLite builds unique constraints into the table, behind an index it names itself.
+            "sqlite_autoindex_blog_app_like_1",
+        )
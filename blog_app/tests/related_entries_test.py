@@ -0,0 +1,119 @@
+from io import StringIO
+from unittest import mock
+
+import numpy as np
+from blog_app.factories.category_factory import CategoryFactory
+from blog_app.factories.entry_factory import EntryFactory
+from blog_app.factories.tag_factory import TagFactory
+from blog_app.models.entry import Entry
+from blog_app.models.related_entry import RelatedEntry
+from blog_app.utils import related_entries
+from blog_app.views.entry_view import EntryDetail
+from django.core.management import call_command
+from django.test import TestCase
+
+
+class RelatedEntriesTestCase(TestCase):
+    def setUp(self):
+        python, django, orm, garden = (TagFactory.create(name=name) for name in ("python", "django", "orm", "garden"))
+        self.backend = CategoryFactory.create(name="Backend")
+        self.outdoors = CategoryFactory.create(name="Outdoors")
+        self.django_orm = self.entry(python, django, orm)
+        self.django_views = self.entry(python, django)
+        self.python = self.entry(python)
+        self.garden = self.entry(garden, category=self.outdoors)
+        self.flowers = self.entry(garden, category=self.outdoors)
+        self.draft = self.entry(python, django, orm, status=0)
+
+    def entry(self, *tags, category=None, status=1):
+        entry = EntryFactory.create(status=status)
+        entry.tags.add(*tags)
+        entry.categories.add(category or self.backend)
+        return entry
+
+    def related(self, entry):
+        return list(RelatedEntry.objects.filter(entry=entry).values_list("related_id", flat=True))
+
+    def test_nearest_neighbours(self):
+        vectors = related_entries._normalize_rows(
+            np.array([[1, 1, 0], [1, 1, 1], [0, 0, 1], [0, 0, 0]], dtype=np.float32)
+        )
+        neighbours = related_entries.nearest_neighbours(vectors, [0, 2, 3], count=2)
+        self.assertEqual([other for other, _ in neighbours[0]], [1])
+        self.assertEqual([other for other, _ in neighbours[2]], [1])
+        self.assertEqual(neighbours[3], [])
+        self.assertAlmostEqual(neighbours[0][0][1], 2 / np.sqrt(6), places=5)
+
+    def test_rebuild_ranks_by_shared_tags_and_categories(self):
+        call_command("rebuild_related_entries", count=2, stdout=StringIO())
+        self.assertEqual(self.related(self.django_orm), [self.django_views.pk, self.python.pk])
+        self.assertEqual(self.related(self.django_views), [self.django_orm.pk, self.python.pk])
+        self.assertEqual(self.related(self.draft), [])
+        self.assertEqual(self.related(self.garden), [self.flowers.pk])
+        self.assertNotIn(self.draft.pk, RelatedEntry.objects.values_list("related_id", flat=True))
+
+    def test_content_vectors(self):
+        self.django_orm.content = "Querysets, select_related and prefetch_related explained with querysets."
+        self.django_orm.save()
+        self.python.content = "Why querysets are lazy: select_related versus prefetch_related."
+        self.python.save()
+        related = related_entries.compute_related([self.django_orm.pk], count=1, content_weight=2.0)
+        self.assertEqual(related[self.django_orm.pk][0][0], self.python.pk)
+
+    def test_update_only_recomputes_affected_rows(self):
+        related_entries.rebuild_related_entries(count=2)
+        untouched = RelatedEntry.objects.get(entry=self.garden, rank=0).pk
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.python.tags.set([TagFactory.create(name="typing")])
+        self.assertEqual(self.related(self.django_orm)[0], self.django_views.pk)
+        self.assertNotIn(self.python.pk, self.related(self.django_views)[:1])
+        self.assertEqual(RelatedEntry.objects.get(entry=self.garden, rank=0).pk, untouched)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.django_views.delete()
+        self.assertNotIn(self.django_views.pk, RelatedEntry.objects.values_list("related_id", flat=True))
+        self.assertEqual(self.related(self.django_orm), [self.python.pk])
+
+    def test_updates_only_build_vectors_of_entries_sharing_keywords(self):
+        everything = related_entries.compute_related(count=2)
+        with mock.patch.object(related_entries, "entry_vectors", wraps=related_entries.entry_vectors) as vectors:
+            related = related_entries.compute_related([self.garden.pk, self.draft.pk], count=2)
+        self.assertEqual(related, {self.garden.pk: everything[self.garden.pk]})
+        self.assertEqual(vectors.call_args.args[0], [self.garden.pk, self.flowers.pk])
+
+    def test_background_updates_are_merged(self):
+        related_entries.rebuild_related_entries(count=2)
+        updater = related_entries.RelatedEntriesUpdater(background=True)
+        with mock.patch("blog_app.utils.related_entries.threading.Thread") as thread:
+            updater.schedule([self.python.pk], related_entries.affected_entry_ids([self.python.pk]))
+            self.python.tags.set([TagFactory.create(name="typing")])
+            updater.schedule([self.garden.pk])
+        thread.assert_called_once()
+        self.assertEqual(updater.stats()["pending"], 2)
+
+        with mock.patch("blog_app.utils.related_entries.connections"):
+            updater._run()
+        self.assertEqual(updater.stats(), {"updates": 1, "failed": 0, "pending": 0})
+        self.assertNotIn(self.python.pk, self.related(self.django_views)[:1])
+
+    def test_only_relevant_saves_recompute(self):
+        entry = Entry.objects.get(pk=self.python.pk)
+        with mock.patch.object(related_entries, "update_related_entries_on_commit") as update:
+            entry.featured = True
+            entry.save()
+            update.assert_not_called()
+
+            entry.status = 0
+            entry.save()
+            update.assert_called_once_with([entry.pk])
+
+    def test_entry_detail_lists_related_entries_in_one_query(self):
+        related_entries.rebuild_related_entries(count=2)
+        with self.assertNumQueries(1):
+            related = [entry.pk for entry in EntryDetail.get_related_entries(self.django_orm)]
+        self.assertEqual(related, [self.django_views.pk, self.python.pk])
+
+        response = self.client.get(self.django_orm.get_absolute_url())
+        self.assertContains(response, "Related posts")
+        self.assertContains(response, self.django_views.get_absolute_url())
@@ -0,0 +1,86 @@
+from unittest import mock
+
+from blog_app.factories.entry_factory import EntryFactory
+from blog_app.factories.tag_factory import TagFactory
+from blog_app.utils import full_text_search
+from blog_app.utils.generation import ENTRIES, get_generation
+from blog_app.utils.search_cache import normalize_query, search_cache
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from user_app.factory.cryptek_user_factory import CryptekUserFactory
+
+
+class SearchResultCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        search_cache.clear()
+        self.entry = EntryFactory.create(status=1, title="Profiling Django views", content="Nothing here.")
+
+    def search(self, query):
+        response = self.client.get(reverse("blog_app:search"), {"q": query})
+        self.assertEqual(response.status_code, 200)
+        return [entry.pk for entry in response.context["object_list"]]
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query("  Django\tVIEWS "), "django views")
+
+    def test_identical_queries_are_searched_once(self):
+        with mock.patch.object(
+            full_text_search, "search_entry_ids", wraps=full_text_search.search_entry_ids
+        ) as search_entry_ids:
+            self.assertEqual(self.search("profiling"), [self.entry.pk])
+            self.assertEqual(self.search(" Profiling "), [self.entry.pk])
+        self.assertEqual(search_entry_ids.call_count, 1)
+        stats = search_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_ratio"]), (1, 1, 0.5))
+        self.assertIsNotNone(stats["saved_ms"])
+
+    @override_settings(SHARED_CACHE=False)
+    def test_cache_is_bypassed_without_shared_counters(self):
+        with mock.patch.object(
+            full_text_search, "search_entry_ids", wraps=full_text_search.search_entry_ids
+        ) as search_entry_ids:
+            self.search("profiling")
+            self.search("profiling")
+        self.assertEqual(search_entry_ids.call_count, 2)
+        self.assertEqual(search_cache.stats()["size"], 0)
+
+    def test_entry_tag_and_category_changes_invalidate_results(self):
+        self.assertEqual(self.search("observability"), [])
+
+        other = EntryFactory.create(status=1, title="Observability basics", content="Tracing.")
+        self.assertEqual(self.search("observability"), [other.pk])
+
+        tag = TagFactory.create(name="observability")
+        self.entry.tags.add(tag)
+        self.assertCountEqual(self.search("observability"), [other.pk, self.entry.pk])
+
+        other.status = 0
+        other.save()
+        self.assertEqual(self.search("observability"), [self.entry.pk])
+        self.assertEqual(search_cache.stats()["hits"], 0)
+
+    def test_generation_moves_again_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.entry.save()
+        generation = get_generation(ENTRIES)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(get_generation(ENTRIES), generation + 1)
+
+    def test_metrics_view_is_staff_only(self):
+        self.search("profiling")
+        url = reverse("metrics")
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        user = CryptekUserFactory.create()
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        user.is_staff = True
+        user.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["search_cache"]["misses"], 1)
+        self.assertIn("markdown_render_cache", response.json())
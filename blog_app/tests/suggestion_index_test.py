@@ -0,0 +1,96 @@
+from blog_app.factories.category_factory import CategoryFactory
+from blog_app.factories.entry_factory import EntryFactory
+from blog_app.factories.tag_factory import TagFactory
+from blog_app.models.entry import Entry
+from blog_app.utils.generation import ENTRIES, bump_generation
+from blog_app.utils.suggestion_index import CATEGORY, ENTRY, TAG, Suggestion, SuggestionIndex, suggestion_index
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+
+class SuggestionIndexTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.entry = EntryFactory.create(status=1, title="Profiling Django views")
+        self.draft = EntryFactory.create(status=0, title="Profiling drafts")
+        self.tag = TagFactory.create(name="Performance")
+        self.category = CategoryFactory.create(name="Café culture")
+        self.index = SuggestionIndex(check_interval=60)
+
+    def labels(self, prefix):
+        return [(suggestion.kind, suggestion.label) for suggestion in self.index.suggest(prefix)]
+
+    def test_matches_any_word_prefix_without_queries(self):
+        self.index.ensure_fresh()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.labels("prof"), [(ENTRY, "Profiling Django views")])
+            self.assertEqual(self.labels("VIEW"), [(ENTRY, "Profiling Django views")])
+            self.assertEqual(self.labels("perf"), [(TAG, "Performance")])
+            self.assertEqual(self.labels("cafe"), [(CATEGORY, "Café culture")])
+            self.assertEqual(self.labels("zzz"), [])
+            self.assertEqual(self.labels("  "), [])
+
+    def test_incremental_updates(self):
+        self.index.ensure_fresh()
+        suggestion = Suggestion(ENTRY, self.entry.pk, "Tracing Django views", self.entry.get_absolute_url())
+        self.index.update(suggestion, bump_generation(ENTRIES))
+        self.assertEqual(self.labels("prof"), [])
+        self.assertEqual(self.labels("trac"), [(ENTRY, "Tracing Django views")])
+        self.index.remove(TAG, self.tag.pk, bump_generation(ENTRIES))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.labels("perf"), [])
+
+    def test_other_worker_changes_trigger_rebuild(self):
+        self.index.ensure_fresh()
+        EntryFactory.create(status=1, title="Profiling queries")
+        # Simulate a change made by another process: the generation moves by more than one step.
+        bump_generation(ENTRIES)
+        self.index._checked_at = 0
+        self.assertEqual(self.labels("prof"), [(ENTRY, "Profiling Django views"), (ENTRY, "Profiling queries")])
+
+    @override_settings(SHARED_CACHE=False)
+    def test_every_check_rebuilds_without_shared_counters(self):
+        self.index.ensure_fresh()
+        # Another worker's change: its generation bump went to that worker's own cache.
+        Entry.objects.filter(pk=self.entry.pk).update(title="Tracing Django views")
+        self.assertEqual(self.labels("prof"), [(ENTRY, "Profiling Django views")])
+
+        self.index._checked_at = 0
+        self.assertEqual(self.labels("trac"), [(ENTRY, "Tracing Django views")])
+
+
+class SuggestionSignalsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        suggestion_index.rebuild(generation=None)
+        suggestion_index._checked_at = 0
+
+    def test_saved_and_deleted_objects_are_applied_in_process(self):
+        suggestion_index.ensure_fresh()
+        entry = EntryFactory.create(status=1, title="Flame graphs explained")
+        tag = TagFactory.create(name="Flamegraph")
+        with self.assertNumQueries(0):
+            labels = [suggestion.label for suggestion in suggestion_index.suggest("flame")]
+        self.assertEqual(labels, ["Flame graphs explained", "Flamegraph"])
+
+        entry.status = 0
+        entry.save()
+        tag.delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(suggestion_index.suggest("flame"), [])
+
+    def test_entries_with_unroutable_slugs_are_not_suggested(self):
+        suggestion_index.ensure_fresh()
+        entry = EntryFactory.create(status=1, title="Flame graphs explained")
+        entry.slug = "flame graphs"
+        entry.save()
+        self.assertEqual(suggestion_index.suggest("flame"), [])
+        suggestion_index.rebuild()
+        self.assertEqual(suggestion_index.suggest("flame"), [])
+
+    def test_suggest_endpoint(self):
+        EntryFactory.create(status=1, title="Flame graphs explained")
+        response = self.client.get(reverse("blog_app:search_suggest"), {"q": "fla"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["label"] for item in response.json()["suggestions"]], ["Flame graphs explained"])
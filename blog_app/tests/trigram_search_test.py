@@ -0,0 +1,62 @@
+from blog_app.factories.entry_factory import EntryFactory
+from blog_app.factories.tag_factory import TagFactory
+from blog_app.models.entry import Entry
+from blog_app.utils import trigram_search
+from blog_app.utils.trigram_search import TrigramIndex
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+
+class TrigramSearchTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        trigram_search.trigram_index.rebuild(generation=None)
+        self.profiling = EntryFactory.create(status=1, title="Profiling Django views", content="Nothing here.")
+        self.tagged = EntryFactory.create(status=1, title="Weekly notes", content="Nothing either.")
+        self.tagged.tags.add(TagFactory.create(name="Observability"))
+        self.draft = EntryFactory.create(status=0, title="Profiling drafts", content="Unpublished.")
+
+    def test_trigrams_are_padded_like_pg_trgm(self):
+        self.assertEqual(trigram_search.trigrams("Cat"), {"  c", " ca", "cat", "at "})
+
+    def test_matches_misspelled_titles_and_tags(self):
+        self.assertEqual(trigram_search.similar_entry_ids("profilng"), [self.profiling.pk])
+        self.assertEqual(trigram_search.similar_entry_ids("djangoo viewz"), [self.profiling.pk])
+        self.assertEqual(trigram_search.similar_entry_ids("observabilty"), [self.tagged.pk])
+        self.assertEqual(trigram_search.similar_entry_ids("gardening"), [])
+        self.assertEqual(trigram_search.similar_entry_ids("!!"), [])
+
+    def test_threshold(self):
+        self.assertEqual(trigram_search.similar_entry_ids("profil", threshold=0.3), [self.profiling.pk])
+        self.assertEqual(trigram_search.similar_entry_ids("profil", threshold=0.9), [])
+
+    def test_in_process_index_answers_without_queries(self):
+        if connection.vendor == "postgresql":
+            self.skipTest("PostgreSQL answers with pg_trgm.")
+        index = TrigramIndex(check_interval=60)
+        index.ensure_fresh()
+        with self.assertNumQueries(0):
+            self.assertEqual([pk for pk, _ in index.search("profilng", 0.3, 10)], [self.profiling.pk])
+
+    @override_settings(SHARED_CACHE=False)
+    def test_every_check_rebuilds_without_shared_counters(self):
+        if connection.vendor == "postgresql":
+            self.skipTest("PostgreSQL answers with pg_trgm.")
+        index = TrigramIndex(check_interval=60)
+        index.ensure_fresh()
+        # Another worker's change: its generation bump went to that worker's own cache.
+        Entry.objects.filter(pk=self.profiling.pk).update(title="Tracing Django views")
+        index._checked_at = 0
+        self.assertEqual([pk for pk, _ in index.search("tracng", 0.3, 10)], [self.profiling.pk])
+
+    def test_search_view_appends_close_matches(self):
+        response = self.client.get(reverse("blog_app:search"), {"q": "profilng"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([entry.pk for entry in response.context["object_list"]], [self.profiling.pk])
+        self.assertContains(response, "similar title or tag")
+
+        response = self.client.get(reverse("blog_app:search"), {"q": "profiling"})
+        self.assertEqual([entry.pk for entry in response.context["object_list"]], [self.profiling.pk])
+        self.assertNotContains(response, "similar title or tag")
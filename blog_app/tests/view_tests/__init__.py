@@ -1,2 +1,4 @@
 from .comment_view_test import *
+from .entry_list_view_test import *
 from .entry_view_test import *
+from .like_view_test import *
@@ -0,0 +1,66 @@
+from blog_app.factories.entry_factory import EntryFactory
+from blog_app.models.entry import Entry
+from cryptek.qa_templates import ClassBaseViewTestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class EntryListViewTestCase(ClassBaseViewTestCase):
+    endpoint_name = "blog_app:home"
+    is_authenticated = False
+
+    def setUp(self):
+        self.entries = EntryFactory.create_batch(10, status=1)
+        EntryFactory.create_batch(2, status=0)
+        # Identical timestamps make `id` the only tiebreaker of the keyset.
+        created_at = self.entries[0].created_at
+        Entry.objects.update(created_at=created_at)
+        self.expected = sorted((entry.pk for entry in self.entries), reverse=True)
+        super().setUp()
+
+    def get_page(self, query=""):
+        response = self.client.get(f"{self.get_url()}{query}")
+        self.response_code(response=response, status_code=200)
+        return response
+
+    def test_first_page_has_no_count_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_page()
+        self.assertFalse(any("COUNT(" in query["sql"].upper() for query in queries.captured_queries))
+        self.assertEqual([entry.pk for entry in response.context["entry_list"]], self.expected[:4])
+        self.assertTrue(response.context["is_paginated"])
+        self.assertFalse(response.context["page_obj"].has_previous())
+
+    def test_walk_forward_and_back(self):
+        seen = []
+        pages = []
+        query = ""
+        while True:
+            response = self.get_page(query)
+            pages.append(query)
+            seen.extend(entry.pk for entry in response.context["entry_list"])
+            if not response.context["page_obj"].has_next():
+                break
+            query = response.context["page_obj"].next_url
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(len(pages), 3)
+
+        previous = self.get_page(response.context["page_obj"].previous_url)
+        self.assertEqual([entry.pk for entry in previous.context["entry_list"]], self.expected[4:8])
+        self.assertTrue(previous.context["page_obj"].has_previous())
+
+    def test_legacy_page_redirects_to_cursor(self):
+        first = self.get_page()
+        response = self.client.get(f"{self.get_url()}?page=2")
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(response["Location"], f"{self.get_url()}{first.context['page_obj'].next_url}")
+
+        response = self.client.get(f"{self.get_url()}?page=1")
+        self.assertRedirects(response, self.get_url(), status_code=301)
+
+    def test_legacy_page_out_of_range(self):
+        self.response_code(response=self.client.get(f"{self.get_url()}?page=99"), status_code=404)
+        self.response_code(response=self.client.get(f"{self.get_url()}?page=abc"), status_code=404)
+
+    def test_invalid_cursor(self):
+        self.response_code(response=self.client.get(f"{self.get_url()}?cursor=not-a-cursor"), status_code=404)
@@ -0,0 +1,152 @@
+from io import StringIO
+from unittest import mock
+
+from blog_app.factories.entry_factory import EntryFactory
+from blog_app.factories.like_factory import LikeFactory
+from blog_app.models.entry import Entry
+from blog_app.models.like import Like
+from blog_app.views.like_view import LikeView
+from cryptek.qa_templates import ClassBaseViewTestCase
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase
+from django.test.client import MULTIPART_CONTENT
+
+
+class LikeViewTestCase(ClassBaseViewTestCase):
+    endpoint_name = "blog_app:like_entry"
+    is_authenticated = True
+    default_content_type = MULTIPART_CONTENT
+
+    def setUp(self):
+        self.entry = EntryFactory.create(status=1)
+        self.kwargs = {"slug": self.entry.slug}
+        super().setUp()
+
+    def assertCounts(self, like_count, dislike_count):
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.like_count, like_count)
+        self.assertEqual(self.entry.dislike_count, dislike_count)
+
+    def test_like_increments_counter(self):
+        response = self.post(data={"type": Like.LIKE})
+        self.response_code(response=response, status_code=201)
+        self.assertEqual(response.json()["like_count"], 1)
+        self.assertCounts(1, 0)
+
+    def test_repeated_vote_is_counted_once(self):
+        self.post(data={"type": Like.LIKE})
+        response = self.post(data={"type": Like.LIKE})
+        self.assertEqual(response.json()["like_count"], 1)
+        self.assertCounts(1, 0)
+
+    def test_flipping_vote_moves_it_between_counters(self):
+        self.post(data={"type": Like.LIKE})
+        response = self.post(data={"type": Like.DISLIKE})
+        self.assertEqual(response.json()["like_count"], 0)
+        self.assertEqual(response.json()["dislike_count"], 1)
+        self.assertCounts(0, 1)
+        self.assertEqual(Like.objects.filter(entry=self.entry).count(), 1)
+
+    def test_invalid_type_is_rejected(self):
+        response = self.post(data={"type": "love"})
+        self.response_code(response=response, status_code=400)
+        self.assertCounts(0, 0)
+
+    def test_anonymous_vote_is_rejected(self):
+        with self.logout():
+            response = self.post(data={"type": Like.LIKE})
+        self.response_code(response=response, status_code=403)
+
+    def test_saving_entry_keeps_counters(self):
+        stale = Entry.objects.get(pk=self.entry.pk)
+        self.post(data={"type": Like.LIKE})
+        stale.title = "Edited while someone voted"
+        stale.save()
+        self.assertCounts(1, 0)
+
+    def test_concurrent_first_vote_is_applied_over_the_winner(self):
+        vote = LikeView.vote
+        calls = []
+
+        def lose_the_race(request, entry, like_type):
+            calls.append(like_type)
+            if len(calls) == 1:
+                # Another request of the same user inserted its first vote in the meantime.
+                LikeFactory.create(entry=self.entry, user=request.user, type=Like.LIKE)
+                raise IntegrityError("duplicate vote")
+            return vote(request, entry, like_type)
+
+        with mock.patch.object(LikeView, "vote", side_effect=lose_the_race):
+            response = self.post(data={"type": Like.DISLIKE})
+        self.response_code(response=response, status_code=201)
+        self.assertCounts(0, 1)
+        self.assertEqual(Like.objects.filter(entry=self.entry).count(), 1)
+
+
+class LikeCountersTestCase(TestCase):
+    def setUp(self):
+        self.entry = EntryFactory.create()
+
+    def assertCounts(self, like_count, dislike_count):
+        self.entry.refresh_from_db()
+        self.assertEqual((self.entry.like_count, self.entry.dislike_count), (like_count, dislike_count))
+
+    def test_votes_are_counted_wherever_they_are_saved(self):
+        like = LikeFactory.create(entry=self.entry, type=Like.LIKE)
+        LikeFactory.create(entry=self.entry, type=Like.DISLIKE)
+        self.assertCounts(1, 1)
+
+        like = Like.objects.get(pk=like.pk)
+        like.type = Like.DISLIKE
+        like.save()
+        self.assertCounts(0, 2)
+
+    def test_deleted_votes_are_uncounted(self):
+        LikeFactory.create(entry=self.entry, type=Like.LIKE)
+        vote = LikeFactory.create(entry=self.entry, type=Like.DISLIKE)
+        vote.delete()
+        self.assertCounts(1, 0)
+
+        Like.objects.filter(entry=self.entry).delete()
+        self.assertCounts(0, 0)
+
+    def test_counters_never_go_below_zero(self):
+        like = LikeFactory.create(entry=self.entry, type=Like.LIKE)
+        # A vote the counters missed, e.g. one cast before they were added.
+        Entry.objects.filter(pk=self.entry.pk).update(like_count=0)
+
+        like = Like.objects.get(pk=like.pk)
+        like.type = Like.DISLIKE
+        like.save()
+        self.assertCounts(0, 1)
+
+
+class ReconcileLikeCountsTestCase(TestCase):
+    def test_reconcile_fixes_drifted_counters(self):
+        entry = EntryFactory.create()
+        LikeFactory.create_batch(3, entry=entry, type=Like.LIKE)
+        LikeFactory.create(entry=entry, type=Like.DISLIKE)
+        untouched = EntryFactory.create()
+        Entry.objects.filter(pk=entry.pk).update(like_count=7, dislike_count=0)
+
+        out = StringIO()
+        call_command("reconcile_like_counts", stdout=out)
+
+        entry.refresh_from_db()
+        untouched.refresh_from_db()
+        self.assertEqual((entry.like_count, entry.dislike_count), (3, 1))
+        self.assertEqual((untouched.like_count, untouched.dislike_count), (0, 0))
+        self.assertIn("Reconciled the counters of 1 entries.", out.getvalue())
+
+    def test_dry_run_does_not_write(self):
+        entry = EntryFactory.create()
+        LikeFactory.create(entry=entry, type=Like.LIKE)
+        Entry.objects.filter(pk=entry.pk).update(like_count=0)
+
+        out = StringIO()
+        call_command("reconcile_like_counts", "--dry-run", stdout=out)
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.like_count, 0)
+        self.assertIn("1 entries have drifted counters.", out.getvalue())
@@ -3,6 +3,7 @@ from django.urls import path
 from . import views
 from .sitemaps import EntrySitemap
 from .views.like_view import LikeView
+from .views.search_view import search_suggestions
 from .views.terms_and_privacy_view import PrivacyPolicyView, TermsOfServiceView
 
 sitemaps = {"entry-detail": EntrySitemap}
@@ -13,6 +14,8 @@ urlpatterns = [
     path(route="home/", view=views.EntryList.as_view(), name="home"),
     path(route="entry/<slug:slug>/", view=views.EntryDetail.as_view(), name="entry_detail"),
     path(route="entry/like/<slug:slug>", view=LikeView.as_view(), name="like_entry"),
+    path(route="search/", view=views.PostListView.as_view(), name="search"),
+    path(route="search/suggest/", view=search_suggestions, name="search_suggest"),
     path(route="privacy-policy/", view=PrivacyPolicyView.as_view(), name="privacy_policy"),
     path(route="terms-of-service/", view=TermsOfServiceView.as_view(), name="terms_of_service"),
 ]
@@ -0,0 +1,243 @@
+import logging
+import random
+import sys
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Max, Min
+
+from blog_app.models.code_tip import CodeTip
+
+logger = logging.getLogger("gemini_tip")
+
+TIP_CACHE_KEY = "gemini_tip"
+POOL_CACHE_KEY = "gemini_tip_pool"
+LOCK_CACHE_KEY = "gemini_tip_refresh_lock"
+
+# The only columns a displayed tip needs; the Gemini prompt/response columns can be large.
+TIP_FIELDS = ("title", "description", "code")
+
+NO_TIP = {
+    "title": "No hay tips disponibles",
+    "description": "No se pudo obtener un tip de código en este momento.",
+    "code": "",
+}
+
+
+class CodeTipProvider:
+    """
+    Serve the current Gemini code tip without ever blocking a request on the Gemini API.
+
+    The current tip is stored in the cache together with the time it stops being fresh, and it is
+    never evicted: once stale it keeps being served while a single background refresh replaces it.
+    The refresh is single-flight across workers (guarded by a cache lock), swaps in a pre-generated
+    tip from a small pool and then tops the pool up, so the next rotation doesn't wait for Gemini.
+    Within a process at most one refresh runs at a time, and none starts for `failure_backoff`
+    seconds after Gemini failed, so an outage doesn't turn every request into a new API call.
+
+    Attributes:
+        ttl (int): Seconds a tip is considered fresh.
+        pool_size (int): Number of pre-generated tips kept ready for the next rotations.
+        refresh_ahead (int): Seconds before expiry at which the pool starts being refilled.
+        lock_timeout (int): Seconds after which an abandoned refresh lock expires.
+        background (bool): Run refreshes in a daemon thread instead of inline.
+        fallback_pool_size (int): Number of stored tips sampled for the in-memory fallback rotation.
+        fallback_pool_ttl (int): Seconds before the fallback rotation is sampled again.
+        failure_backoff (int): Seconds without refreshes after a failed generation.
+    """
+
+    def __init__(
+        self,
+        ttl=None,
+        pool_size=None,
+        refresh_ahead=None,
+        lock_timeout=None,
+        background=None,
+        fallback_pool_size=None,
+        fallback_pool_ttl=None,
+        failure_backoff=None,
+    ):
+        self.ttl = ttl if ttl is not None else getattr(settings, "GEMINI_TIP_TTL", 60 * 30)
+        self.pool_size = pool_size if pool_size is not None else getattr(settings, "GEMINI_TIP_POOL_SIZE", 3)
+        self.refresh_ahead = (
+            refresh_ahead if refresh_ahead is not None else getattr(settings, "GEMINI_TIP_REFRESH_AHEAD", 60 * 5)
+        )
+        self.lock_timeout = (
+            lock_timeout if lock_timeout is not None else getattr(settings, "GEMINI_TIP_LOCK_TIMEOUT", 60 * 2)
+        )
+        self.background = (
+            background
+            if background is not None
+            else getattr(settings, "GEMINI_TIP_BACKGROUND_REFRESH", "test" not in sys.argv)
+        )
+        self.fallback_pool_size = (
+            fallback_pool_size
+            if fallback_pool_size is not None
+            else getattr(settings, "GEMINI_TIP_FALLBACK_POOL_SIZE", 10)
+        )
+        self.fallback_pool_ttl = (
+            fallback_pool_ttl
+            if fallback_pool_ttl is not None
+            else getattr(settings, "GEMINI_TIP_FALLBACK_POOL_TTL", 60 * 10)
+        )
+        self.failure_backoff = (
+            failure_backoff if failure_backoff is not None else getattr(settings, "GEMINI_TIP_FAILURE_BACKOFF", 60 * 5)
+        )
+        self._fallback_pool = []
+        self._fallback_pool_expires = 0
+        self._fallback_lock = threading.Lock()
+        self._refreshing = False
+        self._next_attempt_at = 0
+        self._refresh_state_lock = threading.Lock()
+
+    def get_tip(self):
+        """Return the tip to display right now, scheduling a refresh when it is stale or about to be."""
+        entry = cache.get(TIP_CACHE_KEY)
+        if not entry:
+            self.schedule_refresh()
+            # An inline refresh may already have stored a tip.
+            entry = cache.get(TIP_CACHE_KEY)
+            return entry["tip"] if entry else self.fallback_tip()
+
+        remaining = entry["fresh_until"] - time.time()
+        if remaining <= 0:
+            self.schedule_refresh()
+        elif remaining <= self.refresh_ahead and len(cache.get(POOL_CACHE_KEY) or []) < self.pool_size:
+            self.schedule_refresh()
+        return entry["tip"]
+
+    def tip_stored_at(self):
+        """Time (a timestamp) the current tip was stored at, or None while the fallback rotation is shown."""
+        entry = cache.get(TIP_CACHE_KEY)
+        if not entry:
+            return None
+        return entry.get("stored_at", entry["fresh_until"] - self.ttl)
+
+    def schedule_refresh(self):
+        """Start a refresh, unless one is already running in this process or Gemini failed recently."""
+        with self._refresh_state_lock:
+            if self._refreshing or time.time() < self._next_attempt_at:
+                return
+            self._refreshing = True
+        if not self.background:
+            self._refresh_once()
+            return
+        threading.Thread(target=self._refresh_in_background, name="gemini-tip-refresh", daemon=True).start()
+
+    def refresh(self):
+        """
+        Rotate the current tip if it is stale and refill the pool.
+
+        Only one caller across all workers does the work; the others return immediately.
+
+        Returns:
+            bool: True if this call held the lock and ran the refresh.
+        """
+        token = uuid.uuid4().hex
+        if not cache.add(LOCK_CACHE_KEY, token, timeout=self.lock_timeout):
+            return False
+        try:
+            pool = cache.get(POOL_CACHE_KEY) or []
+            entry = cache.get(TIP_CACHE_KEY)
+            if not entry or entry["fresh_until"] <= time.time():
+                tip = pool.pop(0) if pool else self._generate()
+                if not tip:
+                    # Gemini just failed; don't call it again to refill the pool.
+                    return True
+                self._store(tip)
+                cache.set(POOL_CACHE_KEY, pool, timeout=None)
+
+            while len(pool) < self.pool_size:
+                tip = self._generate()
+                if not tip:
+                    break
+                pool.append(tip)
+                cache.set(POOL_CACHE_KEY, pool, timeout=None)
+            return True
+        finally:
+            if cache.get(LOCK_CACHE_KEY) == token:
+                cache.delete(LOCK_CACHE_KEY)
+
+    def fallback_tip(self):
+        """
+        Return a random stored tip, used until a generated one is available.
+
+        Tips are drawn from a small in-memory rotation that is resampled every `fallback_pool_ttl`
+        seconds, so most calls don't touch the database at all.
+        """
+        with self._fallback_lock:
+            if time.time() >= self._fallback_pool_expires:
+                self._fallback_pool = self._sample_tips(self.fallback_pool_size)
+                self._fallback_pool_expires = time.time() + self.fallback_pool_ttl
+            pool = self._fallback_pool
+        return random.choice(pool) if pool else NO_TIP
+
+    @staticmethod
+    def _sample_tips(size):
+        """
+        Pick up to `size` random valid tips without scanning the table.
+
+        The bounds come from the primary key range of every tip, answered by its index; filtering
+        them on `error_message` (not indexed) would scan the table. A random id is drawn within it and
+        the first valid tip at or after it (or, past the last one, the first valid tip) is fetched
+        walking the primary key index, loading only the displayed fields. Ids left by deleted or
+        failed tips make their successors slightly more likely, which is fine here.
+        """
+        bounds = CodeTip.objects.aggregate(low=Min("id"), high=Max("id"))
+        if bounds["low"] is None:
+            return []
+
+        valid_tips = CodeTip.objects.filter(error_message="").order_by("id").values("id", *TIP_FIELDS)
+        sample = {}
+        for _ in range(size):
+            tip_id = random.randint(bounds["low"], bounds["high"])
+            tip = valid_tips.filter(id__gte=tip_id).first() or valid_tips.filter(id__lt=tip_id).first()
+            if tip is None:
+                break
+            sample[tip.pop("id")] = tip
+        return list(sample.values())
+
+    def _refresh_once(self):
+        try:
+            self.refresh()
+        except Exception:
+            self._back_off()
+            raise
+        finally:
+            with self._refresh_state_lock:
+                self._refreshing = False
+
+    def _refresh_in_background(self):
+        try:
+            self._refresh_once()
+        except Exception as e:
+            logger.error(f"Background code tip refresh failed: {e}")
+        finally:
+            # Threads get their own database connections; don't leak them.
+            connections.close_all()
+
+    def _back_off(self):
+        with self._refresh_state_lock:
+            self._next_attempt_at = time.time() + self.failure_backoff
+
+    def _store(self, tip):
+        now = time.time()
+        cache.set(TIP_CACHE_KEY, {"tip": tip, "stored_at": now, "fresh_until": now + self.ttl}, timeout=None)
+
+    def _generate(self):
+        try:
+            tip = CodeTip.generate_code_tip()
+        except Exception as e:
+            logger.error(f"Code tip generation failed: {e}")
+            tip = None
+        if not tip or tip.get("title") in CodeTip.ERROR_TITLES:
+            self._back_off()
+            return None
+        return tip
+
+
+code_tip_provider = CodeTipProvider()
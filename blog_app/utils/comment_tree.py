@@ -0,0 +1,87 @@
+from blog_app.models.comment import Comment
+
+
+class CommentTree:
+    """
+    Every active comment of an entry, loaded with their authors in a single query and linked in memory.
+
+    Each comment gets its visible replies, oldest first, in a `thread_replies` list (and its
+    `parent` cached), so walking the hierarchy from Python or templates never hits the database
+    again. Replies whose parent is hidden are promoted to top-level threads.
+
+    Attributes:
+        threads (list[Comment]): Top-level comments, oldest first.
+        count (int): Number of comments in the tree.
+    """
+
+    def __init__(self, comments):
+        comments = list(comments)
+        by_id = {comment.pk: comment for comment in comments}
+        self.threads = []
+        for comment in comments:
+            comment.thread_replies = []
+        for comment in comments:
+            parent = by_id.get(comment.parent_id)
+            if parent is None:
+                self.threads.append(comment)
+            else:
+                parent.thread_replies.append(comment)
+                Comment.parent.field.set_cached_value(comment, parent)
+        self.count = len(comments)
+
+    @classmethod
+    def for_entry(cls, entry):
+        return cls(
+            Comment.objects.filter(entry=entry, active=True).select_related("user").order_by("created_at", "id")
+        )
+
+    def page(self, number=1, per_page=None):
+        """
+        Return one page of threads.
+
+        Returns:
+            tuple: `(threads, has_next)`.
+        """
+        if not per_page:
+            return self.threads, False
+        start = (number - 1) * per_page
+        return self.threads[start : start + per_page], start + per_page < len(self.threads)
+
+    def serialize(self, comment, max_depth=None, depth=0):
+        """
+        Return a JSON-ready dict of `comment` and its replies.
+
+        Replies nested deeper than `max_depth` are flattened, oldest first, into the replies of their
+        ancestor at `max_depth`, so long conversations stay readable.
+        """
+        if max_depth is not None and depth >= max_depth:
+            replies = sorted(self.descendants(comment), key=lambda reply: (reply.created_at, reply.pk))
+            serialized = [self._as_dict(reply, depth + 1, []) for reply in replies]
+        else:
+            serialized = [self.serialize(reply, max_depth, depth + 1) for reply in comment.thread_replies]
+        return self._as_dict(comment, depth, serialized)
+
+    @staticmethod
+    def descendants(comment):
+        """Iterate over every reply below `comment`, depth first, without recursion."""
+        stack = list(reversed(comment.thread_replies))
+        while stack:
+            reply = stack.pop()
+            yield reply
+            stack.extend(reversed(reply.thread_replies))
+
+    @staticmethod
+    def _as_dict(comment, depth, replies):
+        return {
+            "id": comment.pk,
+            "entry_id": comment.entry_id,
+            "parent_id": comment.parent_id,
+            "user_id": comment.user_id,
+            "username": comment.user.username,
+            "content": comment.content,
+            "created_at": comment.created_at,
+            "updated_at": comment.updated_at,
+            "depth": depth,
+            "reply_count": len(replies),
+            "replies": replies,
+        }
@@ -0,0 +1,59 @@
+"""
+Cache of rendered template fragments of entries (the post cards of listing pages).
+
+A fragment is keyed by its template, the entry id and `updated_at`, and the `ENTRIES` generation,
+which also covers what `updated_at` doesn't: category changes and renames, and changes to the
+author's name or picture. All fragments of a page are looked up at once (`get_many`: one round
+trip to the shared cache for the local misses), and only the misses are rendered, after loading
+the related objects they need in bulk. Fragments are rendered without the cache unless every
+worker sees the same generation counters (see `generations_shared`).
+"""
+
+from django.conf import settings
+from django.db.models import prefetch_related_objects
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from blog_app.utils.generation import ENTRIES, generations_shared, get_generation
+from cryptek.caching import TieredCache
+
+fragment_cache = TieredCache(
+    prefix="fragment",
+    maxsize=getattr(settings, "FRAGMENT_CACHE_SIZE", 512),
+    timeout=getattr(settings, "FRAGMENT_CACHE_TIMEOUT", 60 * 60),
+)
+
+# Relations the entry card templates display.
+CARD_RELATIONS = ("categories", "author")
+
+
+def fragment_key(template_name, entry, generation):
+    return f"{template_name}:{entry.pk}:{entry.updated_at.timestamp()}:{generation}"
+
+
+def render_entry_fragments(fragments, context_name="entry"):
+    """
+    Render entry fragments, reusing the cached ones.
+
+    Args:
+        fragments (list[tuple]): `(template_name, entry)` pairs.
+        context_name (str): Name of the entry in the templates' context.
+
+    Returns:
+        list: HTML of each fragment, in the order of `fragments`.
+    """
+    shared = generations_shared()
+    generation = get_generation(ENTRIES) if shared else None
+    keys = [fragment_key(template_name, entry, generation) for template_name, entry in fragments]
+    found = fragment_cache.get_many(keys) if shared else {}
+
+    missing = [(key, template_name, entry) for key, (template_name, entry) in zip(keys, fragments) if key not in found]
+    if missing:
+        prefetch_related_objects([entry for _, _, entry in missing], *CARD_RELATIONS)
+        rendered = {
+            key: get_template(template_name).render({context_name: entry}) for key, template_name, entry in missing
+        }
+        if shared:
+            fragment_cache.set_many(rendered)
+        found.update(rendered)
+    return [mark_safe(found[key]) for key in keys]
@@ -0,0 +1,194 @@
+"""
+Full-text search over entries.
+
+Each entry gets a search document built from its title, tags and categories, overview and content.
+Documents live in a side table created by migration `0013_entry_search_index`:
+
+- PostgreSQL: a `tsvector` column weighted title (A) > tags and categories (B) > overview (C) >
+  content (D), behind a GIN index and ranked with `ts_rank`.
+- SQLite: an FTS5 virtual table with the same four columns, ranked with `bm25`.
+
+Other backends have no search table; `search_entry_ids` then returns None and callers fall back to
+plain `icontains` filtering. Documents are kept in sync by the receivers in `blog_app.signals`.
+"""
+
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.utils.html import escape, strip_tags
+from django.utils.safestring import mark_safe
+
+SEARCH_TABLE = "blog_app_entry_search"
+SUPPORTED_VENDORS = ("postgresql", "sqlite")
+MAX_QUERY_TERMS = 8
+
+TERM_PATTERN = re.compile(r"\w+")
+# Private-use characters delimiting matches until the snippet is escaped, so user content can't forge a `<mark>`.
+_MARK_START = "\ue000"
+_MARK_END = "\ue001"
+
+
+def is_supported(using=None):
+    return (using or connection).vendor in SUPPORTED_VENDORS
+
+
+def query_terms(query):
+    """Split a search query into lowercase word terms, ignoring any operator syntax."""
+    return TERM_PATTERN.findall(query.lower())[:MAX_QUERY_TERMS]
+
+
+def create_search_table(schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            f"CREATE TABLE {SEARCH_TABLE} ("
+            "entry_id bigint PRIMARY KEY REFERENCES blog_app_entry (id) ON DELETE CASCADE "
+            "DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(f"CREATE INDEX {SEARCH_TABLE}_document_idx ON {SEARCH_TABLE} USING GIN (document)")
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(title, keywords, overview, content, "
+            "tokenize='porter unicode61')"
+        )
+
+
+def drop_search_table(schema_editor):
+    if schema_editor.connection.vendor in SUPPORTED_VENDORS:
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+def write_documents(documents, using=None):
+    """
+    Insert or replace search documents.
+
+    Args:
+        documents (iterable[tuple]): `(entry_id, title, keywords, overview, content)` tuples.
+        using (BaseDatabaseWrapper): Connection to write to. Defaults to the default connection.
+    """
+    using = using or connection
+    documents = list(documents)
+    if not documents or not is_supported(using):
+        return
+    with using.cursor() as cursor:
+        if using.vendor == "postgresql":
+            config = getattr(settings, "SEARCH_TEXT_CONFIG", "english")
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (entry_id, document) VALUES (%s, "
+                "setweight(to_tsvector(%s::regconfig, %s), 'A') || setweight(to_tsvector(%s::regconfig, %s), 'B') || "
+                "setweight(to_tsvector(%s::regconfig, %s), 'C') || setweight(to_tsvector(%s::regconfig, %s), 'D')) "
+                "ON CONFLICT (entry_id) DO UPDATE SET document = EXCLUDED.document",
+                [
+                    (entry_id, config, title, config, keywords, config, overview, config, content)
+                    for entry_id, title, keywords, overview, content in documents
+                ],
+            )
+        else:
+            cursor.executemany(
+                f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [(document[0],) for document in documents]
+            )
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, title, keywords, overview, content) VALUES (%s, %s, %s, %s, %s)",
+                documents,
+            )
+
+
+def delete_documents(entry_ids, using=None):
+    using = using or connection
+    entry_ids = list(entry_ids)
+    if not entry_ids or not is_supported(using):
+        return
+    column = "entry_id" if using.vendor == "postgresql" else "rowid"
+    with using.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {SEARCH_TABLE} WHERE {column} = %s", [(entry_id,) for entry_id in entry_ids])
+
+
+def build_document(entry):
+    """Return the `write_documents` tuple of an entry whose tags and categories are prefetched."""
+    keywords = [tag.name for tag in entry.tags.all()] + [category.name for category in entry.categories.all()]
+    return entry.pk, entry.title, " ".join(keywords), entry.overview, entry.content
+
+
+def index_entries(entry_ids):
+    """Rebuild the search documents of `entry_ids`, dropping those of entries that no longer exist."""
+    from blog_app.models.entry import Entry
+
+    entry_ids = set(entry_ids)
+    if not entry_ids or not is_supported():
+        return
+    entries = (
+        Entry.objects.filter(pk__in=entry_ids)
+        .only("id", "title", "overview", "content")
+        .prefetch_related("tags", "categories")
+    )
+    documents = [build_document(entry) for entry in entries]
+    write_documents(documents)
+    delete_documents(entry_ids - {document[0] for document in documents})
+
+
+def search_entry_ids(query, limit=None):
+    """
+    Return the ids of the published entries matching `query`, best match first.
+
+    Every term must match, as a word prefix. Returns None when the database has no search table,
+    and an empty list when the query holds no searchable term.
+    """
+    if not is_supported():
+        return None
+    terms = query_terms(query)
+    if not terms:
+        return []
+    limit = limit or getattr(settings, "SEARCH_MAX_RESULTS", 200)
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                f"SELECT s.entry_id FROM {SEARCH_TABLE} s "
+                "JOIN blog_app_entry e ON e.id = s.entry_id, to_tsquery(%s::regconfig, %s) q "
+                "WHERE e.status = 1 AND s.document @@ q "
+                "ORDER BY ts_rank(s.document, q) DESC, e.created_at DESC LIMIT %s",
+                [getattr(settings, "SEARCH_TEXT_CONFIG", "english"), " & ".join(f"{term}:*" for term in terms), limit],
+            )
+        else:
+            cursor.execute(
+                f"SELECT {SEARCH_TABLE}.rowid FROM {SEARCH_TABLE} "
+                f"JOIN blog_app_entry e ON e.id = {SEARCH_TABLE}.rowid "
+                f"WHERE {SEARCH_TABLE} MATCH %s AND e.status = 1 "
+                f"ORDER BY bm25({SEARCH_TABLE}, 10.0, 5.0, 2.0, 1.0), e.created_at DESC LIMIT %s",
+                [" ".join(f'"{term}"*' for term in terms), limit],
+            )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def highlight(text, terms, length=200):
+    """
+    Return an HTML-safe excerpt of `text` around the first match of `terms`, with matches wrapped in `<mark>`.
+
+    Args:
+        text (str): Plain text to excerpt.
+        terms (list[str]): Terms from `query_terms`; each one also matches longer words it prefixes.
+        length (int): Approximate length of the excerpt.
+    """
+    if not text:
+        return ""
+    if not terms:
+        return escape(text[:length])
+    pattern = re.compile(r"\b(?:" + "|".join(re.escape(term) for term in terms) + r")\w*", re.IGNORECASE)
+    match = pattern.search(text)
+    start = max(match.start() - length // 3, 0) if match else 0
+    excerpt = text[start : start + length]
+    excerpt = pattern.sub(lambda found: f"{_MARK_START}{found.group(0)}{_MARK_END}", excerpt)
+    html = escape(excerpt).replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+    prefix = "&hellip;" if start else ""
+    suffix = "&hellip;" if start + length < len(text) else ""
+    return mark_safe(f"{prefix}{html}{suffix}")
+
+
+def entry_snippet(entry, terms, length=200):
+    """Highlighted excerpt of an entry's rendered content, or of its overview when the content doesn't match."""
+    content = strip_tags(entry.content_html) if entry.content_html else entry.content
+    if terms and not any(term in content.lower() for term in terms):
+        content = entry.overview
+    return highlight(" ".join(content.split()), terms, length)
@@ -0,0 +1,153 @@
+import atexit
+import bisect
+import logging
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from blog_app.models.gemini_api_usage import LATENCY_BUCKETS, GeminiApiLatencyBucket, GeminiApiUsage
+
+logger = logging.getLogger("gemini_api_usage")
+
+
+class _PendingUsage:
+    """Counters accumulated for one day since the last flush."""
+
+    def __init__(self):
+        self.requests = 0
+        self.successful = 0
+        self.failed = 0
+        self.tokens = 0
+        self.response_time = 0.0
+        self.timed = 0
+        self.buckets = Counter()
+        self.model_name = None
+        self.last_error_message = None
+
+    def merge(self, newer):
+        """Add the counters of `newer`, recorded after these, keeping its model and error when set."""
+        self.requests += newer.requests
+        self.successful += newer.successful
+        self.failed += newer.failed
+        self.tokens += newer.tokens
+        self.response_time += newer.response_time
+        self.timed += newer.timed
+        self.buckets.update(newer.buckets)
+        self.model_name = newer.model_name or self.model_name
+        self.last_error_message = newer.last_error_message or self.last_error_message
+
+
+class GeminiUsageRecorder:
+    """
+    Buffer Gemini API usage in memory and write it to `GeminiApiUsage` in batches.
+
+    Each flush applies the accumulated deltas with a single `F()` update per day (plus one per
+    touched histogram bucket), so increments from concurrent workers are never lost and an API
+    call costs no queries. Buffered usage is flushed `flush_interval` seconds after it is
+    recorded, and at interpreter exit. A day that fails to be written is buffered again for the
+    next flush.
+
+    Attributes:
+        flush_interval (float): Seconds usage is buffered before being written. 0 writes inline.
+    """
+
+    def __init__(self, flush_interval=None):
+        self.flush_interval = (
+            flush_interval if flush_interval is not None else getattr(settings, "GEMINI_USAGE_FLUSH_INTERVAL", 30)
+        )
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._timer = None
+        atexit.register(self.flush)
+
+    def record(self, successful=True, tokens=0, response_time=0, model_name=None, error_message=None):
+        with self._lock:
+            usage = self._pending.setdefault(timezone.now().date(), _PendingUsage())
+            usage.requests += 1
+            if successful:
+                usage.successful += 1
+            else:
+                usage.failed += 1
+                usage.last_error_message = error_message
+            usage.tokens += tokens
+            if response_time > 0:
+                usage.response_time += response_time
+                usage.timed += 1
+                usage.buckets[bisect.bisect_left(LATENCY_BUCKETS, response_time)] += 1
+            if model_name:
+                usage.model_name = model_name
+            self._schedule_flush()
+
+        logger.info(
+            f"Gemini API request logged: success={successful}, tokens={tokens}, "
+            f"response_time={response_time}, model={model_name}"
+        )
+        if not self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write every buffered counter to the database."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        for date, usage in pending.items():
+            try:
+                self._write(date, usage)
+            except Exception as e:
+                logger.error(f"Failed to flush Gemini API usage for {date}: {e}")
+                self._put_back(date, usage)
+
+    def _schedule_flush(self):
+        # Called with `_lock` held.
+        if self.flush_interval and self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self._flush_in_background)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _put_back(self, date, usage):
+        with self._lock:
+            newer = self._pending.get(date)
+            if newer is not None:
+                usage.merge(newer)
+            self._pending[date] = usage
+            self._schedule_flush()
+
+    @staticmethod
+    def _write(date, usage):
+        updates = {
+            "request_count": F("request_count") + usage.requests,
+            "successful_requests": F("successful_requests") + usage.successful,
+            "failed_requests": F("failed_requests") + usage.failed,
+            "tokens_used": F("tokens_used") + usage.tokens,
+            "total_response_time": F("total_response_time") + usage.response_time,
+            "timed_requests": F("timed_requests") + usage.timed,
+            # `auto_now` isn't applied by queryset updates.
+            "last_updated": timezone.now(),
+        }
+        if usage.model_name:
+            updates["model_name"] = usage.model_name
+        if usage.last_error_message:
+            updates["last_error_message"] = usage.last_error_message
+
+        with transaction.atomic():
+            record, _ = GeminiApiUsage.objects.get_or_create(date=date)
+            GeminiApiUsage.objects.filter(pk=record.pk).update(**updates)
+            for bucket, count in usage.buckets.items():
+                bucket_record, _ = GeminiApiLatencyBucket.objects.get_or_create(usage=record, bucket=bucket)
+                GeminiApiLatencyBucket.objects.filter(pk=bucket_record.pk).update(count=F("count") + count)
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            connections.close_all()
+
+
+gemini_usage_recorder = GeminiUsageRecorder()
@@ -0,0 +1,55 @@
+"""
+Generation counters kept in the Django cache.
+
+A generation is bumped whenever the data it covers changes. Anything derived from that data
+(in-process indexes, cached search results) remembers the generation it was built from and is
+stale as soon as the counter moves, which makes invalidation O(1).
+
+The counters are only seen by every worker when the `default` cache is shared by all of them
+(`SHARED_CACHE`). With a per-process cache a bump is only seen by the process that made it, so
+features relying on the counters to notice other workers' changes check `generations_shared()`
+and don't trust them otherwise.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Bumped on any change to entries, tags or categories.
+ENTRIES = "entries"
+
+
+def generations_shared():
+    """Whether every worker sees the same counters."""
+    return getattr(settings, "SHARED_CACHE", False)
+
+
+def _key(name):
+    return f"generation:{name}"
+
+
+def get_generation(name):
+    generation = cache.get(_key(name))
+    if generation is None:
+        # Start from the clock rather than 1, so a counter lost to eviction or a cache restart never
+        # goes back to a value something was already built from.
+        cache.add(_key(name), time.time_ns() // 1000, timeout=None)
+        generation = cache.get(_key(name))
+    return generation
+
+
+def bump_generation(name):
+    """Move the generation forward and return its new value."""
+    try:
+        return cache.incr(_key(name))
+    except ValueError:
+        # The counter was evicted; restarting it is enough to invalidate everything built before.
+        return get_generation(name)
+
+
+def get_generations(names):
+    """`get_generation` of each of `names`, in a single cache round trip once the counters exist."""
+    keys = [_key(name) for name in names]
+    found = cache.get_many(keys)
+    return [found[key] if key in found else get_generation(name) for name, key in zip(names, keys)]
@@ -0,0 +1,219 @@
+"""
+Cloudinary uploads of entry header images, off the request that saved the entry.
+
+`Entry.save` hashes the header image and, only when the hash differs from the one of the image
+the CDN delivers (`uploaded_image_hash`), schedules an upload once the transaction commits.
+`HeaderImageUploadWorker` reads the stored file, hands it to the configured uploader (retrying
+failures with exponential backoff) and writes the CDN fields and `uploaded_image_hash` back with a
+queryset update, so a newer image saved meanwhile is never overwritten by an older upload. Uploads
+lost with the process or given up on are scheduled again by the next save of the entry.
+"""
+
+import hashlib
+import logging
+import queue
+import sys
+import threading
+import time
+
+from cloudinary.exceptions import Error as CloudinaryError
+from cloudinary.uploader import upload
+from django.conf import settings
+from django.db import connections
+from django.utils.module_loading import import_string
+
+from blog_app.utils.generation import ENTRIES, bump_generation
+
+logger = logging.getLogger(__name__)
+
+# Failures worth another attempt: the CDN rejected or dropped the request, or the file couldn't be read.
+RETRYABLE_ERRORS = (CloudinaryError, OSError)
+
+
+def image_hash(image):
+    """SHA-256 of the content of a `FieldFile`, committed to storage or freshly assigned."""
+    digest = hashlib.sha256()
+    image.open("rb")
+    try:
+        for chunk in image.chunks():
+            digest.update(chunk)
+    finally:
+        if image._committed:
+            image.close()
+        else:
+            # Uncommitted files are read again when the model saves them.
+            image.seek(0)
+    return digest.hexdigest()
+
+
+class CloudinaryUploader:
+    def upload(self, file, public_id):
+        """Upload `file` and return the `secure_url` and `public_id` it is delivered from."""
+        response = upload(file, public_id=public_id)
+        return {"secure_url": response.get("secure_url"), "public_id": response.get("public_id")}
+
+
+class LocalUploader:
+    """
+    Stand-in for `CloudinaryUploader` keeping uploads in memory, for tests and offline development.
+
+    Attributes:
+        uploads (dict): Uploaded content by public id.
+        failures (int): Number of upcoming uploads that raise a `CloudinaryError`.
+    """
+
+    def __init__(self, failures=0):
+        self.uploads = {}
+        self.failures = failures
+
+    def upload(self, file, public_id):
+        if self.failures:
+            self.failures -= 1
+            raise CloudinaryError("Simulated upload failure")
+        self.uploads[public_id] = file.read()
+        return {"secure_url": f"https://res.cloudinary.com/local/image/upload/{public_id}", "public_id": public_id}
+
+
+class HeaderImageUploadWorker:
+    """
+    Upload header images in a background thread, retrying failed uploads.
+
+    Attributes:
+        uploader: Object with an `upload(file, public_id)` method, `HEADER_IMAGE_UPLOADER` by default.
+        background (bool): Upload from a daemon thread instead of inline.
+        max_attempts (int): Attempts per image before giving up.
+        retry_delay (float): Seconds before the first retry; each further retry waits twice as long.
+    """
+
+    def __init__(self, uploader=None, background=None, max_attempts=None, retry_delay=None):
+        self._uploader = uploader
+        self.background = (
+            background
+            if background is not None
+            else getattr(settings, "HEADER_IMAGE_UPLOAD_BACKGROUND", "test" not in sys.argv)
+        )
+        self.max_attempts = (
+            max_attempts if max_attempts is not None else getattr(settings, "HEADER_IMAGE_UPLOAD_ATTEMPTS", 4)
+        )
+        self.retry_delay = (
+            retry_delay if retry_delay is not None else getattr(settings, "HEADER_IMAGE_UPLOAD_RETRY_DELAY", 5)
+        )
+        self.uploaded = 0
+        self.retried = 0
+        self.failed = 0
+        self.superseded = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def uploader(self):
+        if self._uploader is None:
+            self._uploader = import_string(
+                getattr(settings, "HEADER_IMAGE_UPLOADER", "blog_app.utils.header_image_uploads.CloudinaryUploader")
+            )()
+        return self._uploader
+
+    def schedule(self, entry_id, digest):
+        """Upload the header image of `entry_id`, as long as its hash is still `digest`."""
+        if not self.background:
+            self._attempt(entry_id, digest, 1)
+            return
+        self._queue.put((entry_id, digest, 1))
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="header-image-upload", daemon=True)
+                self._thread.start()
+
+    def upload(self, entry_id, digest):
+        """
+        Upload the header image of `entry_id` and store where the CDN delivers it.
+
+        Returns:
+            bool: False if the entry is gone, has had another image saved since `digest` or already
+            has this one uploaded.
+        """
+        from blog_app.models.entry import Entry
+
+        entry = (
+            Entry.objects.filter(pk=entry_id, header_image_hash=digest)
+            .only(
+                "id",
+                "slug",
+                "header_image",
+                "header_image_hash",
+                "uploaded_image_hash",
+                "header_image_url",
+                "header_image_srcset",
+            )
+            .first()
+        )
+        if entry is None or not entry.header_image or entry.uploaded_image_hash == digest:
+            return False
+
+        entry.header_image.open("rb")
+        try:
+            response = self.uploader.upload(entry.header_image, public_id=entry.slug)
+        finally:
+            entry.header_image.close()
+        entry.cdn_image_url = response["secure_url"]
+        entry.cdn_image_public_id = response["public_id"]
+        entry.build_header_image_urls()
+
+        stored = Entry.objects.filter(pk=entry_id, header_image_hash=digest).update(
+            cdn_image_url=entry.cdn_image_url,
+            cdn_image_public_id=entry.cdn_image_public_id,
+            header_image_url=entry.header_image_url,
+            header_image_srcset=entry.header_image_srcset,
+            uploaded_image_hash=digest,
+        )
+        if stored:
+            # Cached pages and post cards still point at the previous image.
+            bump_generation(ENTRIES)
+        return bool(stored)
+
+    def stats(self):
+        return {
+            "uploaded": self.uploaded,
+            "retried": self.retried,
+            "failed": self.failed,
+            "superseded": self.superseded,
+            "pending": self._queue.qsize(),
+        }
+
+    def _attempt(self, entry_id, digest, attempt):
+        try:
+            uploaded = self.upload(entry_id, digest)
+        except RETRYABLE_ERRORS as e:
+            if attempt >= self.max_attempts:
+                self.failed += 1
+                logger.error(f"Cloudinary upload of entry {entry_id} failed after {attempt} attempts: {e}")
+                return
+            self.retried += 1
+            delay = self.retry_delay * 2 ** (attempt - 1)
+            logger.warning(f"Cloudinary upload of entry {entry_id} failed, retrying in {delay}s: {e}")
+            if self.background:
+                timer = threading.Timer(delay, self._queue.put, args=((entry_id, digest, attempt + 1),))
+                timer.daemon = True
+                timer.start()
+            else:
+                time.sleep(delay)
+                self._attempt(entry_id, digest, attempt + 1)
+            return
+        if uploaded:
+            self.uploaded += 1
+        else:
+            self.superseded += 1
+
+    def _run(self):
+        while True:
+            entry_id, digest, attempt = self._queue.get()
+            try:
+                self._attempt(entry_id, digest, attempt)
+            except Exception:
+                logger.exception(f"Cloudinary upload of entry {entry_id} failed")
+            finally:
+                connections.close_all()
+
+
+header_image_uploads = HeaderImageUploadWorker()
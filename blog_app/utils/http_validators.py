@@ -0,0 +1,124 @@
+"""
+Validators (`ETag` / `Last-Modified`) for conditional GETs, for `django.views.decorators.http.condition`.
+
+Each page's validators come from one aggregate query or from the shared generation counters, never
+from rendering it, so a revalidation answered with `304 Not Modified` costs a single query at most.
+Both validators of a page share that query: its result is memoized on the request.
+
+Generation counters are only used when every worker sees the same ones (see `generations_shared`);
+otherwise entry pages get no `ETag` and the sitemap's comes from its aggregate query.
+
+Entry pages are only validated for anonymous readers. A signed-in reader's page embeds their CSRF
+token, which rotates on login, and a `304` would revive a page whose forms then fail CSRF checks.
+"""
+
+import datetime
+import hashlib
+
+from django.db.models import Count, Max, Q
+
+from blog_app.models.comment import Comment
+from blog_app.models.entry import Entry
+from blog_app.utils.code_tip_provider import code_tip_provider
+from blog_app.utils.generation import ENTRIES, generations_shared, get_generation
+
+
+def _etag(*parts):
+    return hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:32]
+
+
+def _memoized(request, name, compute):
+    validators = request.__dict__.setdefault("_validator_state", {})
+    if name not in validators:
+        validators[name] = compute()
+    return validators[name]
+
+
+def _latest(*timestamps):
+    return max((timestamp for timestamp in timestamps if timestamp is not None), default=None)
+
+
+def entry_state(request, slug):
+    """Timestamps and counters of the published entry `slug`, or None when there is no such entry."""
+    return _memoized(
+        request,
+        f"entry:{slug}",
+        lambda: Entry.objects.filter(status=1, slug=slug)
+        .annotate(last_comment=Max("comments__updated_at", filter=Q(comments__active=True)))
+        .values("pk", "updated_at", "like_count", "dislike_count", "last_comment")
+        .first(),
+    )
+
+
+def tip_stored_at(request):
+    """Timestamp the code tip shown on every page was stored at, or None."""
+    return _memoized(request, "tip", code_tip_provider.tip_stored_at)
+
+
+def entry_etag(request, slug, **kwargs):
+    if request.user.is_authenticated or not generations_shared():
+        return None
+    state = entry_state(request, slug)
+    if state is None:
+        return None
+    # The page also shows other entries (related posts) and the current code tip.
+    return _etag(
+        state["pk"],
+        state["updated_at"].isoformat(),
+        state["like_count"],
+        state["dislike_count"],
+        state["last_comment"],
+        get_generation(ENTRIES),
+        tip_stored_at(request),
+    )
+
+
+def entry_last_modified(request, slug, **kwargs):
+    if request.user.is_authenticated:
+        return None
+    state = entry_state(request, slug)
+    if state is None:
+        return None
+    stored_at = tip_stored_at(request)
+    tip_changed = None if stored_at is None else datetime.datetime.fromtimestamp(stored_at, tz=datetime.timezone.utc)
+    return _latest(state["updated_at"], state["last_comment"], tip_changed)
+
+
+def sitemap_state(request):
+    return _memoized(
+        request,
+        "sitemap",
+        lambda: Entry.objects.filter(status=1).aggregate(count=Count("id"), last=Max("updated_at")),
+    )
+
+
+def sitemap_etag(request, *args, **kwargs):
+    if generations_shared():
+        # Moves on any entry change, deletions included, without a query.
+        return _etag("sitemap", get_generation(ENTRIES))
+    state = sitemap_state(request)
+    return _etag("sitemap", state["count"], state["last"])
+
+
+def sitemap_last_modified(request, *args, **kwargs):
+    return sitemap_state(request)["last"]
+
+
+def comments_state(request, slug):
+    return _memoized(
+        request,
+        f"comments:{slug}",
+        lambda: Comment.objects.filter(entry__slug=slug, entry__status=1, active=True).aggregate(
+            count=Count("id"), last=Max("updated_at")
+        ),
+    )
+
+
+def comments_etag(request, slug, **kwargs):
+    state = comments_state(request, slug)
+    # Without comments there is nothing to validate (and the entry may not exist).
+    return _etag(slug, state["count"], state["last"]) if state["count"] else None
+
+
+def comments_last_modified(request, slug, **kwargs):
+    return comments_state(request, slug)["last"]
@@ -0,0 +1,37 @@
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+def stream_json_page(rows, page_size, key="results", cursor_field="id", batch_size=100):
+    """
+    Encode `rows` as a JSON document chunk by chunk, without materializing them.
+
+    The document looks like `{"success": true, "<key>": [...], "next": <cursor>}`, where `next` is the
+    `cursor_field` of the last row sent when more rows follow, or null. `rows` should hold up to
+    `page_size + 1` rows: the extra one only tells whether there is a next page.
+
+    Args:
+        rows (iterable[dict]): Rows to encode, e.g. a `values()` queryset iterator.
+        page_size (int): Maximum number of rows written.
+        key (str): Name of the list in the document.
+        cursor_field (str): Row field used as the `next` cursor.
+        batch_size (int): Number of rows encoded per chunk.
+    """
+    encoder = DjangoJSONEncoder()
+    yield f'{{"success": true, {encoder.encode(key)}: ['
+    batch = []
+    sent = False
+    last = None
+    has_more = False
+    for index, row in enumerate(rows):
+        if index == page_size:
+            has_more = True
+            break
+        batch.append(encoder.encode(row))
+        last = row[cursor_field]
+        if len(batch) >= batch_size:
+            yield ("," if sent else "") + ",".join(batch)
+            batch = []
+            sent = True
+    if batch:
+        yield ("," if sent else "") + ",".join(batch)
+    yield f'], "next": {encoder.encode(last if has_more else None)}}}'
@@ -0,0 +1,159 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.db.models import Q
+from django.http import Http404, HttpResponsePermanentRedirect
+
+NEXT = "n"
+PREVIOUS = "p"
+
+
+def encode_cursor(obj, direction=NEXT):
+    """Return an opaque cursor pointing right after (`NEXT`) or right before (`PREVIOUS`) `obj`."""
+    payload = json.dumps({"t": obj.created_at.isoformat(), "id": obj.pk, "d": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor built by `encode_cursor`.
+
+    Returns:
+        tuple: `(created_at, pk, direction)`.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        created_at = datetime.fromisoformat(payload["t"])
+        pk = int(payload["id"])
+        direction = payload["d"]
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if direction not in (NEXT, PREVIOUS):
+        raise ValueError(f"Invalid cursor direction: {direction!r}")
+    return created_at, pk, direction
+
+
+class KeysetPage:
+    """
+    One page of a keyset-paginated listing, exposing the subset of `django.core.paginator.Page` the templates use.
+
+    Attributes:
+        object_list (list): Objects of the page, newest first.
+        next_url (str): Query string of the following (older) page, or None.
+        previous_url (str): Query string of the preceding (newer) page, or None.
+    """
+
+    def __init__(self, object_list, has_next, has_previous, next_url=None, previous_url=None):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.next_url = next_url
+        self.previous_url = previous_url
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+
+class KeysetPaginationMixin:
+    """
+    Cursor pagination for `ListView` on `(created_at, id)`, newest first.
+
+    Each page is fetched with a `WHERE (created_at, id) < cursor ... LIMIT page_size + 1` query, so
+    there is no `COUNT(*)` and no `OFFSET` scan however deep the page is. Legacy `?page=N` URLs are
+    permanently redirected to the equivalent cursor URL.
+    """
+
+    cursor_kwarg = "cursor"
+    legacy_page_kwarg = "page"
+
+    def get(self, request, *args, **kwargs):
+        if self.legacy_page_kwarg in request.GET:
+            return self.redirect_legacy_page(request.GET[self.legacy_page_kwarg])
+        return super().get(request, *args, **kwargs)
+
+    def redirect_legacy_page(self, page):
+        try:
+            number = int(page)
+        except ValueError:
+            raise Http404("Invalid page.")
+        if number < 1:
+            raise Http404("Invalid page.")
+
+        cursor = None
+        if number > 1:
+            # One last offset query, so crawlers move over to cursor URLs.
+            offset = (number - 1) * self.get_paginate_by(None) - 1
+            last = self._ordered(self.get_queryset()).only("id", "created_at")[offset : offset + 1].first()
+            if last is None:
+                raise Http404("Invalid page.")
+            cursor = encode_cursor(last)
+        return HttpResponsePermanentRedirect(f"{self.request.path}{self._query_string(cursor)}")
+
+    def paginate_queryset(self, queryset, page_size):
+        cursor = self.request.GET.get(self.cursor_kwarg)
+        direction = NEXT
+        if cursor:
+            try:
+                created_at, pk, direction = decode_cursor(cursor)
+            except ValueError:
+                raise Http404("Invalid cursor.")
+            if direction == NEXT:
+                queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+            else:
+                queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+
+        if direction == NEXT:
+            object_list = list(self._ordered(queryset)[: page_size + 1])
+            has_more = len(object_list) > page_size
+            object_list = object_list[:page_size]
+            has_next, has_previous = has_more, bool(cursor)
+        else:
+            object_list = list(queryset.order_by("created_at", "id")[: page_size + 1])
+            has_more = len(object_list) > page_size
+            object_list = object_list[:page_size][::-1]
+            has_next, has_previous = True, has_more
+
+        page = KeysetPage(
+            object_list,
+            has_next=has_next and bool(object_list),
+            has_previous=has_previous and bool(object_list),
+            next_url=self._query_string(encode_cursor(object_list[-1])) if has_next and object_list else None,
+            previous_url=(
+                self._query_string(encode_cursor(object_list[0], PREVIOUS)) if has_previous and object_list else None
+            ),
+        )
+        return None, page, page.object_list, page.has_other_pages()
+
+    @staticmethod
+    def _ordered(queryset):
+        return queryset.order_by("-created_at", "-id")
+
+    def _query_string(self, cursor=None, **extra):
+        """
+        Current query string with the cursor (and any `extra` parameter) replaced, keeping the other
+        parameters (e.g. a search). Parameters given as None are dropped.
+        """
+        params = self.request.GET.copy()
+        params.pop(self.legacy_page_kwarg, None)
+        for key, value in {self.cursor_kwarg: cursor, **extra}.items():
+            params.pop(key, None)
+            if value is not None:
+                params[key] = value
+        return f"?{params.urlencode()}" if params else ""
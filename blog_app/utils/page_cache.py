@@ -0,0 +1,117 @@
+"""
+Full-page cache of public pages for anonymous readers.
+
+Views opt in with `AnonymousPageCacheMixin`, and the whole cache is disabled while
+`PAGE_CACHE_TIMEOUT` is 0 or the generation counters aren't shared by every worker (see
+`generations_shared`). A cached page is served before the view runs: no ORM query, markdown
+rendering or context processor, and no database round trip at all.
+
+Only requests that can't be personalized are cached: GET and HEAD requests without a session or
+messages cookie. Only responses that are safe to share are stored: 200 responses that set no
+cookie and didn't use a CSRF token.
+
+Keys embed the generations the page depends on (see `blog_app.utils.generation`). Every entry,
+tag or category change moves `ENTRIES`; a comment or vote only moves the generation of the page
+of its entry, so other pages stay cached. Pages also expire after `PAGE_CACHE_TIMEOUT` seconds in
+both tiers, which bounds how long a worker can serve a page that the rotating code tip has made
+stale.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from blog_app.utils.generation import ENTRIES, bump_generation, generations_shared, get_generations
+from cryptek.caching import TieredCache
+
+CACHEABLE_METHODS = ("GET", "HEAD")
+CACHE_STATUS_HEADER = "X-Page-Cache"
+# Response headers stored with the page, so a cached page still answers conditional requests.
+VALIDATOR_HEADERS = ("ETag", "Last-Modified")
+
+page_cache = TieredCache(
+    prefix="page",
+    maxsize=getattr(settings, "PAGE_CACHE_SIZE", 128),
+    timeout=getattr(settings, "PAGE_CACHE_TIMEOUT", 0) or None,
+)
+
+
+def entry_page_generation(slug):
+    """Name of the generation of the detail page of the entry with `slug`."""
+    return f"entry-page:{slug}"
+
+
+def bump_entry_page(slug):
+    return bump_generation(entry_page_generation(slug))
+
+
+def is_cacheable_request(request):
+    if request.method not in CACHEABLE_METHODS:
+        return False
+    # A session may hold an authenticated user and the messages cookie pending messages: both personalize the page.
+    personal_cookies = (settings.SESSION_COOKIE_NAME, getattr(settings, "MESSAGE_COOKIE_NAME", "messages"))
+    return not any(name in request.COOKIES for name in personal_cookies)
+
+
+def is_cacheable_response(request, response):
+    if request.method != "GET" or response.status_code != 200 or response.streaming or response.cookies:
+        return False
+    if request.META.get("CSRF_COOKIE_NEEDS_UPDATE") or request.META.get("CSRF_COOKIE_USED"):
+        return False
+    cache_control = response.get("Cache-Control", "")
+    return "private" not in cache_control and "no-store" not in cache_control
+
+
+class AnonymousPageCacheMixin:
+    """
+    Serve the view's pages to anonymous readers from `page_cache`.
+
+    Attributes:
+        page_cache_vary_headers (tuple[str]): Request headers the page varies on, added to the key.
+    """
+
+    page_cache_vary_headers = ()
+
+    def page_cache_generations(self):
+        """Generations the page depends on."""
+        return [ENTRIES]
+
+    def page_cache_key(self):
+        request = self.request
+        parts = [request.build_absolute_uri()]
+        parts += [request.headers.get(header, "") for header in self.page_cache_vary_headers]
+        parts += [str(generation) for generation in get_generations(self.page_cache_generations())]
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def dispatch(self, request, *args, **kwargs):
+        timeout = getattr(settings, "PAGE_CACHE_TIMEOUT", 0)
+        if not timeout or not generations_shared() or not is_cacheable_request(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = self.page_cache_key()
+        cached = page_cache.get(key)
+        if cached is not None:
+            content_type, content, validators = cached
+            response = HttpResponse(content, content_type=content_type)
+            for header, value in validators.items():
+                response[header] = value
+            response[CACHE_STATUS_HEADER] = "hit"
+            last_modified = (
+                parse_http_date_safe(validators["Last-Modified"]) if "Last-Modified" in validators else None
+            )
+            return get_conditional_response(
+                request, etag=validators.get("ETag"), last_modified=last_modified, response=response
+            )
+
+        response = super().dispatch(request, *args, **kwargs)
+        if hasattr(response, "render") and callable(response.render):
+            # Rendered now, so the CSRF token use is known before deciding to store the page.
+            response.render()
+        if is_cacheable_response(request, response):
+            validators = {header: response[header] for header in VALIDATOR_HEADERS if response.has_header(header)}
+            page_cache.set(key, (response["Content-Type"], response.content, validators), timeout=timeout)
+            response[CACHE_STATUS_HEADER] = "miss"
+        return response
@@ -0,0 +1,312 @@
+"""
+"Related entries" of every published entry, precomputed into the `RelatedEntry` table.
+
+Each published entry is described by a vector: one column per tag and category it has, optionally
+followed by the TF-IDF weights of the words of its title, overview and content (scaled by
+`RELATED_ENTRIES_CONTENT_WEIGHT`). Vectors are L2-normalized, so the similarity of two entries is
+the cosine of their vectors, and the nearest neighbours of a block of entries are found with one
+matrix product followed by a partial sort.
+
+`rebuild_related_entries` recomputes the whole table; `update_related_entries` only recomputes the
+rows an entry change can affect; the receivers in `blog_app.signals` hand it to
+`RelatedEntriesUpdater` after each commit through `update_related_entries_on_commit`, so the
+request that saved the entry doesn't wait for it. Without content similarity an update only builds
+the vectors of the affected entries and of the entries sharing a tag or category with them: no
+other entry can score above zero.
+"""
+
+import logging
+import math
+import re
+import sys
+import threading
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r"[^\W\d_]{3,}")
+# Words kept in the TF-IDF vocabulary, the most widespread first.
+MAX_VOCABULARY = 5000
+# Entries whose neighbours are computed by one matrix product; bounds memory to BLOCK_SIZE x entries.
+BLOCK_SIZE = 512
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def keyword_matrix(entry_ids, subset=False):
+    """
+    Binary matrix with one row per entry of `entry_ids` and one column per tag or category in use.
+
+    With `subset`, only the keywords of `entry_ids` are loaded instead of those of every published entry.
+    """
+    from blog_app.models.entry import Entry
+
+    positions = {pk: row for row, pk in enumerate(entry_ids)}
+    columns = {}
+    rows, cols = [], []
+    for kind, through, field in ((0, Entry.tags.through, "tag_id"), (1, Entry.categories.through, "category_id")):
+        links = through.objects.filter(entry__status=1)
+        if subset:
+            links = links.filter(entry_id__in=entry_ids)
+        for entry_id, keyword_id in links.values_list("entry_id", field):
+            if entry_id in positions:
+                rows.append(positions[entry_id])
+                cols.append(columns.setdefault((kind, keyword_id), len(columns)))
+    matrix = np.zeros((len(entry_ids), len(columns)), dtype=np.float32)
+    matrix[rows, cols] = 1.0
+    return matrix
+
+
+def content_matrix(entry_ids):
+    """TF-IDF matrix of the title, overview and content words of `entry_ids`."""
+    from blog_app.models.entry import Entry
+
+    positions = {pk: row for row, pk in enumerate(entry_ids)}
+    counts = [Counter() for _ in entry_ids]
+    for pk, title, overview, content in Entry.objects.filter(status=1).values_list(
+        "pk", "title", "overview", "content"
+    ):
+        if pk in positions:
+            counts[positions[pk]].update(WORD_PATTERN.findall(f"{title} {overview} {content}".lower()))
+
+    document_frequency = Counter(word for words in counts for word in words)
+    # Words of a single entry can't relate two entries, and words of most entries don't discriminate.
+    vocabulary = [
+        word for word, frequency in document_frequency.most_common() if 1 < frequency <= max(len(entry_ids) // 2, 2)
+    ][:MAX_VOCABULARY]
+    columns = {word: column for column, word in enumerate(vocabulary)}
+
+    matrix = np.zeros((len(entry_ids), len(columns)), dtype=np.float32)
+    for row, words in enumerate(counts):
+        for word, count in words.items():
+            column = columns.get(word)
+            if column is not None:
+                matrix[row, column] = (1 + math.log(count)) * math.log(len(entry_ids) / document_frequency[word])
+    return matrix
+
+
+def entry_vectors(entry_ids, content_weight=0.0, subset=False):
+    """L2-normalized similarity vectors of `entry_ids`, one row per entry."""
+    vectors = _normalize_rows(keyword_matrix(entry_ids, subset))
+    if content_weight:
+        vectors = np.hstack([vectors, content_weight * _normalize_rows(content_matrix(entry_ids))])
+    return _normalize_rows(vectors)
+
+
+def nearest_neighbours(vectors, rows, count):
+    """
+    Find the `count` rows of `vectors` most similar to each of `rows`.
+
+    Returns:
+        dict: `{row: [(other_row, score), ...]}`, most similar first, without zero scores.
+    """
+    count = min(count, len(vectors) - 1)
+    neighbours = {}
+    if count <= 0:
+        return {row: [] for row in rows}
+    rows = np.asarray(rows, dtype=np.intp)
+    for start in range(0, len(rows), BLOCK_SIZE):
+        block = rows[start : start + BLOCK_SIZE]
+        scores = vectors[block] @ vectors.T
+        # An entry is not related to itself.
+        scores[np.arange(len(block)), block] = -1.0
+        top = np.argpartition(-scores, count - 1, axis=1)[:, :count]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        for row, others, values in zip(block.tolist(), top.tolist(), top_scores.tolist()):
+            neighbours[row] = [(other, value) for other, value in zip(others, values) if value > 0]
+    return neighbours
+
+
+def compute_related(entry_ids=None, count=None, content_weight=None):
+    """
+    Return `{entry_id: [(related_id, score), ...]}` for the published entries among `entry_ids`.
+
+    Args:
+        entry_ids (iterable[int]): Entries to compute neighbours for. Defaults to every published entry.
+        count (int): Neighbours kept per entry. Defaults to `RELATED_ENTRIES_COUNT`.
+        content_weight (float): Weight of the TF-IDF content vector relative to the tag and
+            category vector; 0 ignores the content. Defaults to `RELATED_ENTRIES_CONTENT_WEIGHT`.
+    """
+    from blog_app.models.entry import Entry
+
+    count = count if count is not None else getattr(settings, "RELATED_ENTRIES_COUNT", 4)
+    if content_weight is None:
+        content_weight = getattr(settings, "RELATED_ENTRIES_CONTENT_WEIGHT", 0.0)
+
+    if entry_ids is not None and not content_weight:
+        targets = list(Entry.objects.filter(status=1, pk__in=set(entry_ids)).values_list("id", flat=True))
+        if not targets:
+            return {}
+        candidates = sorted(set(targets) | keyword_neighbourhood(targets))
+        vectors = entry_vectors(candidates, subset=True)
+    else:
+        candidates = list(Entry.objects.filter(status=1).order_by("id").values_list("id", flat=True))
+        published = set(candidates)
+        targets = candidates if entry_ids is None else [pk for pk in entry_ids if pk in published]
+        if not targets:
+            return {}
+        vectors = entry_vectors(candidates, content_weight)
+
+    positions = {pk: row for row, pk in enumerate(candidates)}
+    neighbours = nearest_neighbours(vectors, [positions[pk] for pk in targets], count)
+    return {
+        candidates[row]: [(candidates[other], score) for other, score in related]
+        for row, related in neighbours.items()
+    }
+
+
+def keyword_neighbourhood(entry_ids):
+    """Published entries sharing a tag or category with one of `entry_ids`."""
+    from blog_app.models.entry import Entry
+
+    found = set()
+    for through, field in ((Entry.tags.through, "tag_id"), (Entry.categories.through, "category_id")):
+        keywords = through.objects.filter(entry_id__in=entry_ids).values(field)
+        found.update(
+            through.objects.filter(entry__status=1, **{f"{field}__in": keywords}).values_list("entry_id", flat=True)
+        )
+    return found
+
+
+def _store(related, replaced_ids):
+    from blog_app.models.related_entry import RelatedEntry
+
+    links = [
+        RelatedEntry(entry_id=entry_id, related_id=related_id, rank=rank, score=score)
+        for entry_id, neighbours in related.items()
+        for rank, (related_id, score) in enumerate(neighbours)
+    ]
+    with transaction.atomic():
+        rows = (
+            RelatedEntry.objects.all()
+            if replaced_ids is None
+            else RelatedEntry.objects.filter(entry_id__in=replaced_ids)
+        )
+        rows.delete()
+        RelatedEntry.objects.bulk_create(links, batch_size=500)
+    return len(links)
+
+
+def rebuild_related_entries(count=None, content_weight=None):
+    """Recompute the related entries of every published entry. Returns the number of links stored."""
+    return _store(compute_related(count=count, content_weight=content_weight), None)
+
+
+def affected_entry_ids(entry_ids):
+    """
+    Entries whose related entries may change when `entry_ids` change: the entries themselves, the
+    entries listing one of them, and the entries sharing a tag or category with one of them.
+    """
+    from blog_app.models.entry import Entry
+    from blog_app.models.related_entry import RelatedEntry
+
+    entry_ids = set(entry_ids)
+    affected = set(entry_ids)
+    affected.update(RelatedEntry.objects.filter(related_id__in=entry_ids).values_list("entry_id", flat=True))
+    for through, field in ((Entry.tags.through, "tag_id"), (Entry.categories.through, "category_id")):
+        keywords = through.objects.filter(entry_id__in=entry_ids).values(field)
+        affected.update(through.objects.filter(**{f"{field}__in": keywords}).values_list("entry_id", flat=True))
+    return affected
+
+
+def update_related_entries(entry_ids, count=None, content_weight=None):
+    """Recompute only the rows that a change to `entry_ids` can affect. Returns the number of links stored."""
+    affected = affected_entry_ids(entry_ids)
+    if not affected:
+        return 0
+    return _store(compute_related(affected, count=count, content_weight=content_weight), affected)
+
+
+def update_related_entries_on_commit(entry_ids):
+    """Recompute the rows affected by a change to `entry_ids` once the current transaction commits."""
+    entry_ids = set(entry_ids)
+    if not entry_ids:
+        return
+    # Entries that shared a keyword with `entry_ids` before the change can't be found after it.
+    affected_before = affected_entry_ids(entry_ids)
+    transaction.on_commit(lambda: related_entries_updater.schedule(entry_ids, affected_before), robust=True)
+
+
+class RelatedEntriesUpdater:
+    """
+    Recompute related entries in a background thread, off the request that changed the entries.
+
+    Changes scheduled while an update runs are merged into the next one, so a burst of saves costs
+    one recompute.
+
+    Attributes:
+        background (bool): Update from a daemon thread instead of inline.
+    """
+
+    def __init__(self, background=None):
+        self.background = (
+            background
+            if background is not None
+            else getattr(settings, "RELATED_ENTRIES_BACKGROUND", "test" not in sys.argv)
+        )
+        self.updates = 0
+        self.failed = 0
+        self._entry_ids = set()
+        self._affected = set()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def schedule(self, entry_ids, affected_before=()):
+        """
+        Recompute the rows affected by a change to `entry_ids`.
+
+        Args:
+            entry_ids (iterable[int]): Changed entries.
+            affected_before (iterable[int]): Entries they could affect before the change.
+        """
+        with self._lock:
+            self._entry_ids.update(entry_ids)
+            self._affected.update(affected_before)
+            if self.background:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="related-entries", daemon=True)
+                    self._thread.start()
+                return
+        self._update()
+
+    def stats(self):
+        return {"updates": self.updates, "failed": self.failed, "pending": len(self._entry_ids)}
+
+    def _update(self):
+        with self._lock:
+            entry_ids, self._entry_ids = self._entry_ids, set()
+            affected_before, self._affected = self._affected, set()
+        if not entry_ids:
+            return
+        try:
+            affected = affected_before | affected_entry_ids(entry_ids)
+            _store(compute_related(affected), affected)
+        except Exception:
+            self.failed += 1
+            logger.exception(f"Failed to update the related entries of {len(entry_ids)} entries")
+        else:
+            self.updates += 1
+
+    def _run(self):
+        try:
+            while True:
+                with self._lock:
+                    if not self._entry_ids:
+                        self._thread = None
+                        return
+                self._update()
+        finally:
+            connections.close_all()
+
+
+related_entries_updater = RelatedEntriesUpdater()
@@ -0,0 +1,109 @@
+"""
+Cache of search results.
+
+Only the ranked ids of the matching entries are stored, never rendered pages, so one cached value
+serves every page of a query and the entries themselves are always loaded fresh. Keys embed the
+`ENTRIES` generation, which the receivers in `blog_app.signals` bump on any entry, tag or category
+change: results built before a change can no longer be looked up, and invalidation costs a single
+counter increment however many queries are cached.
+
+That only holds when every worker sees the same counters, so the cache is bypassed unless they do
+(see `generations_shared`): a worker would otherwise keep serving results from before another
+worker's change.
+"""
+
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+
+from blog_app.utils.generation import ENTRIES, generations_shared, get_generation
+from cryptek.caching import TieredCache
+
+_MISSING = object()
+
+
+def normalize_query(query):
+    """Lowercase `query` and collapse its whitespace, so trivially different spellings share a result."""
+    return " ".join(query.lower().split())
+
+
+class SearchResultCache:
+    """
+    Search results cached per normalized query and entries generation, in process memory first and
+    then in the shared Django cache.
+
+    Attributes:
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that had to run the search.
+        hit_seconds (float): Total time spent answering hits.
+        miss_seconds (float): Total time spent answering misses, search included.
+    """
+
+    def __init__(self, maxsize=256, timeout=None):
+        self.cache = TieredCache(prefix="search", maxsize=maxsize, timeout=timeout)
+        self.hits = 0
+        self.misses = 0
+        self.hit_seconds = 0.0
+        self.miss_seconds = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(query, generation):
+        digest = hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()
+        return f"{generation}:{digest}"
+
+    def get_or_set(self, query, compute):
+        """Return the cached result of `query`, calling `compute()` and caching its result on a miss."""
+        if not generations_shared():
+            return compute()
+        started = time.perf_counter()
+        key = self.key(query, get_generation(ENTRIES))
+        value = self.cache.get(key, _MISSING)
+        hit = value is not _MISSING
+        if not hit:
+            value = compute()
+            self.cache.set(key, value)
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self.hit_seconds += elapsed
+            else:
+                self.misses += 1
+                self.miss_seconds += elapsed
+        return value
+
+    def clear(self):
+        self.cache.local.clear()
+        with self._lock:
+            self.hits = self.misses = 0
+            self.hit_seconds = self.miss_seconds = 0.0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        average_hit = self.hit_seconds / self.hits if self.hits else 0.0
+        average_miss = self.miss_seconds / self.misses if self.misses else None
+        return {
+            "size": len(self.cache.local),
+            "maxsize": self.cache.local.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "avg_hit_ms": round(average_hit * 1000, 3) if self.hits else None,
+            "avg_miss_ms": round(average_miss * 1000, 3) if average_miss is not None else None,
+            # Time the hits would have cost had they run the search, minus what they actually cost.
+            "saved_ms": (
+                round(self.hits * max(average_miss - average_hit, 0) * 1000, 3) if average_miss is not None else None
+            ),
+            "shared_hits": self.cache.shared_hits,
+            "shared_misses": self.cache.shared_misses,
+        }
+
+
+search_cache = SearchResultCache(
+    maxsize=getattr(settings, "SEARCH_CACHE_SIZE", 256),
+    timeout=getattr(settings, "SEARCH_CACHE_TIMEOUT", 60 * 10),
+)
@@ -0,0 +1,176 @@
+import bisect
+import threading
+import time
+import unicodedata
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.urls import NoReverseMatch, reverse
+
+from blog_app.utils.generation import ENTRIES, generations_shared, get_generation
+
+ENTRY = "entry"
+TAG = "tag"
+CATEGORY = "category"
+
+
+def normalize(text):
+    """Casefold `text` and strip its accents, so "Café" is suggested for "cafe"."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return " ".join("".join(char for char in decomposed if not unicodedata.combining(char)).split())
+
+
+def entry_url(slug):
+    """URL of the entry with `slug`, or None when the slug can't be routed (and the entry can't be opened)."""
+    try:
+        return reverse("blog_app:entry_detail", kwargs={"slug": slug})
+    except NoReverseMatch:
+        return None
+
+
+class Suggestion:
+    __slots__ = ("kind", "pk", "label", "url")
+
+    def __init__(self, kind, pk, label, url):
+        self.kind = kind
+        self.pk = pk
+        self.label = label
+        self.url = url
+
+    def as_dict(self):
+        return {"kind": self.kind, "label": self.label, "url": self.url}
+
+
+class SuggestionIndex:
+    """
+    In-process prefix index over published entry titles, tag names and category names.
+
+    Every word of a label starts one key (`"django views"` and `"views"` for "Django views"), so
+    suggestions match the beginning of any word. Keys are kept in a sorted array and a prefix
+    lookup is a `bisect` followed by a scan of the matching run, without any database access.
+
+    The index is built from the database on first use. Receivers in `blog_app.signals` apply
+    changes made by this process incrementally; changes made by other workers are noticed through
+    the `ENTRIES` generation counter, checked at most every `check_interval` seconds, and trigger a
+    rebuild. When the counters aren't shared by every worker (see `generations_shared`), every check
+    rebuilds instead, so another worker's changes show up within `check_interval` seconds.
+
+    Attributes:
+        check_interval (float): Seconds between two reads of the shared generation counter.
+    """
+
+    def __init__(self, check_interval=None):
+        self.check_interval = (
+            check_interval if check_interval is not None else getattr(settings, "SEARCH_INDEX_CHECK_INTERVAL", 5)
+        )
+        self._keys = []
+        self._suggestions = []
+        self._keys_by_item = {}
+        self._generation = None
+        self._checked_at = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._keys_by_item)
+
+    def suggest(self, prefix, limit=8):
+        """Return up to `limit` suggestions having a word starting with `prefix`, in alphabetical order."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        self.ensure_fresh()
+        with self._lock:
+            found = {}
+            index = bisect.bisect_left(self._keys, prefix)
+            while index < len(self._keys) and self._keys[index].startswith(prefix) and len(found) < limit:
+                suggestion = self._suggestions[index]
+                found.setdefault((suggestion.kind, suggestion.pk), suggestion)
+                index += 1
+            return list(found.values())
+
+    def ensure_fresh(self):
+        """Rebuild the index if it was never built or another worker may have changed the indexed data."""
+        now = time.monotonic()
+        if self._generation is not None and now - self._checked_at < self.check_interval:
+            return
+        generation = get_generation(ENTRIES)
+        self._checked_at = now
+        if generation != self._generation or not generations_shared():
+            self.rebuild(generation)
+
+    def rebuild(self, generation=None):
+        from blog_app.models.category import Category
+        from blog_app.models.entry import Entry
+        from blog_app.models.tag import Tag
+
+        search_url = reverse("blog_app:search")
+        items = [
+            Suggestion(ENTRY, pk, title, url)
+            for pk, title, slug in Entry.objects.filter(status=1).values_list("pk", "title", "slug")
+            if (url := entry_url(slug))
+        ]
+        items += [
+            Suggestion(kind, pk, name, f"{search_url}?{urlencode({'q': name})}")
+            for kind, model in ((TAG, Tag), (CATEGORY, Category))
+            for pk, name in model.objects.values_list("pk", "name")
+        ]
+
+        pairs = sorted(((key, item) for item in items for key in self._item_keys(item)), key=lambda pair: pair[0])
+        with self._lock:
+            self._keys = [key for key, _ in pairs]
+            self._suggestions = [item for _, item in pairs]
+            self._keys_by_item = {}
+            for item in items:
+                self._keys_by_item[(item.kind, item.pk)] = self._item_keys(item)
+            self._generation = generation
+
+    def update(self, suggestion, generation=None):
+        """
+        Insert or replace one suggestion. A suggestion without `label` only removes the existing one.
+
+        Args:
+            suggestion (Suggestion): Item to index.
+            generation (int): Generation the change produced, adopted when the index was current
+                just before it, so the worker that made the change doesn't rebuild.
+        """
+        with self._lock:
+            if self._generation is None:
+                # Not built yet: the first lookup will load everything anyway.
+                return
+            self._remove((suggestion.kind, suggestion.pk))
+            if suggestion.label:
+                keys = self._item_keys(suggestion)
+                for key in keys:
+                    index = bisect.bisect_right(self._keys, key)
+                    self._keys.insert(index, key)
+                    self._suggestions.insert(index, suggestion)
+                self._keys_by_item[(suggestion.kind, suggestion.pk)] = keys
+            self.adopt(generation)
+
+    def adopt(self, generation):
+        """Take `generation` as current if it directly follows the one the index is up to date with."""
+        with self._lock:
+            if generation is not None and self._generation is not None and generation == self._generation + 1:
+                self._generation = generation
+
+    def remove(self, kind, pk, generation=None):
+        self.update(Suggestion(kind, pk, None, None), generation)
+
+    def _remove(self, item_key):
+        for key in self._keys_by_item.pop(item_key, ()):
+            index = bisect.bisect_left(self._keys, key)
+            while index < len(self._keys) and self._keys[index] == key:
+                suggestion = self._suggestions[index]
+                if (suggestion.kind, suggestion.pk) == item_key:
+                    del self._keys[index]
+                    del self._suggestions[index]
+                    break
+                index += 1
+
+    @staticmethod
+    def _item_keys(item):
+        words = normalize(item.label).split()
+        return [" ".join(words[position:]) for position in range(len(words))]
+
+
+suggestion_index = SuggestionIndex()
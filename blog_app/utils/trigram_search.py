@@ -0,0 +1,169 @@
+"""
+Typo-tolerant matching of published entries by trigram similarity of their title and tag names.
+
+PostgreSQL answers with `pg_trgm` word similarity, served by the GIN trigram indexes created by
+migration `0014_trigram_indexes`. Other backends use `TrigramIndex`, an in-process inverted index
+from trigrams to title and tag words, rebuilt when the `ENTRIES` generation moves (or every
+`SEARCH_INDEX_CHECK_INTERVAL` seconds when the counters aren't shared by every worker).
+
+Both score a match like `pg_trgm`: the share of trigrams a query word has in common with the
+closest indexed word, and return nothing below `SEARCH_TRIGRAM_THRESHOLD`.
+"""
+
+import re
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from blog_app.utils.generation import ENTRIES, generations_shared, get_generation
+
+WORD_PATTERN = re.compile(r"[^\W_]+")
+# Tag matches rank a bit below title matches of the same similarity.
+TAG_WEIGHT = 0.8
+
+
+def trigrams(word):
+    """Trigrams of a word, padded like `pg_trgm` does (two spaces before, one after)."""
+    padded = f"  {word.lower()} "
+    return {padded[index : index + 3] for index in range(len(padded) - 2)}
+
+
+def words(text):
+    return WORD_PATTERN.findall(text.lower())
+
+
+def create_trigram_indexes(schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS entry_title_trgm_idx ON blog_app_entry "
+        "USING GIN (title gin_trgm_ops) WHERE status = 1"
+    )
+    schema_editor.execute("CREATE INDEX IF NOT EXISTS tag_name_trgm_idx ON blog_app_tag USING GIN (name gin_trgm_ops)")
+
+
+def drop_trigram_indexes(schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS entry_title_trgm_idx")
+    schema_editor.execute("DROP INDEX IF EXISTS tag_name_trgm_idx")
+
+
+class TrigramIndex:
+    """
+    In-process trigram inverted index over published entry titles and tag names.
+
+    Lookups only visit the words sharing at least one trigram with the query, so a misspelled
+    query costs the same as a correct one.
+
+    Attributes:
+        check_interval (float): Seconds between two reads of the shared generation counter.
+    """
+
+    def __init__(self, check_interval=None):
+        self.check_interval = (
+            check_interval if check_interval is not None else getattr(settings, "SEARCH_INDEX_CHECK_INTERVAL", 5)
+        )
+        self._postings = {}
+        self._word_trigrams = {}
+        self._word_entries = {}
+        self._generation = None
+        self._checked_at = 0
+        self._lock = threading.Lock()
+
+    def ensure_fresh(self):
+        now = time.monotonic()
+        if self._generation is not None and now - self._checked_at < self.check_interval:
+            return
+        generation = get_generation(ENTRIES)
+        self._checked_at = now
+        if generation != self._generation or not generations_shared():
+            self.rebuild(generation)
+
+    def rebuild(self, generation=None):
+        from blog_app.models.entry import Entry
+
+        word_entries = defaultdict(dict)
+        for pk, title in Entry.objects.filter(status=1).values_list("pk", "title"):
+            for word in words(title):
+                word_entries[word][pk] = 1.0
+        for pk, name in Entry.tags.through.objects.filter(entry__status=1).values_list("entry_id", "tag__name"):
+            for word in words(name):
+                word_entries[word][pk] = max(word_entries[word].get(pk, 0), TAG_WEIGHT)
+
+        postings = defaultdict(set)
+        word_trigrams = {}
+        for word in word_entries:
+            word_trigrams[word] = trigrams(word)
+            for trigram in word_trigrams[word]:
+                postings[trigram].add(word)
+
+        with self._lock:
+            self._postings = dict(postings)
+            self._word_trigrams = word_trigrams
+            self._word_entries = dict(word_entries)
+            self._generation = generation
+
+    def search(self, query, threshold, limit):
+        """Return `(entry_id, score)` pairs, best first, for entries whose words resemble every query word."""
+        query_words = words(query)
+        if not query_words:
+            return []
+        self.ensure_fresh()
+        with self._lock:
+            postings, word_trigrams, word_entries = self._postings, self._word_trigrams, self._word_entries
+
+        scores = None
+        for query_word in query_words:
+            query_trigrams = trigrams(query_word)
+            shared = defaultdict(int)
+            for trigram in query_trigrams:
+                for word in postings.get(trigram, ()):
+                    shared[word] += 1
+            best = {}
+            for word, count in shared.items():
+                similarity = count / (len(query_trigrams) + len(word_trigrams[word]) - count)
+                if similarity < threshold:
+                    continue
+                for pk, weight in word_entries[word].items():
+                    best[pk] = max(best.get(pk, 0), similarity * weight)
+            scores = best if scores is None else {pk: scores[pk] + score for pk, score in best.items() if pk in scores}
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(pk, score / len(query_words)) for pk, score in ranked]
+
+
+trigram_index = TrigramIndex()
+
+
+def similar_entry_ids(query, threshold=None, limit=None):
+    """Return the ids of the published entries whose title or tags resemble `query`, most similar first."""
+    threshold = threshold if threshold is not None else getattr(settings, "SEARCH_TRIGRAM_THRESHOLD", 0.3)
+    limit = limit or getattr(settings, "SEARCH_MAX_RESULTS", 200)
+    if connection.vendor != "postgresql":
+        return [pk for pk, _ in trigram_index.search(query, threshold, limit)]
+
+    text = " ".join(words(query))
+    if not text:
+        return []
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Scoped to the transaction, so `<%` (served by the trigram indexes) uses our threshold.
+        cursor.execute("SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)", [str(threshold)])
+        cursor.execute(
+            "SELECT id FROM ("
+            "SELECT e.id, word_similarity(%s, e.title) AS score FROM blog_app_entry e "
+            "WHERE e.status = 1 AND %s <%% e.title "
+            "UNION ALL "
+            "SELECT e.id, word_similarity(%s, t.name) * %s AS score FROM blog_app_tag t "
+            "JOIN blog_app_entry_tags et ON et.tag_id = t.id JOIN blog_app_entry e ON e.id = et.entry_id "
+            "WHERE e.status = 1 AND %s <%% t.name"
+            ") matches GROUP BY id ORDER BY MAX(score) DESC LIMIT %s",
+            [text, text, text, TAG_WEIGHT, text, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
@@ -1,4 +1,4 @@
-from blog_app.models.code_tip import CodeTip
+from blog_app.utils.code_tip_provider import code_tip_provider
 from django.http import JsonResponse
 from django.shortcuts import render
 from django.views.decorators.http import require_GET
@@ -10,10 +10,4 @@ def code_tip_box(request):
 
 @require_GET
 def code_tip_api(request):
-    from django.core.cache import cache
-
-    tip = cache.get("gemini_tip")
-    if not tip:
-        tip = CodeTip.generate_code_tip()
-        cache.set("gemini_tip", tip, timeout=60 * 10)
-    return JsonResponse(tip)
+    return JsonResponse(code_tip_provider.get_tip())
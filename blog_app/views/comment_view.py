@@ -4,11 +4,16 @@ import ast
 from blog_app.forms.comment_form import CommentForm
 from blog_app.models.comment import Comment
 from blog_app.models.entry import Entry
+from blog_app.utils import http_validators
+from blog_app.utils.comment_tree import CommentTree
+from blog_app.utils.json_stream import stream_json_page
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseForbidden, JsonResponse
+from django.db.models import F
+from django.http import HttpResponseForbidden, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils.decorators import method_decorator
 from django.views import View
+from django.views.decorators.http import condition
 from django.views.generic.detail import SingleObjectMixin
 from django.views.generic.edit import FormMixin
 
@@ -29,11 +34,20 @@ class CommentView(View, FormMixin, SingleObjectMixin):
         model (Comment): The model associated with this view.
         form_class (CommentForm): The form class used for creating and updating comments.
         template_name (str): The template used to render the view.
+        threads_per_page (int): Top-level comments returned per page by GET.
+        max_depth (int): Deepest reply level GET nests; deeper replies are flattened into their ancestor.
+        stream_page_size (int): Maximum number of comments sent by a streamed (`?stream=1`) GET.
+        stream_chunk_size (int): Rows fetched from the database per round trip while streaming.
     """
 
     model = Comment
     form_class = CommentForm
     template_name = "entry_detail.html"
+    threads_per_page = 20
+    max_depth = 5
+    stream_page_size = 500
+    stream_chunk_size = 100
+    stream_fields = ("id", "entry_id", "parent_id", "user_id", "content", "created_at", "updated_at")
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -59,11 +73,70 @@ class CommentView(View, FormMixin, SingleObjectMixin):
     def form_invalid(self, form):
         return JsonResponse({"success": False, "errors": form.errors}, status=400)
 
+    @method_decorator(
+        condition(etag_func=http_validators.comments_etag, last_modified_func=http_validators.comments_last_modified)
+    )
     def get(self, *args, **kwargs):
+        if self.request.GET.get("stream"):
+            return self.stream_comments()
+        if self.request.GET.get("format") == "flat":
+            return self.flat_comments()
+
+        try:
+            page = max(int(self.request.GET.get("page", 1)), 1)
+            depth = min(max(int(self.request.GET.get("depth", self.max_depth)), 0), self.max_depth)
+        except ValueError:
+            return JsonResponse({"success": False, "message": "Invalid page or depth"}, status=400)
+
+        entry = get_object_or_404(Entry.objects.only("id"), slug=self.kwargs["slug"], status=1)
+        tree = CommentTree.for_entry(entry)
+        threads, has_next = tree.page(page, self.threads_per_page)
+        return JsonResponse(
+            data={
+                "success": True,
+                "comments": [tree.serialize(thread, max_depth=depth) for thread in threads],
+                "count": tree.count,
+                "page": page,
+                "has_next": has_next,
+            },
+            status=200,
+        )
+
+    def flat_comments(self):
+        """
+        Return every comment of the entry as a flat list of rows, the response GET gave before it
+        returned threads. Kept for clients of that format; unlike threads, it includes hidden comments.
+        """
         entry = get_object_or_404(Entry, slug=self.kwargs["slug"], status=1)
         comments = entry.comments.all()
         return JsonResponse(data={"success": True, "comments": list(comments.values())}, status=200)
 
+    def stream_comments(self):
+        """
+        Stream the entry's active comments as a flat JSON list, oldest first.
+
+        Rows are read with a server-side iterator and encoded as they arrive, so memory stays flat
+        whatever the thread size. `?after=<id>` resumes from the `next` cursor of the previous page
+        and `?limit=` lowers the page size.
+        """
+        try:
+            after = int(self.request.GET.get("after", 0))
+            limit = min(max(int(self.request.GET.get("limit", self.stream_page_size)), 1), self.stream_page_size)
+        except ValueError:
+            return JsonResponse({"success": False, "message": "Invalid cursor or limit"}, status=400)
+
+        entry = get_object_or_404(Entry.objects.only("id"), slug=self.kwargs["slug"], status=1)
+        rows = (
+            Comment.objects.filter(entry=entry, active=True, id__gt=after)
+            .order_by("id")
+            .values(*self.stream_fields, username=F("user__username"))[: limit + 1]
+            .iterator(chunk_size=self.stream_chunk_size)
+        )
+        return StreamingHttpResponse(
+            stream_json_page(rows, limit, key="comments", batch_size=self.stream_chunk_size),
+            content_type="application/json",
+        )
+
     @method_decorator(login_required(login_url="/accounts/login/"))
     def post(self, *args, **kwargs):
         if not self.request.user.is_authenticated:
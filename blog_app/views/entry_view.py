@@ -3,35 +3,46 @@ import logging
 from blog_app.forms.comment_form import CommentForm
 from blog_app.models.entry import Entry
 from blog_app.serializers.entry_serializer import EntrySerializerOut
+from blog_app.utils import http_validators
+from blog_app.utils.fragment_cache import render_entry_fragments
+from blog_app.utils.generation import ENTRIES
+from blog_app.utils.keyset_pagination import KeysetPaginationMixin
+from blog_app.utils.page_cache import AnonymousPageCacheMixin, entry_page_generation
+from django.conf import settings
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from django.views.generic import DetailView, ListView
 from django.views.generic.edit import FormMixin
 
 logger = logging.getLogger(__name__)
 
 
-class EntryList(ListView):
+class EntryList(AnonymousPageCacheMixin, KeysetPaginationMixin, ListView):
     """
     Return all entries that are with status 1 (published) and order from the latest one.
     """
 
-    queryset = (
-        Entry.objects.defer(
-            "overview",
-            "id",
-            "slug",
-            "created_at",
-            "updated_at",
-            "content",
-            "author",
-        )
-        .filter(status=1)
-        .order_by("-created_at")
-    )
+    # Cards show every other field, and `updated_at` is part of their cache key.
+    queryset = Entry.objects.defer("content", "content_html").filter(status=1).order_by("-created_at", "-id")
     template_name = "home.html"
     paginate_by = 4
+    main_card_template = "main_post_card.html"
+    card_template = "post_card.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # The newest entry of the page gets the large card.
+        entries = context["entry_list"]
+        context["entry_cards"] = render_entry_fragments(
+            [
+                (self.main_card_template if index == 0 else self.card_template, entry)
+                for index, entry in enumerate(entries)
+            ]
+        )
+        return context
 
 
-class EntryDetail(FormMixin, DetailView):
+class EntryDetail(AnonymousPageCacheMixin, FormMixin, DetailView):
     """
     Retrieve an Entry by its slug.
     """
@@ -40,15 +51,26 @@ class EntryDetail(FormMixin, DetailView):
     template_name = "entry_detail.html"
     context_object_name = "entry"
     form_class = CommentForm
+    # `content` is only needed as a fallback for entries whose HTML hasn't been rendered yet.
     queryset = Entry.objects.defer(
         "overview",
-        "id",
-        "slug",
+        "content",
     ).filter(status=1)
 
+    @method_decorator(
+        condition(etag_func=http_validators.entry_etag, last_modified_func=http_validators.entry_last_modified)
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def page_cache_generations(self):
+        # Entries changes cover the entry itself and its related entries; comments and votes only move its own page.
+        return [ENTRIES, entry_page_generation(self.kwargs["slug"])]
+
     def get_context_data(self, **kwargs):
         try:
             context = super().get_context_data(**kwargs)
+            context["related_entries"] = self.get_related_entries(context["object"])
             del context["entry"]
             del context["view"]
             serializer = EntrySerializerOut(data=context["object"].__dict__)
@@ -58,3 +80,12 @@ class EntryDetail(FormMixin, DetailView):
                 raise Exception
         except Exception as e:
             logger.error(e)
+
+    @staticmethod
+    def get_related_entries(entry):
+        """Published entries precomputed as related to `entry`, most similar first, in one indexed query."""
+        return (
+            Entry.objects.filter(status=1, related_from__entry=entry)
+            .order_by("related_from__rank")
+            .only("title", "slug", "overview", "created_at")[: getattr(settings, "RELATED_ENTRIES_COUNT", 4)]
+        )
@@ -1,3 +1,4 @@
+from django.db import IntegrityError, transaction
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 from django.views import View
@@ -11,20 +12,16 @@ class LikeView(View):
         if not request.user.is_authenticated:
             return JsonResponse({"success": False, "message": "User not authenticated"}, status=403)
 
-        entry = get_object_or_404(Entry, slug=self.kwargs["slug"])
         like_type = request.POST.get("type", Like.LIKE)
-        user_agent = request.META.get("HTTP_USER_AGENT", "")
-        ip_address = request.META.get("REMOTE_ADDR", "")
-
-        like, created = Like.objects.update_or_create(
-            entry=entry,
-            user=request.user,
-            defaults={
-                "type": like_type,
-                "user_agent": user_agent,
-                "ip_address": ip_address,
-            },
-        )
+        if like_type not in Like.COUNTER_FIELDS:
+            return JsonResponse({"success": False, "message": "Invalid vote type"}, status=400)
+
+        entry = get_object_or_404(Entry.objects.only("id"), slug=self.kwargs["slug"])
+        try:
+            created = self.vote(request, entry, like_type)
+        except IntegrityError:
+            # A concurrent first vote of the same user was inserted first: this one replaces it.
+            created = self.vote(request, entry, like_type)
 
         if created:
             message = f"{like_type.capitalize()} added successfully!"
@@ -32,6 +29,7 @@ class LikeView(View):
             message = f"{like_type.capitalize()} updated successfully!"
 
         # Return the updated counts in the response
+        entry.refresh_from_db(fields=Entry.COUNTER_FIELDS)
         return JsonResponse(
             {
                 "success": True,
@@ -41,3 +39,25 @@ class LikeView(View):
             },
             status=201,
         )
+
+    @staticmethod
+    @transaction.atomic
+    def vote(request, entry, like_type):
+        """
+        Cast or change the user's vote; the `Like` signals move it between the entry counters.
+
+        An existing vote is locked, so two concurrent flips can't both be counted. A first vote has
+        no row to lock: two concurrent ones are kept apart by the (entry, user) unique constraint.
+
+        Returns:
+            bool: True if this was the user's first vote on the entry.
+        """
+        like = Like.objects.select_for_update().filter(entry=entry, user=request.user).first()
+        created = like is None
+        if created:
+            like = Like(entry=entry, user=request.user)
+        like.type = like_type
+        like.user_agent = request.META.get("HTTP_USER_AGENT", "")
+        like.ip_address = request.META.get("REMOTE_ADDR", "")
+        like.save()
+        return created
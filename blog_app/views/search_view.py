@@ -1,8 +1,17 @@
 from blog_app.models.entry import Entry
+from blog_app.utils import full_text_search, trigram_search
+from blog_app.utils.keyset_pagination import KeysetPage, KeysetPaginationMixin
+from blog_app.utils.search_cache import search_cache
+from blog_app.utils.suggestion_index import suggestion_index
+from django.conf import settings
 from django.db.models import Q
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_GET
 from django.views.generic import ListView
 from django_filters import rest_framework as filters
 
+MAX_SUGGESTIONS = 10
+
 
 class PostFilter(filters.FilterSet):
     q = filters.CharFilter(method="filter_by_all", label="Search")
@@ -11,22 +20,104 @@ class PostFilter(filters.FilterSet):
         model = Entry
         fields = []
 
+    # Ids of the matches of a search, best first.
+    ranked_ids = None
+    # How many of them only resemble the query (typo-tolerant fallback).
+    fuzzy_count = 0
+
     def filter_by_all(self, queryset, name, value):
-        return queryset.filter(Q(title__icontains=value) | Q(overview__icontains=value)).distinct()
+        self.ranked_ids, self.fuzzy_count = search_cache.get_or_set(value, lambda: self.rank(queryset, value))
+        return queryset.filter(pk__in=self.ranked_ids)
+
+    @staticmethod
+    def rank(queryset, value):
+        """
+        Run the search.
+
+        Returns:
+            tuple: `(ranked_ids, fuzzy_count)`, the ids of the matches best first and how many of
+            the last ones were only found by similarity.
+        """
+        ranked_ids = full_text_search.search_entry_ids(value)
+        if ranked_ids is None:
+            # No full-text index on this database: plain filtering, newest first.
+            matches = queryset.filter(Q(title__icontains=value) | Q(overview__icontains=value))
+            ranked_ids = list(
+                matches.order_by("-created_at", "-id").values_list("pk", flat=True)[
+                    : getattr(settings, "SEARCH_MAX_RESULTS", 200)
+                ]
+            )
+        fuzzy_count = 0
+        if len(ranked_ids) < getattr(settings, "SEARCH_MIN_RESULTS", 3):
+            found = set(ranked_ids)
+            similar = [pk for pk in trigram_search.similar_entry_ids(value) if pk not in found]
+            fuzzy_count = len(similar)
+            ranked_ids = ranked_ids + similar
+        return tuple(ranked_ids), fuzzy_count
+
+
+class PostListView(KeysetPaginationMixin, ListView):
+    """
+    Search published entries.
 
+    Matches are paginated by rank with `?offset=` over the bounded list of matching ids; only the
+    entries of the requested page are loaded and given a highlighted `search_snippet`. When too
+    few entries match, entries with a similar title or tag are appended. The list of ids is cached
+    per query until entries, tags or categories change. Without a query, entries are listed newest
+    first.
+    """
 
-class PostListView(ListView):
-    model = Entry
+    queryset = Entry.objects.filter(status=1).prefetch_related("categories")
     template_name = "search_bar.html"
     context_object_name = "object_list"
     filterset_class = PostFilter
+    paginate_by = 9
 
     def get_queryset(self):
         queryset = super().get_queryset()
         self.filterset = self.filterset_class(self.request.GET, queryset=queryset)
         return self.filterset.qs
 
+    def paginate_queryset(self, queryset, page_size):
+        ranked_ids = self.filterset.ranked_ids if self.filterset.is_valid() else None
+        if ranked_ids is None:
+            return super().paginate_queryset(queryset, page_size)
+
+        try:
+            offset = max(int(self.request.GET.get("offset", 0)), 0)
+        except ValueError:
+            raise Http404("Invalid offset.")
+        page_ids = ranked_ids[offset : offset + page_size]
+        entries = queryset.in_bulk(page_ids)
+        object_list = [entries[pk] for pk in page_ids if pk in entries]
+        terms = full_text_search.query_terms(self.request.GET.get("q", ""))
+        for entry in object_list:
+            entry.search_snippet = full_text_search.entry_snippet(entry, terms)
+
+        has_next = offset + page_size < len(ranked_ids)
+        page = KeysetPage(
+            object_list,
+            has_next=has_next,
+            has_previous=offset > 0,
+            next_url=self._query_string(offset=str(offset + page_size)) if has_next else None,
+            previous_url=(
+                self._query_string(offset=str(offset - page_size) if offset > page_size else None) if offset else None
+            ),
+        )
+        return None, page, page.object_list, page.has_other_pages()
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["filterset"] = self.filterset
         return context
+
+
+@require_GET
+def search_suggestions(request):
+    """Type-ahead suggestions for the search bar, answered from the in-process prefix index."""
+    try:
+        limit = min(max(int(request.GET.get("limit", 8)), 1), MAX_SUGGESTIONS)
+    except ValueError:
+        limit = MAX_SUGGESTIONS
+    suggestions = suggestion_index.suggest(request.GET.get("q", "")[:100], limit=limit)
+    return JsonResponse({"suggestions": [suggestion.as_dict() for suggestion in suggestions]})
@@ -0,0 +1,184 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe, bounded in-process mapping that evicts the least recently used key.
+
+    It keeps hit/miss counters so callers can report how effective the cache is.
+
+    Attributes:
+        maxsize (int): Maximum number of keys kept before the oldest one is evicted.
+        timeout (float): Default expiry in seconds of the values set; None keeps them until evicted.
+        hits (int): Number of lookups that found a value.
+        misses (int): Number of lookups that did not.
+    """
+
+    def __init__(self, maxsize=1024, timeout=None):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        item = self._data.get(key)
+        return item is not None and not self._expired(item)
+
+    @staticmethod
+    def _expired(item):
+        expires_at = item[1]
+        return expires_at is not None and time.monotonic() >= expires_at
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or self._expired(item):
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key, value, timeout=_MISSING):
+        """Store `value`, expiring it after `timeout` seconds (the cache's `timeout` by default)."""
+        if timeout is _MISSING:
+            timeout = self.timeout
+        expires_at = time.monotonic() + timeout if timeout is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+class TieredCache:
+    """
+    Two-level cache: a per-process `LRUCache` in front of a shared Django cache.
+
+    Lookups are served from process memory first, then from the Django cache (which is shared by
+    every worker), and only computed when both miss. Values found in the shared tier are promoted
+    into the local one.
+
+    Both tiers honour `timeout`. The local copy of a value promoted from the shared tier gets a
+    full `timeout` of its own, so it outlives the shared one by less than `timeout`.
+
+    Attributes:
+        prefix (str): Namespace prepended to every key stored in the Django cache.
+        timeout (int): Expiry in seconds of the values stored in either tier; None never expires them.
+        local (LRUCache): The in-process tier.
+        shared_hits (int): Local misses answered by the Django cache.
+        shared_misses (int): Lookups that missed both tiers.
+    """
+
+    def __init__(self, prefix, maxsize=1024, timeout=None, cache_alias="default"):
+        self.prefix = prefix
+        self.timeout = timeout
+        self.cache_alias = cache_alias
+        self.local = LRUCache(maxsize=maxsize, timeout=timeout)
+        self.shared_hits = 0
+        self.shared_misses = 0
+
+    @property
+    def shared(self):
+        return caches[self.cache_alias]
+
+    def _shared_key(self, key):
+        return f"{self.prefix}:{key}"
+
+    def get(self, key, default=None):
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = self.shared.get(self._shared_key(key), _MISSING)
+        if value is _MISSING:
+            self.shared_misses += 1
+            return default
+        self.shared_hits += 1
+        self.local.set(key, value)
+        return value
+
+    def set(self, key, value, timeout=_MISSING):
+        """Store `value` in both tiers, expiring it after `timeout` seconds (the cache's `timeout` by default)."""
+        if timeout is _MISSING:
+            timeout = self.timeout
+        self.local.set(key, value, timeout=timeout)
+        self.shared.set(self._shared_key(key), value, timeout=timeout)
+
+    def get_or_set(self, key, compute):
+        """Return the cached value for `key`, calling `compute()` and storing its result on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def get_many(self, keys):
+        """Return a dict with the cached values of `keys`, hitting the shared tier once for local misses."""
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.local.get(key, _MISSING)
+            if value is _MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+        if missing:
+            shared = self.shared.get_many([self._shared_key(key) for key in missing])
+            for key in missing:
+                shared_key = self._shared_key(key)
+                if shared_key in shared:
+                    self.shared_hits += 1
+                    found[key] = shared[shared_key]
+                    self.local.set(key, shared[shared_key])
+                else:
+                    self.shared_misses += 1
+        return found
+
+    def set_many(self, mapping, timeout=_MISSING):
+        if timeout is _MISSING:
+            timeout = self.timeout
+        for key, value in mapping.items():
+            self.local.set(key, value, timeout=timeout)
+        self.shared.set_many({self._shared_key(key): value for key, value in mapping.items()}, timeout=timeout)
+
+    def delete(self, key):
+        self.local.delete(key)
+        self.shared.delete(self._shared_key(key))
+
+    def stats(self):
+        stats = self.local.stats()
+        stats.update(shared_hits=self.shared_hits, shared_misses=self.shared_misses)
+        return stats
@@ -0,0 +1,41 @@
+"""
+Process-wide registry of runtime metrics.
+
+Components owning a cache or a counter register a provider, a callable returning a JSON-ready
+dict, usually from their `AppConfig.ready()`. `collect()` gathers every provider's current values
+for the staff-only metrics endpoint.
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_providers = {}
+_lock = threading.Lock()
+
+
+def register(name, provider):
+    """Register `provider` under `name`, replacing any provider previously registered with that name."""
+    with _lock:
+        _providers[name] = provider
+
+
+def unregister(name):
+    with _lock:
+        _providers.pop(name, None)
+
+
+def collect():
+    """Return `{name: provider()}` for every registered provider, in registration order."""
+    with _lock:
+        providers = list(_providers.items())
+    metrics = {}
+    for name, provider in providers:
+        try:
+            metrics[name] = provider()
+        except Exception:
+            # A broken provider must not hide the others.
+            logger.exception("Metrics provider %r failed.", name)
+            metrics[name] = None
+    return metrics
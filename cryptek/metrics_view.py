@@ -0,0 +1,14 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET
+
+from cryptek import metrics
+
+
+@require_GET
+@never_cache
+@staff_member_required
+def metrics_view(request):
+    """Current values of every registered metrics provider (cache sizes, hit ratios, latencies)."""
+    return JsonResponse(metrics.collect())
@@ -151,15 +151,59 @@ else:
     }
     DATABASES["default"]["OPTIONS"] = {"sslmode": "require"}
 
-# CACHES = {
-#     "default": {
-#         "BACKEND": "django_redis.cache.RedisCache",
-#         "LOCATION": "redis://127.0.0.1:6379/1",
-#         "OPTIONS": {
-#             "CLIENT_CLASS": "django_redis.client.DefaultClient",
-#         },
-#     }
-# }
+# CACHES. https://docs.djangoproject.com/es/5.1/ref/settings/#caches ===================================================
+# A cache shared by every worker, e.g. redis://127.0.0.1:6379/1. Without it each process has its own LocMemCache.
+REDIS_URL = env.str("REDIS_URL", "")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": REDIS_URL,
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            },
+        }
+    }
+# Whether every worker reads the same `default` cache (a single test process does). Only then are the generation
+# counters of `blog_app.utils.generation` trusted to tell a worker about changes made by the others.
+SHARED_CACHE = env.bool("SHARED_CACHE", bool(REDIS_URL) or "test" in sys.argv)
+
+# Render cache for the `markdown` template filter: per-process LRU size and shared (Django cache) expiry in seconds.
+MARKDOWN_RENDER_CACHE_SIZE = env.int("MARKDOWN_RENDER_CACHE_SIZE", 512)
+MARKDOWN_RENDER_CACHE_TIMEOUT = env.int("MARKDOWN_RENDER_CACHE_TIMEOUT", 60 * 60 * 24)
+
+# GEMINI CODE TIPS =====================================================================================================
+GEMINI_TIP_TTL = env.int("GEMINI_TIP_TTL", 60 * 30)  # Seconds a tip is shown before rotating to the next one.
+GEMINI_TIP_POOL_SIZE = env.int("GEMINI_TIP_POOL_SIZE", 3)  # Tips generated ahead of time for the next rotations.
+GEMINI_TIP_REFRESH_AHEAD = 60 * 5  # Start refilling the pool this many seconds before the current tip expires.
+GEMINI_TIP_LOCK_TIMEOUT = 60 * 2  # Expiry of the single-flight refresh lock, in case a worker dies mid-refresh.
+GEMINI_TIP_BACKGROUND_REFRESH = "test" not in sys.argv
+GEMINI_TIP_FALLBACK_POOL_SIZE = 10  # Stored tips sampled into the in-memory fallback rotation.
+GEMINI_TIP_FALLBACK_POOL_TTL = 60 * 10  # Seconds before the fallback rotation is sampled again.
+GEMINI_TIP_FAILURE_BACKOFF = 60 * 5  # Seconds without refresh attempts after Gemini failed.
+GEMINI_USAGE_FLUSH_INTERVAL = 0 if "test" in sys.argv else 30  # Seconds API usage is buffered before being written.
+
+# SEARCH ===============================================================================================================
+SEARCH_TEXT_CONFIG = env("SEARCH_TEXT_CONFIG", default="english")  # PostgreSQL text search configuration.
+SEARCH_MAX_RESULTS = env.int("SEARCH_MAX_RESULTS", 200)  # Ranked matches kept per query.
+SEARCH_MIN_RESULTS = env.int("SEARCH_MIN_RESULTS", 3)  # Below this many matches, similar entries are appended.
+SEARCH_TRIGRAM_THRESHOLD = env.float("SEARCH_TRIGRAM_THRESHOLD", 0.3)  # Minimum trigram similarity of those.
+SEARCH_INDEX_CHECK_INTERVAL = 5  # Seconds between checks for changes other workers made to in-process search indexes.
+SEARCH_CACHE_SIZE = env.int("SEARCH_CACHE_SIZE", 256)  # Queries whose results each process keeps in memory.
+SEARCH_CACHE_TIMEOUT = env.int("SEARCH_CACHE_TIMEOUT", 60 * 10)  # Seconds results stay in the shared cache.
+
+# RELATED ENTRIES ======================================================================================================
+RELATED_ENTRIES_COUNT = env.int("RELATED_ENTRIES_COUNT", 4)  # Related entries kept per entry.
+# Weight of the TF-IDF content similarity next to the tag and category similarity (0 ignores the content).
+RELATED_ENTRIES_CONTENT_WEIGHT = env.float("RELATED_ENTRIES_CONTENT_WEIGHT", 0.0)
+# Recompute related entries in a background thread, off the request that saved the entry.
+RELATED_ENTRIES_BACKGROUND = "test" not in sys.argv
+
+# PAGE CACHE ===========================================================================================================
+PAGE_CACHE_TIMEOUT = env.int("PAGE_CACHE_TIMEOUT", 0)  # Seconds anonymous pages stay cached; 0 disables the cache.
+PAGE_CACHE_SIZE = env.int("PAGE_CACHE_SIZE", 128)  # Pages each process keeps in memory.
+FRAGMENT_CACHE_SIZE = env.int("FRAGMENT_CACHE_SIZE", 512)  # Rendered post cards each process keeps in memory.
+FRAGMENT_CACHE_TIMEOUT = env.int("FRAGMENT_CACHE_TIMEOUT", 60 * 60)  # Seconds post cards stay cached.
 
 # AUTHENTICATION. https://docs.djangoproject.com/es/5.1/ref/settings/#auth =============================================
 AUTH_PASSWORD_VALIDATORS = [
@@ -223,13 +267,13 @@ CONTENT_SECURITY_POLICY = {
         ),
         # Allow image and media sources
         "img-src": (
-            "'self'", 
-            "data:", 
-            "https://ijmadalena.com", 
-            "https://res.cloudinary.com", 
+            "'self'",
+            "data:",
+            "https://ijmadalena.com",
+            "https://res.cloudinary.com",
             "https://res.cloudinary.com/dhwebrsx4/",
             "https://res.cloudinary.com/dhwebrsx4/image/upload/",
-            "https://res.cloudinary.com/dhwebrsx4/image/upload/c_fill,f_auto,q_auto:good/"
+            "https://res.cloudinary.com/dhwebrsx4/image/upload/c_fill,f_auto,q_auto:good/",
         ),
         "media-src": ("'self'", "https://ijmadalena.com"),
         # Fonts and Styles Configuration
@@ -259,9 +303,7 @@ CONTENT_SECURITY_POLICY = {
             "https://cdn.jsdelivr.net/npm/prismjs@1.29.0/themes/prism-tomorrow.min.css",
             "'unsafe-inline'",
         ),
-        "style-src-attr": (
-            "'unsafe-inline'",
-        ),
+        "style-src-attr": ("'unsafe-inline'",),
         # Scripts
         "script-src": (
             "'self'",
@@ -334,6 +376,17 @@ cloudinary.config(
     api_secret=env.str("CLOUDINARY_API_SECRET"),
     secure=True,
 )
+# Widths (px) of the header image variants offered to browsers through `srcset`.
+CLOUDINARY_RESPONSIVE_WIDTHS = env.list("CLOUDINARY_RESPONSIVE_WIDTHS", cast=int, default=[480, 768, 1024, 1600])
+# Header images are uploaded after the entry is saved, by a background worker (inline while testing).
+HEADER_IMAGE_UPLOADER = (
+    "blog_app.utils.header_image_uploads.LocalUploader"
+    if "test" in sys.argv
+    else "blog_app.utils.header_image_uploads.CloudinaryUploader"
+)
+HEADER_IMAGE_UPLOAD_BACKGROUND = "test" not in sys.argv
+HEADER_IMAGE_UPLOAD_ATTEMPTS = env.int("HEADER_IMAGE_UPLOAD_ATTEMPTS", 4)  # Attempts per image before giving up.
+HEADER_IMAGE_UPLOAD_RETRY_DELAY = 0 if "test" in sys.argv else 5  # Seconds before the first retry, doubled after.
 
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
@@ -409,8 +462,22 @@ MESSAGE_TAGS = {
 }
 
 # SESSIONS. https://docs.djangoproject.com/es/5.1/ref/settings/#sessions. ==============================================
-SESSION_ENGINE = "django.contrib.sessions.backends.cache"
+# Rows are written only when the session data changes. Sessions are read from the cache only when it is shared by
+# every worker: a per-process cache would keep serving a session logged out through another worker.
+SESSION_ENGINE = "user_app.backends"
 SESSION_CACHE_ALIAS = "default"
+SESSION_CACHE_READS = env.bool("SESSION_CACHE_READS", bool(REDIS_URL))
+# Seconds `last_activity` and request metadata of sessions are buffered before being written in one batch.
+SESSION_ACTIVITY_FLUSH_INTERVAL = 0 if "test" in sys.argv else 60
+# Seconds before unchanged request metadata (path, referer...) of a session is recorded again; IP and user agent
+# changes are recorded right away.
+SESSION_METADATA_REFRESH_INTERVAL = env.int("SESSION_METADATA_REFRESH_INTERVAL", 60 * 5)
+USER_AGENT_CACHE_SIZE = env.int("USER_AGENT_CACHE_SIZE", 1024)  # User Agents whose browser and platform are kept.
+# Locations of session IPs: geoip2 reader mode (auto, mmap_ext, mmap, file or memory), per-worker LRU size and
+# shared (Django cache) expiry in seconds of the resolved network prefixes.
+GEOIP_READER_MODE = env.str("GEOIP_READER_MODE", "mmap")
+GEOIP_CACHE_SIZE = env.int("GEOIP_CACHE_SIZE", 4096)
+GEOIP_CACHE_TIMEOUT = env.int("GEOIP_CACHE_TIMEOUT", 60 * 60 * 24 * 7)
 
 # DJANGO DEBUG TOOLBAR. https://django-debug-toolbar.readthedocs.io/en/latest/installation.html ========================
 INTERNAL_IPS = [
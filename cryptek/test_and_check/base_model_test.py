@@ -125,8 +125,16 @@ class BaseModelTestCase(TestCase):
 
             # Check if the model has unique fields that might cause conflicts
             # For models like Category with a unique slug generated from name
+            constrained_fields = {
+                name
+                for constraint in self.model._meta.constraints
+                if isinstance(constraint, models.UniqueConstraint)
+                for name in constraint.fields
+            }
             unique_char_fields = [
-                field for field in self.model._meta.fields if isinstance(field, models.CharField) and field.unique
+                field
+                for field in self.model._meta.fields
+                if isinstance(field, models.CharField) and (field.unique or field.name in constrained_fields)
             ]
 
             # If there are unique CharField fields, update them to ensure uniqueness
@@ -136,6 +144,16 @@ class BaseModelTestCase(TestCase):
                 unique_value = f"{unique_field.name}_{uuid.uuid4().hex[:8]}"
                 setattr(instance, unique_field.name, unique_value)
 
+            # Unique constraints over relations only (e.g. one vote per entry and user): point the
+            # first relation at the row of a fresh instance, so the saved copy doesn't clash.
+            for constraint in self.model._meta.constraints:
+                if not isinstance(constraint, models.UniqueConstraint) or not constraint.fields:
+                    continue
+                fields = [self.model._meta.get_field(name) for name in constraint.fields]
+                if all(field.is_relation for field in fields):
+                    fresh = self.Meta.factory.create()
+                    setattr(instance, fields[0].name, getattr(fresh, fields[0].name))
+
             # Now update the integer field
             setattr(instance, field_name, 42)
             instance.save()
@@ -22,12 +22,15 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.contrib.sitemaps.views import sitemap
 from django.urls import include, path
+from django.views.decorators.http import condition
 from django.views.generic import RedirectView
 
 from blog_app.sitemaps import EntrySitemap
+from blog_app.utils.http_validators import sitemap_etag, sitemap_last_modified
 from blog_app.views.code_tip_view import code_tip_api
 from blog_app.views.email_verification_view import EmailConfirmationView
 from cryptek.csp_report_view import csp_report_view
+from cryptek.metrics_view import metrics_view
 from message_app.views.contact_me_view import ContactMeView
 from message_app.views.contact_success_view import ContactSuccessView
 from user_app.views.about_me import about_me
@@ -41,7 +44,7 @@ sitemaps = {
 third_party_apps_urls = [
     path(
         "sitemap.xml",
-        sitemap,
+        condition(etag_func=sitemap_etag, last_modified_func=sitemap_last_modified)(sitemap),
         {"sitemaps": sitemaps},
         name="django.contrib.sitemaps.views.sitemap",
     ),
@@ -68,6 +71,7 @@ urlpatterns = (
             name="verify_email",
         ),
         path("api/code-tip/", code_tip_api, name="code_tip_api"),
+        path("metrics/", metrics_view, name="metrics"),
     ]
     + third_party_apps_urls
     + debug_toolbar_urls()
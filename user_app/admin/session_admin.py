@@ -4,6 +4,7 @@ from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 from user_app.models.session import Session
 from user_app.templatetags.session_filters import device, location
+from user_app.utils.geoip_resolver import geoip_resolver
 
 
 class ExpiredFilter(admin.SimpleListFilter):
@@ -66,6 +67,12 @@ class SessionAdmin(admin.ModelAdmin):
         User = get_user_model()
         return "ip", f"user__{getattr(User, 'USERNAME_FIELD', 'username')}"
 
+    def get_changelist_instance(self, request):
+        changelist = super().get_changelist_instance(request)
+        # Resolve every address of the page at once; the `location` column then reads the resolver's LRU.
+        geoip_resolver.resolve_many(session.ip for session in changelist.result_list)
+        return changelist
+
     def is_valid(self, obj):
         return obj.expire_date > now()
 
@@ -75,7 +82,7 @@ class SessionAdmin(admin.ModelAdmin):
         return location(obj.ip)
 
     def device(self, obj):
-        return device(obj.user_agent) if obj.user_agent else ""
+        return device(obj.user_agent) or ""
 
 
 admin.site.register(Session, SessionAdmin)
@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class UserAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "user_app"
+
+    def ready(self):
+        from cryptek import metrics
+        from user_app.templatetags.markdown_extras import render_cache
+        from user_app.utils.geoip_resolver import geoip_resolver
+        from user_app.utils.session_activity import session_activity
+        from user_app.utils.user_agent_parser import user_agent_parser
+
+        metrics.register("markdown_render_cache", render_cache.stats)
+        metrics.register("session_activity", session_activity.stats)
+        metrics.register("user_agent_parser", user_agent_parser.stats)
+        metrics.register("geoip", geoip_resolver.stats)
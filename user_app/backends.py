@@ -1,13 +1,34 @@
-import datetime
+import logging
 
+from django.conf import settings
 from django.contrib import auth
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
 from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.db import connections, router
+from django.utils import timezone
 
+from user_app.utils.session_activity import session_activity
 
-class SessionStore(DBStore):
+logger = logging.getLogger("django.contrib.sessions")
+
+KEY_PREFIX = "user_app.sessions"
+METADATA_KEY_PREFIX = "user_app.sessions.metadata"
+# Request metadata stored on the session row.
+METADATA_FIELDS = ("ip", "user_agent", "referer", "accept_language", "request_path", "timestamp")
+# Metadata whose change (another network or device) is written without waiting for the refresh interval.
+MATERIAL_FIELDS = ("ip", "user_agent")
+
+
+class SessionStore(CachedDBStore):
     """
     SessionStore is a specialized session management class designed to handle session-specific
-    data and operations while extending the functionality of a database-backed session store.
+    data and operations while extending the functionality of a cached, database-backed session store.
+
+    With `SESSION_CACHE_READS` (a cache shared by every worker), sessions are read from the cache and
+    only fall back to the database on a miss. Otherwise they are read from the database, so a session
+    deleted through one worker is gone for all of them. A save writes the row only when the session
+    data actually changed since it was loaded; `last_activity` and the request metadata of existing
+    sessions are buffered by `session_activity` and written in batches.
 
     It provides methods for manipulating and maintaining session details, including metadata like
     user agent, IP address, and user ID. The class ensures proper initialization, retrieval, and
@@ -23,12 +44,15 @@ class SessionStore(DBStore):
             200 characters.
         accept_language (str): Information about the client's preferred languages, truncated to a
             maximum length of 200 characters.
-        request_path (str): Request path of the client for this session.
+        request_path (str): Request path of the client for this session, truncated to a maximum
+            length of 200 characters.
         timestamp (datetime.datetime): Timestamp of the session's creation or update. Defaults to
             the current time if not provided.
         user_id (int or None): The ID of the user associated with the session, if applicable.
     """
 
+    cache_key_prefix = KEY_PREFIX
+
     def __init__(
         self,
         session_key=None,
@@ -45,9 +69,11 @@ class SessionStore(DBStore):
         self.ip = ip
         self.referer = referer[:200] if referer else referer
         self.accept_language = accept_language[:200] if accept_language else accept_language
-        self.request_path = request_path
-        self.timestamp = timestamp if timestamp else datetime.datetime.now()
+        self.request_path = request_path[:200] if request_path else request_path
+        self.timestamp = timestamp if timestamp else timezone.now()
         self.user_id = None
+        # Serialized data last loaded from or written to the store, None until then.
+        self._stored_data = None
 
     # Used by superclass to get self.model, which is used elsewhere
     @classmethod
@@ -66,11 +92,130 @@ class SessionStore(DBStore):
         s = super()._get_session_from_db()
         if s is not None:
             self.user_id = s.user_id
-            # do not overwrite user_agent/ip, as those might have been updated
-            if self.user_agent != s.user_agent or self.ip != s.ip:
-                self.modified = True
         return s
 
+    @property
+    def metadata_cache_key(self):
+        return METADATA_KEY_PREFIX + self._get_or_create_session_key()
+
+    @staticmethod
+    def cache_reads():
+        return getattr(settings, "SESSION_CACHE_READS", False)
+
+    def load(self):
+        # Same as `CachedDBStore.load`, also fetching the metadata last recorded for the session.
+        cache_reads = self.cache_reads()
+        keys = [self.cache_key, self.metadata_cache_key] if cache_reads else [self.metadata_cache_key]
+        try:
+            cached = self._cache.get_many(keys)
+        except Exception:
+            cached = {}
+        data = cached.get(self.cache_key)
+        if data is None:
+            s = self._get_session_from_db()
+            if s:
+                data = self.decode(s.session_data)
+                if cache_reads:
+                    self._cache.set(self.cache_key, data, self.get_expiry_age(expiry=s.expire_date))
+            else:
+                data = {}
+        if self.session_key is not None:
+            self._stored_data = self._serialize(data)
+            self.user_id = data.get(auth.SESSION_KEY)
+            self.record_activity(cached.get(self.metadata_cache_key), data.get("_session_expiry"))
+        return data
+
+    def metadata(self):
+        """Request metadata given to the store, without the missing values."""
+        return {field: getattr(self, field) for field in METADATA_FIELDS if getattr(self, field) is not None}
+
+    def record_activity(self, recorded=None, expiry=None):
+        """
+        Buffer `last_activity` and the request metadata for a batched write, if they are worth writing.
+
+        Args:
+            recorded (dict): Metadata last recorded for the session, kept in the cache. Activity is only
+                recorded again when its material fields changed or it is older than
+                `SESSION_METADATA_REFRESH_INTERVAL` seconds.
+            expiry: Expiry stored in the session data, read before the session is loaded.
+        """
+        metadata = self.metadata()
+        now = timezone.now()
+        if recorded is not None:
+            age = (now - recorded["last_activity"]).total_seconds()
+            changed = any(field in metadata and metadata[field] != recorded.get(field) for field in MATERIAL_FIELDS)
+            if not changed and age < getattr(settings, "SESSION_METADATA_REFRESH_INTERVAL", 60 * 5):
+                return
+        session_activity.record(self.session_key, last_activity=now, **metadata)
+        self._remember_metadata(now, metadata, self.get_expiry_age(expiry=expiry))
+
+    def _remember_metadata(self, last_activity, metadata, timeout):
+        try:
+            self._cache.set(self.metadata_cache_key, {**metadata, "last_activity": last_activity}, timeout)
+        except Exception:
+            logger.exception("Error saving to cache (%s)", self._cache)
+
+    def save(self, must_create=False):
+        data = self._serialize(self._get_session(no_load=must_create))
+        if not must_create and self.session_key is not None and data == self._stored_data:
+            # Flagged as modified, but holding the same data: the stored row and cache entry are current.
+            return
+        if self.cache_reads():
+            super().save(must_create)
+        else:
+            DBStore.save(self, must_create)
+        self._stored_data = data
+        # The row now holds the current metadata as well.
+        self._remember_metadata(timezone.now(), self.metadata(), self.get_expiry_age())
+
+    def exists(self, session_key):
+        if self.cache_reads():
+            return super().exists(session_key)
+        return DBStore.exists(self, session_key)
+
+    def delete(self, session_key=None):
+        super().delete(session_key)
+        session_key = session_key or self.session_key
+        if session_key is not None:
+            self._cache.delete(METADATA_KEY_PREFIX + session_key)
+            session_activity.discard(session_key)
+
+    def _serialize(self, data):
+        return self.serializer().dumps(data)
+
+    @classmethod
+    def delete_expired(cls, limit):
+        """
+        Delete up to `limit` expired sessions, the longest expired first, following the `expire_date` index.
+
+        Rows are deleted with a plain `DELETE`: their cache entries have expired with them.
+
+        Returns:
+            int: Number of sessions deleted.
+        """
+        model = cls.get_model_class()
+        keys = list(
+            model.objects.filter(expire_date__lt=timezone.now())
+            .order_by("expire_date")
+            .values_list("session_key", flat=True)[:limit]
+        )
+        if not keys:
+            return 0
+        connection = connections[router.db_for_write(model)]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {connection.ops.quote_name(model._meta.db_table)} "
+                f"WHERE session_key IN ({', '.join(['%s'] * len(keys))})",
+                keys,
+            )
+            return cursor.rowcount
+
+    @classmethod
+    def clear_expired(cls):
+        # Used by `clearsessions`: bounded chunks instead of one statement over the whole table.
+        while cls.delete_expired(1000):
+            pass
+
     def create(self):
         super().create()
         self._session_cache = {}
@@ -86,8 +231,9 @@ class SessionStore(DBStore):
             session_key=self._get_or_create_session_key(),
             session_data=self.encode(data),
             expire_date=self.get_expiry_date(),
+            last_activity=timezone.now(),
             user_agent=self.user_agent,
-            user_id=self.user_id,
+            user_id=data.get(auth.SESSION_KEY),
             ip=self.ip,
             referer=self.referer,
             accept_language=self.accept_language,
@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from user_app.backends import SessionStore
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired sessions in small chunks, pausing between them so live traffic keeps the table. "
+        "With --loop, keep purging every --interval seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of sessions deleted per DELETE statement.",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.1,
+            help="Seconds to sleep between two chunks.",
+        )
+        parser.add_argument(
+            "--max-seconds",
+            type=float,
+            default=0,
+            help="Stop a pass after this many seconds (0: until no expired session is left).",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Run forever, starting a new pass every --interval seconds.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=300,
+            help="Seconds between two passes with --loop.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            self.purge(options["batch_size"], options["pause"], options["max_seconds"], options["verbosity"] > 1)
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
+
+    def purge(self, batch_size, pause, max_seconds, verbose=False):
+        started = time.monotonic()
+        deleted = 0
+        chunks = 0
+        while True:
+            count = SessionStore.delete_expired(batch_size)
+            deleted += count
+            chunks += 1
+            if verbose and count:
+                self.stdout.write(f"Deleted {count} sessions (chunk {chunks}).")
+            elapsed = time.monotonic() - started
+            if count < batch_size or (max_seconds and elapsed >= max_seconds):
+                break
+            time.sleep(pause)
+
+        elapsed = time.monotonic() - started
+        rate = deleted / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {deleted} expired sessions in {chunks} chunks, {elapsed:.1f}s ({rate:.0f} sessions/s)."
+            )
+        )
+        return deleted
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2025-05-28 18:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user_app", "0005_auto_20250408_1555"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="session",
+            name="last_activity",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
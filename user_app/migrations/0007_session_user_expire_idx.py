@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2025-05-29 08:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user_app", "0006_session_last_activity"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="session",
+            index=models.Index(fields=["user", "expire_date"], name="session_user_expire_idx"),
+        ),
+    ]
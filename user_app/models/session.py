@@ -1,7 +1,12 @@
 from django.conf import settings
 from django.contrib.sessions.base_session import AbstractBaseSession, BaseSessionManager
+from django.core.cache import caches
 from django.db import models
-from user_app.backends import SessionStore
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from user_app.backends import METADATA_KEY_PREFIX, SessionStore
+from user_app.utils.session_activity import session_activity
 
 
 class SessionManager(BaseSessionManager):
@@ -29,7 +34,8 @@ class Session(AbstractBaseSession):
         on_delete=models.CASCADE,
     )
     user_agent = models.CharField(null=True, blank=True, max_length=200)
-    last_activity = models.DateTimeField(auto_now=True)
+    # Written by `SessionStore` on data changes and by `session_activity` in batches, not on every save.
+    last_activity = models.DateTimeField(default=timezone.now)
     ip = models.GenericIPAddressField(null=True, blank=True, verbose_name="IP")
     referer = models.CharField(null=True, blank=True, max_length=200, verbose_name="HTTP Referer")
     accept_language = models.CharField(null=True, blank=True, max_length=200, verbose_name="Accept-Language")
@@ -38,6 +44,12 @@ class Session(AbstractBaseSession):
 
     objects = SessionManager()
 
+    class Meta(AbstractBaseSession.Meta):
+        indexes = [
+            # A user's active sessions: `user.session_set.filter(expire_date__gt=now())`.
+            models.Index(fields=["user", "expire_date"], name="session_user_expire_idx"),
+        ]
+
     # Used in get_decoded
     @classmethod
     def get_session_store_class(cls):
@@ -45,3 +57,12 @@ class Session(AbstractBaseSession):
 
     def __str__(self):
         return f"{self.user} - {self.ip}"
+
+
+@receiver(post_delete, sender=Session)
+def forget_deleted_session(sender, instance, **kwargs):
+    # Sessions are served from the cache: a deleted row (e.g. "log out other sessions") must leave it too.
+    caches[settings.SESSION_CACHE_ALIAS].delete_many(
+        [SessionStore.cache_key_prefix + instance.session_key, METADATA_KEY_PREFIX + instance.session_key]
+    )
+    session_activity.discard(instance.session_key)
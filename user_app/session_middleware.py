@@ -1,20 +1,24 @@
 from django.conf import settings
 from django.contrib.sessions.middleware import SessionMiddleware as DjangoSessionMiddleware
+from django.utils import timezone
 
 
 class SessionMiddleware(DjangoSessionMiddleware):
     """
     Middleware that provides ip and user_agent to the session store.
+
+    The store only writes them to the session row when they change materially or every
+    `SESSION_METADATA_REFRESH_INTERVAL` seconds, in batches, so capturing them costs no write per request.
     """
 
     def process_request(self, request):
         session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME, None)
         request.session = self.SessionStore(
-            # ip=request.META.get("REMOTE_ADDR", ""),
-            # user_agent=request.META.get("HTTP_USER_AGENT", ""),
-            # referer=request.META.get("HTTP_REFERER", ""),
-            # accept_language=request.META.get("HTTP_ACCEPT_LANGUAGE", ""),
-            # request_path=request.path,
-            # timestamp=datetime.now(),
+            ip=request.META.get("REMOTE_ADDR", ""),
+            user_agent=request.META.get("HTTP_USER_AGENT", ""),
+            referer=request.META.get("HTTP_REFERER", ""),
+            accept_language=request.META.get("HTTP_ACCEPT_LANGUAGE", ""),
+            request_path=request.path,
+            timestamp=timezone.now(),
             session_key=session_key,
         )
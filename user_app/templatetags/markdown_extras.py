@@ -1,19 +1,28 @@
+import hashlib
 import re
+import threading
 
 import bleach
 import markdown as md
 from django import template
+from django.conf import settings
 from django.template.defaultfilters import stringfilter
 
-register = template.Library()
+from cryptek.caching import TieredCache
 
+register = template.Library()
 
-@register.filter
-@stringfilter
-def markdown(value):
-    html = md.markdown(value, extensions=["markdown.extensions.fenced_code"])
+# Bump whenever the rendering pipeline below changes so stored renders (``Entry.content_html``) are rebuilt.
+RENDERER_VERSION = "1"
 
-    allowed_tags = list(bleach.sanitizer.ALLOWED_TAGS) + [
+MARKDOWN_EXTENSIONS = [
+    "fenced_code",
+    # "codehilite",
+    "tables",
+]
+ALLOWED_TAGS = frozenset(
+    list(bleach.sanitizer.ALLOWED_TAGS)
+    + [
         "p",
         "pre",
         "span",
@@ -32,51 +41,100 @@ def markdown(value):
         "strong",
         "mermaid",
     ]
-    allowed_attributes = {
-        "a": ["href", "title"],
-        "img": ["src", "alt", "loading"],
-        "code": ["class"],
-        "div": ["class", "mermaid"],
-    }
+)
+ALLOWED_ATTRIBUTES = {
+    "a": ["href", "title"],
+    "img": ["src", "alt", "loading"],
+    "code": ["class"],
+    "div": ["class", "mermaid"],
+}
+
+"""
+The selected code uses a regular expression to find and replace Mermaid code blocks in the HTML generated from Markdown.
+
+``` python
+    re.compile(r'<pre><code class="language-mermaid">(.*?)</code></pre>', re.DOTALL)
+```
+This compiles a regex pattern to match Mermaid code blocks.
+
+<pre><code class="language-mermaid">: Matches the opening tags of a code block with the class language-mermaid.
+
+- (.*?): A non-greedy match for any content inside the code block.
+
+- </code></pre>: Matches the closing tags of the code block.
+
+- re.DOTALL: Allows the . to match newline characters, enabling the pattern to match multi-line content.
+
+``` python
+    html = MERMAID_PATTERN.sub(r'<div class="mermaid">\1</div>', html)
+```
+This replaces the matched Mermaid code blocks with a div element.
+
+r'<div class="mermaid">\1</div>': The replacement string, where \1 refers to the content captured by the first group (.*?).
+
+html: The input HTML string where the replacement occurs.
+"""
+MERMAID_PATTERN = re.compile(r'<pre><code class="language-mermaid">(.*?)</code></pre>', re.DOTALL)
+
+# Identifies the whole rendering configuration, so a change in extensions or sanitizer rules changes every
+# fingerprint (and therefore every cache key and stored render).
+RENDER_CONFIG_SIGNATURE = hashlib.sha256(
+    repr(
+        (
+            RENDERER_VERSION,
+            MARKDOWN_EXTENSIONS,
+            sorted(ALLOWED_TAGS),
+            sorted((tag, sorted(attributes)) for tag, attributes in ALLOWED_ATTRIBUTES.items()),
+        )
+    ).encode("utf-8")
+).hexdigest()
 
+render_cache = TieredCache(
+    prefix="markdown",
+    maxsize=getattr(settings, "MARKDOWN_RENDER_CACHE_SIZE", 512),
+    timeout=getattr(settings, "MARKDOWN_RENDER_CACHE_TIMEOUT", 60 * 60 * 24),
+)
+
+# Neither `markdown.Markdown` nor `bleach.Cleaner` are thread-safe, so each thread gets its own pair.
+_renderers = threading.local()
+
+
+def _get_renderer():
+    if not hasattr(_renderers, "converter"):
+        _renderers.converter = md.Markdown(extensions=MARKDOWN_EXTENSIONS)
+        _renderers.cleaner = bleach.Cleaner(tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES)
+    return _renderers.converter, _renderers.cleaner
+
+
+def content_fingerprint(value):
+    """
+    Return a stable hash identifying the rendered output of ``value``.
+
+    The hash covers the markdown source and the rendering configuration, so two inputs with the
+    same fingerprint always produce the same HTML.
     """
-    The selected code uses a regular expression to find and replace Mermaid code blocks in the HTML generated from Markdown. 
-    
-    ``` python
-        re.compile(r'<pre><code class="language-mermaid">(.*?)</code></pre>', re.DOTALL)
-    ```
-    This compiles a regex pattern to match Mermaid code blocks.
-    
-    <pre><code class="language-mermaid">: Matches the opening tags of a code block with the class language-mermaid.
-    
-    - (.*?): A non-greedy match for any content inside the code block.
-    
-    - </code></pre>: Matches the closing tags of the code block.
-    
-    - re.DOTALL: Allows the . to match newline characters, enabling the pattern to match multi-line content.
-    
-    ``` python
-        html = mermaid_pattern.sub(r'<div class="mermaid">\1</div>', html)
-    ```
-    This replaces the matched Mermaid code blocks with a div element.
-    
-    r'<div class="mermaid">\1</div>': The replacement string, where \1 refers to the content captured by the first group (.*?).
-    
-    html: The input HTML string where the replacement occurs.
+    return hashlib.sha256(f"{RENDER_CONFIG_SIGNATURE}:{value}".encode("utf-8")).hexdigest()
+
+
+def render_markdown(value):
+    """
+    Render markdown into sanitized HTML.
+
+    This is the full pipeline used by the ``markdown`` filter: markdown conversion, Mermaid block
+    rewriting and ``bleach`` sanitization.
     """
+    converter, cleaner = _get_renderer()
+    html = converter.reset().convert(value)
+    html = MERMAID_PATTERN.sub(r'<div class="mermaid">\1</div>', html)
+    return cleaner.clean(html)
 
-    html = md.markdown(
-        value,
-        extensions=[
-            "fenced_code",
-            # "codehilite",
-            "tables",
-        ],
-    )
 
-    mermaid_pattern = re.compile(r'<pre><code class="language-mermaid">(.*?)</code></pre>', re.DOTALL)
-    html = mermaid_pattern.sub(r'<div class="mermaid">\1</div>', html)
+def render_markdown_cached(value):
+    """Same as `render_markdown`, but served from the shared render cache when possible."""
+    return render_cache.get_or_set(content_fingerprint(value), lambda: render_markdown(value))
 
-    html = bleach.clean(html, tags=allowed_tags, attributes=allowed_attributes)
 
-    return html
+@register.filter
+@stringfilter
+def markdown(value):
+    return render_markdown_cached(value)
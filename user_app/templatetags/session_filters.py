@@ -1,43 +1,9 @@
-import re
-import warnings
-
 from django import template
-from django.contrib.gis.geoip2 import HAS_GEOIP2
-from django.utils.translation import gettext_lazy as _
+from user_app.utils.geoip_resolver import geoip_resolver
+from user_app.utils.user_agent_parser import user_agent_parser
 
 register = template.Library()
 
-BROWSERS = (
-    (re.compile("Edg"), _("Edge")),
-    (re.compile("OPR"), _("Opera")),
-    (re.compile("Chrome"), _("Chrome")),
-    (re.compile("Safari"), _("Safari")),
-    (re.compile("Firefox"), _("Firefox")),
-    (re.compile("IE"), _("Internet Explorer")),
-)
-PLATFORMS = (
-    (re.compile("Windows Mobile"), _("Windows Mobile")),
-    (re.compile("Android"), _("Android")),
-    (re.compile("Linux"), _("Linux")),
-    (re.compile("iPhone"), _("iPhone")),
-    (re.compile("iPad"), _("iPad")),
-    (re.compile("Mac OS X 10[._]9"), _("OS X Mavericks")),
-    (re.compile("Mac OS X 10[._]10"), _("OS X Yosemite")),
-    (re.compile("Mac OS X 10[._]11"), _("OS X El Capitan")),
-    (re.compile("Mac OS X 10[._]12"), _("macOS Sierra")),
-    (re.compile("Mac OS X 10[._]13"), _("macOS High Sierra")),
-    (re.compile("Mac OS X 10[._]14"), _("macOS Mojave")),
-    (re.compile("Mac OS X 10[._]15"), _("macOS Catalina")),
-    (re.compile("Mac OS X"), _("macOS")),
-    (re.compile("NT 5.1"), _("Windows XP")),
-    (re.compile("NT 6.0"), _("Windows Vista")),
-    (re.compile("NT 6.1"), _("Windows 7")),
-    (re.compile("NT 6.2"), _("Windows 8")),
-    (re.compile("NT 6.3"), _("Windows 8.1")),
-    (re.compile("NT 10.0"), _("Windows 10")),
-    (re.compile("Windows"), _("Windows")),
-)
-
 
 @register.filter
 def platform(value):
@@ -52,14 +18,7 @@ def platform(value):
     * Linux
     * None
     """
-
-    platform = None
-    for regex, name in PLATFORMS:
-        if regex.search(value):
-            platform = name
-            break
-
-    return platform
+    return user_agent_parser.parse(value).platform
 
 
 @register.filter
@@ -75,14 +34,7 @@ def browser(value):
     * Firefox
     * None
     """
-
-    browser = None
-    for regex, name in BROWSERS:
-        if regex.search(value):
-            browser = name
-            break
-
-    return browser
+    return user_agent_parser.parse(value).browser
 
 
 @register.filter
@@ -99,39 +51,19 @@ def device(value):
     * Linux
     * None
     """
-
-    browser_ = browser(value)
-    platform_ = platform(value)
-
-    if browser_ and platform_:
-        return _("%(browser)s on %(device)s") % {
-            "browser": browser_,
-            "device": platform_,
-        }
-
-    if browser_:
-        return browser_
-
-    if platform_:
-        return platform_
-
-    return None
+    return user_agent_parser.device(value)
 
 
 @register.filter
 def city(value):
-    location = geoip() and geoip().city(value)
-    if location and location["city"]:
-        return location["city"]
-    return None
+    location = geoip_resolver.resolve(value)
+    return location["city"] if location and location["city"] else None
 
 
 @register.filter
 def country(value):
-    location = geoip() and geoip().country(value)
-    if location and location["country_name"]:
-        return location["country_name"]
-    return None
+    location = geoip_resolver.resolve(value)
+    return location["country_name"] if location else None
 
 
 @register.filter
@@ -145,33 +77,13 @@ def location(value):
     * The Netherlands
     * None
     """
-    try:
-        location = geoip() and geoip().city(value)
-    except Exception:
-        try:
-            location = geoip() and geoip().country(value)
-        except Exception as e:
-            warnings.warn(str(e), stacklevel=2)
-            location = None
-
-    if location and location["country_name"]:
-        if "city" in location and location["city"]:
-            return f"{location['city']}, {location['country_name']}"
-        return location["country_name"]
-    return None
-
-
-_geoip = None
+    location = geoip_resolver.resolve(value)
+    if location is None:
+        return None
+    if location["city"]:
+        return f"{location['city']}, {location['country_name']}"
+    return location["country_name"]
 
 
 def geoip():
-    global _geoip
-    if _geoip is None:
-        if HAS_GEOIP2:
-            from django.contrib.gis.geoip2 import GeoIP2
-
-            try:
-                _geoip = GeoIP2()
-            except Exception as e:
-                warnings.warn(str(e), stacklevel=2)
-    return _geoip
+    return geoip_resolver.reader
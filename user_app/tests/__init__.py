@@ -1,2 +1,7 @@
 from .factory_tests import *
 from .view_tests import *
+from .geoip_resolver_test import *
+from .markdown_extras_test import *
+from .purge_expired_sessions_test import *
+from .session_store_test import *
+from .user_agent_parser_test import *
@@ -0,0 +1,65 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from user_app.templatetags.session_filters import city, country, location
+from user_app.utils.geoip_resolver import GeoIPResolver, geoip_resolver, ip_prefix
+
+
+class FakeReader:
+    """In-memory `GeoIP2`: the city database knows 10.0.0.0/24, the country database 10.0.1.0/24."""
+
+    def __init__(self):
+        self.lookups = []
+
+    def city(self, ip):
+        self.lookups.append(ip)
+        if ip.startswith("10.0.0."):
+            return {"city": "Zwolle", "country_name": "The Netherlands"}
+        raise ValueError(f"{ip} not found")
+
+    def country(self, ip):
+        if ip.startswith("10.0.1."):
+            return {"country_code": "NL", "country_name": "The Netherlands"}
+        raise ValueError(f"{ip} not found")
+
+
+class GeoIPResolverTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.reader = FakeReader()
+        self.resolver = GeoIPResolver(reader=self.reader, maxsize=16)
+
+    def test_prefixes(self):
+        self.assertEqual(ip_prefix("192.168.1.77"), "192.168.1.0/24")
+        self.assertEqual(ip_prefix("2001:db8:1:2::1"), "2001:db8:1::/48")
+        self.assertIsNone(ip_prefix("unknown"))
+
+    def test_each_prefix_of_a_batch_is_looked_up_once(self):
+        resolved = self.resolver.resolve_many(["10.0.0.1", "10.0.0.2", "10.0.0.1", "10.0.1.5", "10.9.9.9", "", "nope"])
+        self.assertEqual(resolved["10.0.0.2"], {"city": "Zwolle", "country_name": "The Netherlands"})
+        self.assertEqual(resolved["10.0.1.5"], {"city": None, "country_name": "The Netherlands"})
+        self.assertIsNone(resolved["10.9.9.9"])
+        self.assertIsNone(resolved["nope"])
+        self.assertEqual(len(self.reader.lookups), 3)
+
+        self.resolver.resolve_many(["10.0.0.3", "10.0.1.6", "10.9.9.10"])
+        self.assertEqual(len(self.reader.lookups), 3)
+        self.assertEqual(self.resolver.stats()["hits"], 3)
+
+    def test_resolved_prefixes_are_shared_between_workers(self):
+        self.resolver.resolve("10.0.0.1")
+        other_reader = FakeReader()
+        other = GeoIPResolver(reader=other_reader)
+        self.assertEqual(other.resolve("10.0.0.200")["city"], "Zwolle")
+        self.assertEqual(other_reader.lookups, [])
+
+    def test_filters(self):
+        with mock.patch.object(geoip_resolver, "_reader", self.reader):
+            geoip_resolver.cache.local.clear()
+            self.assertEqual(location("10.0.0.1"), "Zwolle, The Netherlands")
+            self.assertEqual(location("10.0.1.1"), "The Netherlands")
+            self.assertEqual(city("10.0.0.1"), "Zwolle")
+            self.assertIsNone(city("10.0.1.1"))
+            self.assertEqual(country("10.0.1.1"), "The Netherlands")
+            self.assertIsNone(location("10.9.9.9"))
@@ -0,0 +1,29 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from user_app.templatetags import markdown_extras
+from user_app.templatetags.markdown_extras import content_fingerprint, markdown, render_cache
+
+
+class MarkdownFilterCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        render_cache.local.clear()
+
+    def test_filter_sanitizes_and_renders_mermaid(self):
+        html = markdown("Hi <script>alert(1)</script>\n\n```mermaid\ngraph TD; A-->B\n```")
+        self.assertNotIn("<script>", html)
+        self.assertIn('<div class="mermaid">', html)
+
+    def test_identical_input_is_rendered_once(self):
+        with mock.patch.object(markdown_extras, "render_markdown", wraps=markdown_extras.render_markdown) as render:
+            first = markdown("Same **comment** text")
+            second = markdown("Same **comment** text")
+        self.assertEqual(first, second)
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(render_cache.local.hits, 1)
+
+    def test_fingerprint_depends_on_input(self):
+        self.assertNotEqual(content_fingerprint("a"), content_fingerprint("b"))
+        self.assertEqual(content_fingerprint("a"), content_fingerprint("a"))
@@ -0,0 +1,34 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from user_app.backends import SessionStore
+from user_app.factory.session_factory import SessionFactory
+from user_app.models.session import Session
+
+
+class PurgeExpiredSessionsTestCase(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.expired = [
+            SessionFactory.create(session_key=f"expired{n}", expire_date=now - timedelta(days=n + 1)) for n in range(5)
+        ]
+        self.active = SessionFactory.create(session_key="active", expire_date=now + timedelta(days=1))
+
+    def test_expired_sessions_are_deleted_oldest_first_in_chunks(self):
+        self.assertEqual(SessionStore.delete_expired(2), 2)
+        remaining = set(Session.objects.values_list("session_key", flat=True))
+        self.assertEqual(remaining, {"expired0", "expired1", "expired2", "active"})
+
+    def test_command_purges_every_expired_session_and_reports_throughput(self):
+        out = StringIO()
+        call_command("purge_expired_sessions", batch_size=2, pause=0, stdout=out)
+        self.assertEqual(list(Session.objects.values_list("session_key", flat=True)), ["active"])
+        self.assertIn("Deleted 5 expired sessions in 3 chunks", out.getvalue())
+        self.assertIn("sessions/s", out.getvalue())
+
+    def test_clearsessions_uses_the_chunked_purge(self):
+        call_command("clearsessions")
+        self.assertEqual(Session.objects.count(), 1)
@@ -0,0 +1,179 @@
+from unittest import mock
+
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from user_app.backends import SessionStore
+from user_app.factory.cryptek_user_factory import CryptekUserFactory
+from user_app.models.session import Session
+from user_app.utils.session_activity import SessionActivityRecorder
+
+
+@override_settings(SESSION_CACHE_READS=True)
+class SessionStoreTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CryptekUserFactory.create()
+        self.store = SessionStore(ip="10.0.0.1", user_agent="Firefox")
+        self.store[SESSION_KEY] = str(self.user.pk)
+        self.store["theme"] = "dark"
+        self.store.create()
+        self.store[SESSION_KEY] = str(self.user.pk)
+        self.store["theme"] = "dark"
+        self.store.save()
+
+    def reopen(self):
+        store = SessionStore(session_key=self.store.session_key, ip="10.0.0.2", user_agent="Firefox")
+        store.load()
+        return store
+
+    def test_reads_are_served_from_the_cache(self):
+        # Only the (inline in tests) activity write reaches the database.
+        with self.assertNumQueries(1):
+            store = self.reopen()
+        self.assertEqual(store.load()["theme"], "dark")
+
+    def test_unchanged_data_is_not_written_back(self):
+        store = self.reopen()
+        store["theme"] = "dark"
+        self.assertTrue(store.modified)
+        with self.assertNumQueries(0):
+            store.save()
+
+    def test_changed_data_is_written_with_its_user(self):
+        store = self.reopen()
+        store["theme"] = "light"
+        store.save()
+
+        row = Session.objects.get(session_key=store.session_key)
+        self.assertEqual(row.get_decoded()["theme"], "light")
+        self.assertEqual(row.user_id, self.user.pk)
+
+    def test_activity_and_metadata_are_recorded_on_load(self):
+        self.reopen()
+        row = Session.objects.get(session_key=self.store.session_key)
+        self.assertEqual(row.ip, "10.0.0.2")
+
+    def test_unchanged_metadata_is_not_recorded_again(self):
+        self.reopen()
+        store = SessionStore(
+            session_key=self.store.session_key, ip="10.0.0.2", user_agent="Firefox", request_path="/b/"
+        )
+        with self.assertNumQueries(0):
+            store.load()
+        self.assertIsNone(Session.objects.get(session_key=self.store.session_key).request_path)
+
+    @override_settings(SESSION_METADATA_REFRESH_INTERVAL=0)
+    def test_metadata_is_recorded_again_after_the_refresh_interval(self):
+        self.reopen()
+        store = SessionStore(
+            session_key=self.store.session_key, ip="10.0.0.2", user_agent="Firefox", request_path="/b/"
+        )
+        store.load()
+        self.assertEqual(Session.objects.get(session_key=self.store.session_key).request_path, "/b/")
+
+    def test_middleware_captures_request_metadata(self):
+        self.client.force_login(self.user)
+        self.client.get(
+            reverse("user_app:session_list"),
+            REMOTE_ADDR="10.0.0.7",
+            HTTP_USER_AGENT="Safari",
+            HTTP_ACCEPT_LANGUAGE="es",
+        )
+        row = Session.objects.get(session_key=self.client.session.session_key)
+        self.assertEqual((row.ip, row.user_agent, row.accept_language), ("10.0.0.7", "Safari", "es"))
+
+    def test_deleted_rows_leave_the_cache(self):
+        Session.objects.filter(session_key=self.store.session_key).delete()
+        self.assertEqual(self.reopen().load(), {})
+
+    def test_long_request_paths_are_truncated(self):
+        store = SessionStore(request_path="/" + "a" * 300)
+        self.assertEqual(len(store.request_path), 200)
+
+
+class SessionStoreDatabaseReadsTestCase(TestCase):
+    """Without a cache shared by every worker, sessions are read from the database."""
+
+    def setUp(self):
+        cache.clear()
+        self.store = SessionStore(ip="10.0.0.1", user_agent="Firefox")
+        self.store["theme"] = "dark"
+        self.store.create()
+        self.store["theme"] = "dark"
+        self.store.save()
+
+    def test_sessions_deleted_elsewhere_are_gone(self):
+        # As if another worker deleted the row: this process's cache isn't told.
+        Session.objects.filter(session_key=self.store.session_key)._raw_delete(Session.objects.db)
+        store = SessionStore(session_key=self.store.session_key, ip="10.0.0.1", user_agent="Firefox")
+        self.assertEqual(store.load(), {})
+
+    def test_reads_hit_the_database(self):
+        store = SessionStore(session_key=self.store.session_key, ip="10.0.0.1", user_agent="Firefox")
+        with self.assertNumQueries(1):
+            self.assertEqual(store.load()["theme"], "dark")
+
+
+class SessionActivityRecorderTestCase(TestCase):
+    def setUp(self):
+        self.recorder = SessionActivityRecorder(flush_interval=60)
+        self.sessions = [
+            SessionStore(ip="10.0.0.1", user_agent="Firefox"),
+            SessionStore(ip="10.0.0.1", user_agent="Firefox"),
+        ]
+        for store in self.sessions:
+            store.create()
+
+    def tearDown(self):
+        self.recorder.flush()
+
+    def test_activity_is_coalesced_into_one_batch(self):
+        first, second = (store.session_key for store in self.sessions)
+        self.recorder.record(first, ip="10.0.0.2")
+        self.recorder.record(first, ip="10.0.0.3")
+        self.recorder.record(second, ip="10.0.0.4")
+        self.assertEqual(Session.objects.filter(ip="10.0.0.1").count(), 2)
+
+        with self.assertNumQueries(1):
+            self.recorder.flush()
+        self.assertEqual(Session.objects.get(session_key=first).ip, "10.0.0.3")
+        self.assertEqual(Session.objects.get(session_key=second).ip, "10.0.0.4")
+        self.assertEqual(self.recorder.stats(), {"recorded": 3, "written": 2, "pending": 0})
+
+    def test_discarded_sessions_are_not_written(self):
+        key = self.sessions[0].session_key
+        self.recorder.record(key, ip="10.0.0.9")
+        self.recorder.discard(key)
+        self.recorder.flush()
+        self.assertEqual(Session.objects.get(session_key=key).ip, "10.0.0.1")
+
+    def test_failed_sessions_are_retried_alone(self):
+        good, bad = (store.session_key for store in self.sessions)
+        write = SessionActivityRecorder._write
+
+        def fail_on_bad(sessions, fields):
+            if any(session.session_key == bad for session in sessions):
+                raise RuntimeError("db down")
+            write(sessions, fields)
+
+        self.recorder.record(good, ip="10.0.0.2")
+        self.recorder.record(bad, ip="10.0.0.3")
+        with mock.patch.object(SessionActivityRecorder, "_write", side_effect=fail_on_bad):
+            self.recorder.flush()
+        self.assertEqual(Session.objects.get(session_key=good).ip, "10.0.0.2")
+        self.assertEqual(self.recorder.stats(), {"recorded": 2, "written": 1, "pending": 1})
+
+        self.recorder.record(bad, user_agent="Chrome")
+        self.recorder.flush()
+        self.assertEqual(Session.objects.filter(session_key=bad, ip="10.0.0.3", user_agent="Chrome").count(), 1)
+
+    def test_sessions_are_dropped_after_max_attempts(self):
+        key = self.sessions[0].session_key
+        self.recorder.record(key, ip="10.0.0.2")
+        with mock.patch.object(SessionActivityRecorder, "_write", side_effect=RuntimeError("bad row")):
+            for _ in range(self.recorder.max_attempts):
+                self.recorder.flush()
+        self.assertEqual(self.recorder.stats()["pending"], 0)
+        self.assertEqual(Session.objects.get(session_key=key).ip, "10.0.0.1")
@@ -0,0 +1,59 @@
+import re
+
+from django.test import SimpleTestCase
+from user_app.templatetags.session_filters import browser, device, platform
+from user_app.utils.user_agent_parser import BROWSERS, PLATFORMS, UserAgentParser
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/124.0.0.0 Safari/537.36 Edg/124.0.2478.51",
+    "Mozilla/5.0 (Windows NT 6.1; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/109.0.0.0 Safari/537.36 OPR/95.0.0.0",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) "
+    "Version/17.4 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) "
+    "Version/17.4 Safari/605.1.15",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.9; rv:109.0) Gecko/20100101 Firefox/115.0",
+    "Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/124.0.0.0 Mobile Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64; rv:125.0) Gecko/20100101 Firefox/125.0",
+    "Mozilla/4.0 (compatible; MSIE 8.0; Windows NT 5.1; Trident/4.0)",
+    "Mozilla/4.0 (compatible; MSIE 6.0; Windows CE; IEMobile 7.11) Windows Mobile",
+    "curl/8.4.0",
+]
+
+
+def sequential(table, value):
+    """The classification of a table tried pattern by pattern, as it used to be done."""
+    for pattern, name in table:
+        if re.search(pattern, value):
+            return name
+    return None
+
+
+class UserAgentParserTestCase(SimpleTestCase):
+    def setUp(self):
+        self.parser = UserAgentParser(maxsize=4)
+
+    def test_one_pass_matches_the_tables_tried_in_order(self):
+        for value in USER_AGENTS:
+            with self.subTest(value=value):
+                parsed = self.parser.parse(value)
+                self.assertEqual(parsed.browser, sequential(BROWSERS, value))
+                self.assertEqual(parsed.platform, sequential(PLATFORMS, value))
+
+    def test_results_are_cached(self):
+        self.parser.parse(USER_AGENTS[0])
+        self.parser.parse(USER_AGENTS[0])
+        self.assertEqual(self.parser.stats()["hits"], 1)
+        for value in USER_AGENTS:
+            self.parser.parse(value)
+        self.assertEqual(self.parser.stats()["size"], 4)
+
+    def test_filters(self):
+        self.assertEqual(str(browser(USER_AGENTS[0])), "Edge")
+        self.assertEqual(str(platform(USER_AGENTS[2])), "iPhone")
+        self.assertEqual(str(device(USER_AGENTS[3])), "Safari on macOS Catalina")
+        self.assertEqual(str(device(USER_AGENTS[6])), "Firefox on Linux")
+        self.assertIsNone(device("curl/8.4.0"))
+        self.assertIsNone(device(""))
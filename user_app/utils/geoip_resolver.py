@@ -0,0 +1,103 @@
+"""
+Approximate location of IP addresses, from the GeoIP2 databases.
+
+Locations are resolved per network prefix (/24 for IPv4, /48 for IPv6), which is as precise as the
+databases get for most addresses, and kept in a `TieredCache`: a per-worker LRU in front of the
+shared Django cache, so a prefix is looked up in the database once for every worker. `resolve_many`
+resolves every distinct address of a page with a single round trip to the shared cache.
+"""
+
+import ipaddress
+import warnings
+
+from django.conf import settings
+from django.contrib.gis.geoip2 import HAS_GEOIP2
+
+from cryptek.caching import TieredCache
+
+# geoip2 reader modes, as accepted by the `cache` argument of `GeoIP2`.
+READER_MODES = {"auto": 0, "mmap_ext": 1, "mmap": 2, "file": 4, "memory": 8}
+IPV4_PREFIX = 24
+IPV6_PREFIX = 48
+
+
+def ip_prefix(ip):
+    """Network prefix `ip` is resolved by, or None if it isn't an IP address."""
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return None
+    length = IPV4_PREFIX if address.version == 4 else IPV6_PREFIX
+    return str(ipaddress.ip_network(f"{address}/{length}", strict=False))
+
+
+class GeoIPResolver:
+    """
+    Resolve IP addresses into `{"city": ..., "country_name": ...}` dicts, or None when unknown.
+
+    Attributes:
+        mode (str): Reader mode of the databases, one of `READER_MODES`. "mmap" maps them in memory,
+            shared by every worker of the host, without reading them whole into each process.
+        cache (TieredCache): Resolved locations by network prefix.
+    """
+
+    def __init__(self, reader=None, mode=None, maxsize=None, timeout=None):
+        self.mode = mode or getattr(settings, "GEOIP_READER_MODE", "mmap")
+        self.cache = TieredCache(
+            prefix="geoip",
+            maxsize=maxsize if maxsize is not None else getattr(settings, "GEOIP_CACHE_SIZE", 4096),
+            timeout=timeout if timeout is not None else getattr(settings, "GEOIP_CACHE_TIMEOUT", 60 * 60 * 24 * 7),
+        )
+        self._reader = reader
+        self._reader_failed = False
+
+    @property
+    def reader(self):
+        """The `GeoIP2` reader, opened on first use; None when the databases aren't available."""
+        if self._reader is None and not self._reader_failed and HAS_GEOIP2:
+            from django.contrib.gis.geoip2 import GeoIP2
+
+            try:
+                self._reader = GeoIP2(cache=READER_MODES[self.mode])
+            except Exception as e:
+                self._reader_failed = True
+                warnings.warn(str(e), stacklevel=2)
+        return self._reader
+
+    def resolve(self, ip):
+        return self.resolve_many([ip]).get(ip)
+
+    def resolve_many(self, ips):
+        """Return `{ip: location}` for the distinct addresses of `ips`, looking up each missing prefix once."""
+        prefixes = {ip: ip_prefix(ip) for ip in set(ips) if ip}
+        if not prefixes or self.reader is None:
+            return {ip: None for ip in prefixes}
+
+        found = self.cache.get_many({prefix for prefix in prefixes.values() if prefix})
+        resolved = {}
+        for ip, prefix in prefixes.items():
+            if prefix and prefix not in found and prefix not in resolved:
+                resolved[prefix] = self._lookup(ip)
+        if resolved:
+            self.cache.set_many(resolved)
+        found.update(resolved)
+        return {ip: found.get(prefix) for ip, prefix in prefixes.items()}
+
+    def stats(self):
+        return self.cache.stats()
+
+    def _lookup(self, ip):
+        try:
+            location = self.reader.city(ip)
+        except Exception:
+            # Not in the city database (or only the country database is installed).
+            try:
+                location = self.reader.country(ip)
+            except Exception:
+                return None
+        if not location or not location.get("country_name"):
+            return None
+        return {"city": location.get("city"), "country_name": location["country_name"]}
+
+
+geoip_resolver = GeoIPResolver()
@@ -0,0 +1,132 @@
+import atexit
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class SessionActivityRecorder:
+    """
+    Buffer session metadata (`last_activity`, IP, user agent...) and write it to `Session` rows in batches.
+
+    Only the latest values of each session are kept, so a reader browsing for a while costs one
+    row update per flush instead of one per request. Each flush writes every buffered session with a
+    `bulk_update` per set of fields. Buffered metadata is flushed `flush_interval` seconds after it
+    is recorded, and at interpreter exit. When a batch fails its sessions are written one by one,
+    and the ones that still fail are buffered again for the next flush, up to `max_attempts` flushes.
+
+    Attributes:
+        flush_interval (float): Seconds metadata is buffered before being written. 0 writes inline.
+        max_attempts (int): Flushes a session's metadata is tried in before being dropped.
+    """
+
+    max_attempts = 3
+
+    def __init__(self, flush_interval=None):
+        self.flush_interval = (
+            flush_interval if flush_interval is not None else getattr(settings, "SESSION_ACTIVITY_FLUSH_INTERVAL", 60)
+        )
+        self.recorded = 0
+        self.written = 0
+        self._pending = {}
+        # Failed flushes of each buffered session.
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self._timer = None
+        atexit.register(self.flush)
+
+    def record(self, session_key, **fields):
+        """Buffer `fields` as the latest metadata of the session with `session_key`."""
+        with self._lock:
+            self._pending.setdefault(session_key, {}).update(fields)
+            self.recorded += 1
+            self._schedule_flush()
+        if not self.flush_interval:
+            self.flush()
+
+    def discard(self, session_key):
+        """Drop the buffered metadata of a deleted session."""
+        with self._lock:
+            self._pending.pop(session_key, None)
+            self._attempts.pop(session_key, None)
+
+    def flush(self):
+        """Write every buffered metadata to the database."""
+        from user_app.models.session import Session
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not pending:
+            return
+
+        groups = defaultdict(list)
+        for session_key, fields in pending.items():
+            groups[tuple(sorted(fields))].append(Session(session_key=session_key, **fields))
+        for fields, sessions in groups.items():
+            try:
+                self._write(sessions, fields)
+            except Exception as e:
+                logger.error(f"Failed to flush the activity of {len(sessions)} sessions, retrying one by one: {e}")
+                for session in sessions:
+                    self._write_alone(session, fields, pending[session.session_key])
+            else:
+                self._written(sessions)
+
+    def stats(self):
+        return {"recorded": self.recorded, "written": self.written, "pending": len(self._pending)}
+
+    def _schedule_flush(self):
+        # Called with `_lock` held.
+        if self.flush_interval and self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self._flush_in_background)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _write_alone(self, session, fields, values):
+        try:
+            self._write([session], fields)
+        except Exception as e:
+            self._put_back(session.session_key, values, e)
+        else:
+            self._written([session])
+
+    def _written(self, sessions):
+        with self._lock:
+            self.written += len(sessions)
+            for session in sessions:
+                self._attempts.pop(session.session_key, None)
+
+    def _put_back(self, session_key, values, error):
+        with self._lock:
+            attempts = self._attempts.get(session_key, 0) + 1
+            if attempts >= self.max_attempts:
+                self._attempts.pop(session_key, None)
+                logger.error(f"Dropped the activity of session {session_key} after {attempts} attempts: {error}")
+                return
+            self._attempts[session_key] = attempts
+            # Values recorded since the flush started are newer.
+            self._pending[session_key] = {**values, **self._pending.get(session_key, {})}
+            self._schedule_flush()
+
+    @staticmethod
+    def _write(sessions, fields):
+        from user_app.models.session import Session
+
+        # Rows deleted or not created yet are simply not matched.
+        Session.objects.bulk_update(sessions, fields, batch_size=500)
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            connections.close_all()
+
+
+session_activity = SessionActivityRecorder()
@@ -0,0 +1,116 @@
+"""
+Classification of User Agent strings into a browser and a platform.
+
+Every pattern of `BROWSERS` and `PLATFORMS` is compiled into a single alternation with one named
+group per pattern, so a User Agent is scanned once for both. When several patterns match, the one
+listed first in its table wins, as if the table were tried in order. Results are kept in a bounded
+LRU keyed by the User Agent string: the same few User Agents make most of the traffic.
+"""
+
+import re
+from collections import namedtuple
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+
+from cryptek.caching import LRUCache
+
+BROWSERS = (
+    ("Edg", _("Edge")),
+    ("OPR", _("Opera")),
+    ("Chrome", _("Chrome")),
+    ("Safari", _("Safari")),
+    ("Firefox", _("Firefox")),
+    ("IE", _("Internet Explorer")),
+)
+PLATFORMS = (
+    ("Windows Mobile", _("Windows Mobile")),
+    ("Android", _("Android")),
+    ("Linux", _("Linux")),
+    ("iPhone", _("iPhone")),
+    ("iPad", _("iPad")),
+    ("Mac OS X 10[._]9", _("OS X Mavericks")),
+    ("Mac OS X 10[._]10", _("OS X Yosemite")),
+    ("Mac OS X 10[._]11", _("OS X El Capitan")),
+    ("Mac OS X 10[._]12", _("macOS Sierra")),
+    ("Mac OS X 10[._]13", _("macOS High Sierra")),
+    ("Mac OS X 10[._]14", _("macOS Mojave")),
+    ("Mac OS X 10[._]15", _("macOS Catalina")),
+    ("Mac OS X", _("macOS")),
+    ("NT 5.1", _("Windows XP")),
+    ("NT 6.0", _("Windows Vista")),
+    ("NT 6.1", _("Windows 7")),
+    ("NT 6.2", _("Windows 8")),
+    ("NT 6.3", _("Windows 8.1")),
+    ("NT 10.0", _("Windows 10")),
+    ("Windows", _("Windows")),
+)
+
+# `b<i>` and `p<i>` name the i-th pattern of `BROWSERS` and `PLATFORMS`. Within a table, longer
+# patterns sharing a prefix are listed first, so the alternation prefers them at the same position.
+_MATCHER = re.compile(
+    "|".join(
+        [f"(?P<b{index}>{pattern})" for index, (pattern, _name) in enumerate(BROWSERS)]
+        + [f"(?P<p{index}>{pattern})" for index, (pattern, _name) in enumerate(PLATFORMS)]
+    )
+)
+
+UserAgent = namedtuple("UserAgent", ["browser", "platform"])
+
+_NOT_FOUND = len(BROWSERS) + len(PLATFORMS)
+
+
+class UserAgentParser:
+    """
+    Classify User Agents with one scan each, remembering the most recent results.
+
+    Attributes:
+        cache (LRUCache): `(browser index, platform index)` by User Agent string. Indexes rather than
+            names are kept, so names are translated in the language active at each lookup.
+    """
+
+    def __init__(self, maxsize=None):
+        self.cache = LRUCache(
+            maxsize=maxsize if maxsize is not None else getattr(settings, "USER_AGENT_CACHE_SIZE", 1024)
+        )
+
+    def classify(self, value):
+        """Return the `(browser index, platform index)` of a User Agent; None for what isn't recognised."""
+        found = self.cache.get(value)
+        if found is None:
+            browser = platform = _NOT_FOUND
+            for match in _MATCHER.finditer(value):
+                kind, index = match.lastgroup[0], int(match.lastgroup[1:])
+                if kind == "b":
+                    browser = min(browser, index)
+                else:
+                    platform = min(platform, index)
+            found = (
+                browser if browser != _NOT_FOUND else None,
+                platform if platform != _NOT_FOUND else None,
+            )
+            self.cache.set(value, found)
+        return found
+
+    def parse(self, value):
+        """Return the `UserAgent` (browser and platform names, or None) of a User Agent string."""
+        if not value:
+            return UserAgent(None, None)
+        browser, platform = self.classify(value)
+        return UserAgent(
+            BROWSERS[browser][1] if browser is not None else None,
+            PLATFORMS[platform][1] if platform is not None else None,
+        )
+
+    def device(self, value):
+        """Return "<browser> on <platform>", or whichever of the two is known, or None."""
+        browser, platform = self.parse(value)
+        if browser and platform:
+            return _("%(browser)s on %(device)s") % {"browser": browser, "device": platform}
+        return browser or platform or None
+
+    def stats(self):
+        return self.cache.stats()
+
+
+user_agent_parser = UserAgentParser()